@@ -162,6 +162,8 @@ async def chat_mode():
                     f"✅ Processing completed: time={elapsed_time:.0f}ms",
                     "main", "process"
                 )
+                # 日誌由背景執行緒寫出；先排空，避免與下方輸出交錯
+                logger.flush()
 
                 # 顯示結果
                 print("\n" + "="*50)
@@ -0,0 +1,209 @@
+"""
+HTML extraction benchmark: BeautifulSoup vs the lxml fast path, and the
+event loop stall of extracting on the loop vs in the extraction pool.
+
+Runs over a corpus of saved pages (*.html / *.htm in --corpus). Pages can be
+saved with --save-urls (one URL per line); without a corpus a synthetic one
+(article + navigation / script boilerplate, 20 KB - 1.5 MB) is generated.
+
+Reports, per backend (bs4 / lxml / auto = lxml with bs4 fallback):
+- per-page extraction time (p50 / p95 / max / total) and characters extracted
+and, for fetch_multiple-style concurrent extraction (3 at a time):
+- wall time and the worst event loop heartbeat delay, inline vs pool
+
+Usage:
+    python scripts/bench_html_extraction.py [--corpus data/html_corpus]
+        [--save-urls urls.txt] [--synthetic 30] [--workers 4]
+        [--output data/baseline/html_extraction.json]
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import hashlib
+import random
+import statistics
+import sys
+import urllib.request
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services.search.extraction import (  # noqa: E402
+    ExtractionPool,
+    extract_main_text,
+    max_html_bytes,
+)
+
+BACKENDS = ("bs4", "lxml", "auto")
+
+
+def save_pages(url_file: str, corpus: Path) -> int:
+    """Download every URL in url_file into the corpus directory."""
+    corpus.mkdir(parents=True, exist_ok=True)
+    saved = 0
+    for url in Path(url_file).read_text().split():
+        name = hashlib.sha1(url.encode()).hexdigest()[:16] + ".html"
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(request, timeout=15) as resp:
+                (corpus / name).write_bytes(resp.read())
+            saved += 1
+        except Exception as e:
+            print(f"skip {url}: {e}")
+    return saved
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> list[tuple[str, bytes]]:
+    rng = random.Random(seed)
+    words = ("model data search event loop latency parser worker request token "
+             "vector index cache query result page article content stream").split()
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize() + ", ok."
+
+    pages = []
+    for i in range(n):
+        paragraphs = rng.randint(10, 60)
+        boilerplate = rng.randint(20, 2000)  # nav links / script blobs, the bulk of real pages
+        nav = "".join(f"<li><a href='/p/{j}'>{rng.choice(words)}</a></li>" for j in range(boilerplate))
+        script = "<script>" + "var x = {};".replace("{}", "'" + "a" * 200 + "'") * boilerplate + "</script>"
+        body = "".join(f"<p>{' '.join(sentence() for _ in range(4))}</p>" for _ in range(paragraphs))
+        html = (f"<html><head><title>page {i}</title>{script}</head><body>"
+                f"<header><nav><ul>{nav}</ul></nav></header>"
+                f"<div class='layout'><div class='main'>{body}</div>"
+                f"<aside>{nav[:2000]}</aside></div><footer>footer</footer></body></html>")
+        pages.append((f"synthetic_{i:03d}.html", html.encode("utf-8")))
+    return pages
+
+
+def load_corpus(corpus: Path) -> list[tuple[str, bytes]]:
+    files = sorted(p for p in corpus.glob("*") if p.suffix.lower() in (".html", ".htm"))
+    return [(p.name, p.read_bytes()) for p in files]
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_backends(pages: list[tuple[str, bytes]]) -> dict:
+    limit = max_html_bytes()
+    report = {}
+    for backend in BACKENDS:
+        times, chars, empty = [], [], 0
+        for _, data in pages:
+            start = time.perf_counter()
+            text = extract_main_text(data[:limit], None, backend=backend)
+            times.append((time.perf_counter() - start) * 1000)
+            chars.append(len(text or ""))
+            empty += not text
+        report[backend] = {
+            "p50_ms": round(statistics.median(times), 2),
+            "p95_ms": round(_pct(times, 0.95), 2),
+            "max_ms": round(max(times), 2),
+            "total_ms": round(sum(times), 1),
+            "avg_chars": round(statistics.mean(chars)),
+            "empty": empty,
+        }
+    report["speedup_auto_vs_bs4"] = round(report["bs4"]["total_ms"] / max(report["auto"]["total_ms"], 1e-6), 2)
+    return report
+
+
+async def _run_concurrent(pages, extract, concurrency: int = 3) -> dict:
+    """Extract every page (`concurrency` at a time) while a heartbeat measures loop delay."""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal worst
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            worst = max(worst, time.perf_counter() - start - 0.005)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(data):
+        async with semaphore:
+            return await extract(data)
+
+    ticker = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*[one(data) for _, data in pages])
+    wall = time.perf_counter() - start
+    done.set()
+    await ticker
+    return {"wall_ms": round(wall * 1000, 1), "max_loop_lag_ms": round(worst * 1000, 1)}
+
+
+async def bench_loop(pages: list[tuple[str, bytes]], workers: int) -> dict:
+    limit = max_html_bytes()
+
+    async def inline(data):
+        return extract_main_text(data[:limit], None, backend="bs4")
+
+    pool = ExtractionPool(workers)
+    mode = pool.mode
+    try:
+        await pool.extract(b"<html><body>warm up</body></html>")  # spawn the workers first
+        pooled = await _run_concurrent(pages, lambda data: pool.extract(data[:limit]))
+    finally:
+        pool.shutdown()
+    return {
+        "inline_bs4": await _run_concurrent(pages, inline),
+        f"pool_{mode}": {**pooled, "workers": workers},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction benchmark")
+    parser.add_argument("--corpus", default="data/html_corpus", help="Directory of saved pages")
+    parser.add_argument("--save-urls", help="File of URLs to download into the corpus first")
+    parser.add_argument("--synthetic", type=int, default=30, help="Synthetic pages when the corpus is empty")
+    parser.add_argument("--workers", type=int, default=4, help="Extraction pool workers (0 = threads)")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    if args.save_urls:
+        print(f"Saved {save_pages(args.save_urls, corpus)} pages to {corpus}")
+    pages = load_corpus(corpus) if corpus.exists() else []
+    source = str(corpus)
+    if not pages:
+        pages = synthetic_corpus(args.synthetic)
+        source = f"synthetic ({args.synthetic} pages)"
+
+    total_kb = sum(len(data) for _, data in pages) / 1024
+    print(f"Corpus: {source}, {len(pages)} pages, {total_kb:.0f} KB\n")
+
+    backends = bench_backends(pages)
+    print(f"{'backend':<8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'total ms':>10} {'avg chars':>10} {'empty':>6}")
+    for name in BACKENDS:
+        r = backends[name]
+        print(f"{name:<8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['max_ms']:>8} "
+              f"{r['total_ms']:>10} {r['avg_chars']:>10} {r['empty']:>6}")
+    print(f"auto vs bs4 speedup: {backends['speedup_auto_vs_bs4']}x\n")
+
+    loop = asyncio.run(bench_loop(pages, args.workers))
+    for name, r in loop.items():
+        print(f"{name:<14} wall {r['wall_ms']:>8} ms   max loop lag {r['max_loop_lag_ms']:>7} ms")
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "corpus": source,
+            "pages": len(pages),
+            "corpus_kb": round(total_kb),
+            "backends": backends,
+            "event_loop": loop,
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
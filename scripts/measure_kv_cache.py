@@ -1,8 +1,8 @@
 """
 KV-Cache baseline measurement script.
 
-Analyzes API usage logs to compute:
-- KV-Cache hit rate (cached_tokens / total_tokens)
+Analyzes API usage logs (written by services/llm/usage_ledger.py) to compute:
+- KV-Cache hit rate (cached_tokens / prompt_tokens)
 - Estimated cost savings from caching
 - Per-provider breakdown
 
@@ -19,6 +19,7 @@ from datetime import datetime
 def analyze_api_logs(log_dir: str = "data/cost") -> dict:
     """Analyze API usage logs for cache hit rate."""
     total_tokens = 0
+    prompt_tokens = 0
     cached_tokens = 0
     total_cost = 0.0
     request_count = 0
@@ -41,31 +42,36 @@ def analyze_api_logs(log_dir: str = "data/cost") -> dict:
 
                 request_count += 1
                 entry_total = entry.get("total_tokens", 0)
+                # Cache hits are a share of the prompt (older entries: of the total)
+                entry_prompt = entry.get("prompt_tokens", entry_total)
                 entry_cached = entry.get("cached_tokens", 0)
-                entry_cost = entry.get("cost_usd", 0.0)
+                entry_cost = entry.get("cost_usd", entry.get("cost", 0.0))
                 provider = entry.get("provider", "unknown")
 
                 total_tokens += entry_total
+                prompt_tokens += entry_prompt
                 cached_tokens += entry_cached
                 total_cost += entry_cost
 
                 if provider not in per_provider:
                     per_provider[provider] = {
                         "total_tokens": 0,
+                        "prompt_tokens": 0,
                         "cached_tokens": 0,
                         "request_count": 0,
                     }
                 per_provider[provider]["total_tokens"] += entry_total
+                per_provider[provider]["prompt_tokens"] += entry_prompt
                 per_provider[provider]["cached_tokens"] += entry_cached
                 per_provider[provider]["request_count"] += 1
 
-    hit_rate = cached_tokens / total_tokens if total_tokens > 0 else 0
+    hit_rate = cached_tokens / prompt_tokens if prompt_tokens > 0 else 0
     # Claude pricing: cached $0.30/MTok vs uncached $3/MTok
     potential_savings = cached_tokens * (3.0 - 0.3) / 1_000_000
 
     # Per-provider hit rates
     for stats in per_provider.values():
-        t = stats["total_tokens"]
+        t = stats["prompt_tokens"]
         stats["hit_rate"] = round(stats["cached_tokens"] / t, 4) if t > 0 else 0
 
     return {
@@ -73,6 +79,7 @@ def analyze_api_logs(log_dir: str = "data/cost") -> dict:
         "log_dir": str(log_dir),
         "request_count": request_count,
         "total_tokens": total_tokens,
+        "prompt_tokens": prompt_tokens,
         "cached_tokens": cached_tokens,
         "kv_cache_hit_rate": round(hit_rate, 4),
         "total_cost_usd": round(total_cost, 4),
@@ -0,0 +1,119 @@
+"""
+Per-stage LLM cost report.
+
+Groups the usage ledger (data/cost/usage_*.jsonl, written by
+services/llm/usage_ledger.py) by pipeline stage for one mode, to show where
+deep research spends its tokens, money and time:
+- calls, prompt / completion / cached tokens and cost per stage
+- avg and p95 latency per stage
+- share of the mode's total cost, and cost per request (trace)
+
+Usage:
+    python scripts/stage_cost_report.py [--log-dir data/cost] [--mode deep_research]
+                                        [--output data/baseline/stage_cost.json]
+"""
+
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+
+def _p95(values: list) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def analyze_stage_costs(log_dir: str = "data/cost", mode: str = "deep_research") -> dict:
+    """Aggregate ledger entries of `mode` by stage."""
+    log_path = Path(log_dir)
+    if not log_path.exists():
+        return {"error": f"Log directory not found: {log_dir}"}
+
+    stages: dict[str, dict] = {}
+    latencies: dict[str, list] = {}
+    traces = set()
+
+    for log_file in sorted(log_path.glob("usage_*.jsonl")):
+        with open(log_file) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("mode") != mode:
+                    continue
+
+                stage = entry.get("stage") or "unknown"
+                stats = stages.setdefault(stage, {
+                    "calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "cost_usd": 0.0,
+                })
+                stats["calls"] += 1
+                stats["prompt_tokens"] += entry.get("prompt_tokens", 0)
+                stats["completion_tokens"] += entry.get("completion_tokens", 0)
+                stats["cached_tokens"] += entry.get("cached_tokens", 0)
+                stats["cost_usd"] += entry.get("cost_usd", 0.0)
+                latencies.setdefault(stage, []).append(entry.get("latency_ms", 0.0))
+                if entry.get("trace_id"):
+                    traces.add(entry["trace_id"])
+
+    total_cost = sum(s["cost_usd"] for s in stages.values())
+    for stage, stats in stages.items():
+        lat = latencies[stage]
+        stats["avg_latency_ms"] = round(sum(lat) / len(lat), 1)
+        stats["p95_latency_ms"] = round(_p95(lat), 1)
+        stats["cost_share"] = round(stats["cost_usd"] / total_cost, 4) if total_cost else 0
+        stats["cost_usd"] = round(stats["cost_usd"], 6)
+
+    ordered = dict(sorted(stages.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True))
+    return {
+        "measured_at": datetime.utcnow().isoformat(),
+        "log_dir": str(log_dir),
+        "mode": mode,
+        "requests": len(traces),
+        "calls": sum(s["calls"] for s in stages.values()),
+        "total_cost_usd": round(total_cost, 6),
+        "cost_per_request_usd": round(total_cost / len(traces), 6) if traces else 0,
+        "stages": ordered,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage LLM cost report")
+    parser.add_argument("--log-dir", default="data/cost", help="API usage log directory")
+    parser.add_argument("--mode", default="deep_research", help="Processing mode to report")
+    parser.add_argument("--output", default="data/baseline/stage_cost.json", help="Output file")
+    args = parser.parse_args()
+
+    result = analyze_stage_costs(args.log_dir, args.mode)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"Stage Cost Report ({args.mode})")
+    print(f"==================" + "=" * (len(args.mode) + 3))
+    print(f"Requests: {result.get('requests', 0)}  Calls: {result.get('calls', 0)}  "
+          f"Total: ${result.get('total_cost_usd', 0):.4f}  "
+          f"Per request: ${result.get('cost_per_request_usd', 0):.4f}")
+    print(f"\n{'stage':28} {'calls':>6} {'prompt':>10} {'cached':>10} {'output':>9} "
+          f"{'cost $':>9} {'share':>6} {'p95 ms':>8}")
+    for stage, s in result.get("stages", {}).items():
+        print(f"{stage:28} {s['calls']:>6} {s['prompt_tokens']:>10,} {s['cached_tokens']:>10,} "
+              f"{s['completion_tokens']:>9,} {s['cost_usd']:>9.4f} {s['cost_share']:>6.1%} "
+              f"{s['p95_latency_ms']:>8.0f}")
+    print(f"\nSaved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
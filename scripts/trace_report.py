@@ -0,0 +1,245 @@
+"""
+Trace report: critical path and waterfall for one request.
+
+Reads the OTLP-JSON span files written by src/core/tracing.py
+(data/traces/spans_*.jsonl, feature flag `tracing.enabled`) and shows where
+the wall-clock time of one trace went:
+- critical path: the chain of spans that determined the end-to-end time
+  (at each level, the child that finished last, then whatever finished
+  before it started, ...), with the time each span owns on that path
+- by span name: count, total and max duration, time on the critical path
+- waterfall: every span as an offset/duration bar, indented by depth
+
+The trace_id is the request trace_id (UUID) or the OTLP trace id; a unique
+prefix of either is enough.
+
+Usage:
+    python scripts/trace_report.py <trace_id> [--dir data/traces] [--width 60]
+                                   [--output trace.json]
+"""
+
+import json
+import argparse
+import hashlib
+from pathlib import Path
+
+
+def _otel_trace_id(trace_id: str) -> str:
+    # Same mapping as core.tracing.otel_trace_id
+    compact = trace_id.replace("-", "").lower()
+    if len(compact) == 32 and all(c in "0123456789abcdef" for c in compact):
+        return compact
+    return hashlib.md5(trace_id.encode("utf-8")).hexdigest()
+
+
+def _attr_value(value: dict):
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "arrayValue" in value:
+        return [_attr_value(v) for v in value["arrayValue"].get("values", [])]
+    return None
+
+
+def _iter_spans(trace_dir: Path):
+    for path in sorted(trace_dir.glob("spans_*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for resource_spans in request.get("resourceSpans", []):
+                    for scope_spans in resource_spans.get("scopeSpans", []):
+                        yield from scope_spans.get("spans", [])
+
+
+def load_trace(trace_dir: str, trace_id: str) -> list:
+    """Spans of one trace as plain dicts, sorted by start time."""
+    wanted = trace_id.replace("-", "").lower()
+    full = _otel_trace_id(trace_id)
+    spans = []
+    for raw in _iter_spans(Path(trace_dir)):
+        otel_id = raw.get("traceId", "")
+        if otel_id != full and not otel_id.startswith(wanted):
+            continue
+        spans.append({
+            "trace_id": otel_id,
+            "span_id": raw.get("spanId"),
+            "parent_id": raw.get("parentSpanId") or None,
+            "name": raw.get("name", "?"),
+            "start_ns": int(raw.get("startTimeUnixNano", 0)),
+            "end_ns": int(raw.get("endTimeUnixNano", 0)),
+            "attributes": {a["key"]: _attr_value(a.get("value", {}))
+                           for a in raw.get("attributes", [])},
+            "error": raw.get("status", {}).get("code") == 2,
+        })
+    if len({s["trace_id"] for s in spans}) > 1:
+        raise ValueError(f"trace id prefix {trace_id!r} is ambiguous")
+    return sorted(spans, key=lambda s: s["start_ns"])
+
+
+def _children_index(spans: list) -> dict:
+    ids = {s["span_id"] for s in spans}
+    children = {}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    return children
+
+
+def critical_path(spans: list) -> list:
+    """[(depth, span, owned_ms)] along the critical path, root first.
+
+    owned_ms is the part of the span's critical window not covered by a
+    critical child (its own work, or waiting on non-traced code).
+    """
+    children = _children_index(spans)
+    path = []
+
+    def walk(span, end_ns, depth):
+        entry = [depth, span, 0.0]
+        path.append(entry)
+        t = min(span["end_ns"], end_ns)
+        owned = 0
+        candidates = sorted(children.get(span["span_id"], []),
+                            key=lambda c: c["end_ns"], reverse=True)
+        for child in candidates:
+            if child["start_ns"] >= t:
+                continue  # entirely after the window: overlapped by a critical sibling
+            child_end = min(child["end_ns"], t)
+            owned += t - child_end
+            walk(child, child_end, depth + 1)
+            t = max(child["start_ns"], span["start_ns"])
+        owned += max(0, t - span["start_ns"])
+        entry[2] = owned / 1e6
+
+    for root in children.get(None, []):
+        walk(root, root["end_ns"], 0)
+    return [tuple(e) for e in path]
+
+
+def summarize(spans: list) -> dict:
+    """Report dict: totals, critical path and per-name breakdown."""
+    if not spans:
+        return {"spans": 0}
+    start = min(s["start_ns"] for s in spans)
+    end = max(s["end_ns"] for s in spans)
+    path = critical_path(spans)
+    on_path = {}
+    for _, span, owned in path:
+        on_path[span["name"]] = on_path.get(span["name"], 0.0) + owned
+
+    by_name = {}
+    for s in spans:
+        stats = by_name.setdefault(s["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        duration = (s["end_ns"] - s["start_ns"]) / 1e6
+        stats["count"] += 1
+        stats["total_ms"] += duration
+        stats["max_ms"] = max(stats["max_ms"], duration)
+    for name, stats in by_name.items():
+        stats["critical_ms"] = round(on_path.get(name, 0.0), 1)
+        stats["total_ms"] = round(stats["total_ms"], 1)
+        stats["max_ms"] = round(stats["max_ms"], 1)
+
+    root = next((s for s in spans if s["parent_id"] is None), spans[0])
+    return {
+        "trace_id": spans[0]["trace_id"],
+        "request_trace_id": root["attributes"].get("quitcode.trace_id"),
+        "spans": len(spans),
+        "wall_ms": round((end - start) / 1e6, 1),
+        "errors": sum(1 for s in spans if s["error"]),
+        "critical_path": [
+            {"depth": depth, "name": span["name"], "span_id": span["span_id"],
+             "duration_ms": round((span["end_ns"] - span["start_ns"]) / 1e6, 1),
+             "owned_ms": round(owned, 1)}
+            for depth, span, owned in path
+        ],
+        "by_name": dict(sorted(by_name.items(), key=lambda kv: kv[1]["critical_ms"], reverse=True)),
+    }
+
+
+_LABEL_ATTRS = ("query", "url", "section", "provider", "model", "iteration", "stage")
+
+
+def _label(span: dict) -> str:
+    attrs = span["attributes"]
+    extra = next((f"{k}={attrs[k]}" for k in _LABEL_ATTRS if attrs.get(k) not in (None, "")), "")
+    if len(extra) > 50:
+        extra = extra[:47] + "..."
+    return f"{span['name']} {extra}".rstrip() + (" !" if span["error"] else "")
+
+
+def waterfall(spans: list, width: int = 60) -> list:
+    """Text lines: offset, duration, bar and name per span, in tree order."""
+    if not spans:
+        return []
+    start = min(s["start_ns"] for s in spans)
+    total = max(max(s["end_ns"] for s in spans) - start, 1)
+    children = _children_index(spans)
+    lines = []
+
+    def walk(span, depth):
+        offset = span["start_ns"] - start
+        duration = span["end_ns"] - span["start_ns"]
+        left = int(offset / total * width)
+        bar = " " * left + "█" * max(1, round(duration / total * width))
+        lines.append(f"{offset / 1e6:>9.0f} {duration / 1e6:>9.0f}  "
+                     f"{bar[:width + 1]:<{width + 1}} {'  ' * depth}{_label(span)}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical path and waterfall for one trace")
+    parser.add_argument("trace_id", help="Request trace_id or OTLP trace id (prefix ok)")
+    parser.add_argument("--dir", default=str(Path(__file__).parent.parent / "data" / "traces"),
+                        help="Span file directory (default: <project>/data/traces)")
+    parser.add_argument("--width", type=int, default=60, help="Waterfall bar width")
+    parser.add_argument("--output", help="Also save the report as JSON")
+    args = parser.parse_args()
+
+    spans = load_trace(args.dir, args.trace_id)
+    if not spans:
+        print(f"No spans for trace {args.trace_id} in {args.dir}")
+        return
+
+    report = summarize(spans)
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"Trace {report['request_trace_id'] or report['trace_id']}")
+    print(f"Spans: {report['spans']}  Wall: {report['wall_ms']:.0f} ms  Errors: {report['errors']}")
+
+    print("\nCritical path")
+    for step in report["critical_path"]:
+        share = step["owned_ms"] / report["wall_ms"] if report["wall_ms"] else 0
+        print(f"  {'  ' * step['depth']}{step['name']:<{40 - 2 * step['depth']}} "
+              f"{step['duration_ms']:>9.0f} ms  owns {step['owned_ms']:>8.0f} ms ({share:>5.1%})")
+
+    print(f"\n{'span':32} {'count':>6} {'total ms':>10} {'max ms':>9} {'critical ms':>12}")
+    for name, s in report["by_name"].items():
+        print(f"{name:32} {s['count']:>6} {s['total_ms']:>10.0f} {s['max_ms']:>9.0f} "
+              f"{s['critical_ms']:>12.0f}")
+
+    print(f"\n{'start ms':>9} {'dur ms':>9}  waterfall")
+    for line in waterfall(spans, args.width):
+        print(line)
+    if args.output:
+        print(f"\nSaved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
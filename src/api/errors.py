@@ -8,6 +8,8 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from core.admission import AdmissionRejected
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +55,18 @@ def register_error_handlers(app: FastAPI) -> None:
             ).model_dump(exclude_none=True),
         )
 
+    @app.exception_handler(AdmissionRejected)
+    async def admission_rejected_handler(_request: Request, exc: AdmissionRejected) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(exc.retry_after)},
+            content=ErrorResponse(
+                error_code="OVERLOADED",
+                message=str(exc),
+                detail=exc.cognitive_level,
+            ).model_dump(exclude_none=True),
+        )
+
     @app.exception_handler(Exception)
     async def unhandled_error_handler(_request: Request, exc: Exception) -> JSONResponse:
         logger.error(f"Unhandled exception: {exc}\n{traceback.format_exc()}")
@@ -3,18 +3,25 @@ API Routes - complete API layer with versioned endpoints.
 Integrates with RefactoredEngine, auth, SSE streaming, and services.
 """
 
+import asyncio
+import hmac
 import os
 import uuid
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, Header, HTTPException, UploadFile, File, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sse_starlette.sse import EventSourceResponse
 
 from core.engine import RefactoredEngine
+from core.histogram import histograms
+from core.loop_monitor import get_loop_monitor, start_loop_monitor, stop_loop_monitor
+from core.profiling import load_report, profiled, profiling_enabled, sample_process
 from core.models_v2 import Request, Modes, ProcessingMode
-from auth import get_current_user, get_optional_user, TokenData
+from auth import get_current_user, get_optional_user, require_admin, TokenData
 from auth.jwt import encode_token, UserRole, ACCESS_TOKEN_EXPIRE_MINUTES
 from api.schemas import (
     ChatRequest, ChatResponse,
@@ -25,12 +32,16 @@ from api.schemas import (
 )
 from api.errors import APIError, register_error_handlers
 from api.streaming import engine_event_generator
+from services.llm.multi_provider import hedge_stats, provider_health
+from services.llm.rate_limiter import rate_limit_stats
 
 logger = logging.getLogger(__name__)
 
 # In-memory stores (production would use DB/Redis)
 _document_tasks: dict = {}
 
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
 # Engine singleton - initialized in create_app lifespan
 _engine: RefactoredEngine | None = None
 
@@ -63,7 +74,9 @@ def create_app(engine: RefactoredEngine | None = None) -> FastAPI:
                 logger.warning("Could not auto-create engine: %s", e)
         if _engine is not None and not _engine.initialized:
             await _engine.initialize()
+        start_loop_monitor()
         yield
+        stop_loop_monitor()
 
     app = FastAPI(
         title="QuitCode Platform API",
@@ -117,6 +130,10 @@ def create_app(engine: RefactoredEngine | None = None) -> FastAPI:
                     result["packages"] = {"total": len(packages), "running": running}
                 except Exception:
                     pass
+            # LLM provider circuit breakers
+            providers = provider_health(_engine.llm_client)
+            if providers:
+                result["llm_providers"] = providers
         return result
 
     @app.get("/api/status")
@@ -152,9 +169,15 @@ def create_app(engine: RefactoredEngine | None = None) -> FastAPI:
     @app.post("/api/v1/chat", response_model=ChatResponse)
     async def chat(
         req: ChatRequest,
+        http_response: Response,
         user: TokenData = Depends(get_current_user),
+        x_profile: str | None = Header(default=None),
     ):
-        """Synchronous chat endpoint supporting all ProcessingMode values."""
+        """Synchronous chat endpoint supporting all ProcessingMode values.
+
+        Admins can send `X-Profile: 1` to profile this request; the report is
+        at /api/v1/admin/profiles/{trace_id}.
+        """
         eng = _get_engine()
         core_request = Request(
             query=req.query,
@@ -163,7 +186,15 @@ def create_app(engine: RefactoredEngine | None = None) -> FastAPI:
             max_tokens=req.max_tokens,
             metadata=req.metadata,
         )
-        response = await eng.process(core_request)
+        if x_profile in ("1", "true") and user.role == UserRole.ADMIN and profiling_enabled():
+            async with profiled(core_request.trace_id) as active:
+                response = await eng.process(core_request)
+            if active:
+                http_response.headers["X-Profile-Report"] = (
+                    f"/api/v1/admin/profiles/{core_request.trace_id}"
+                )
+        else:
+            response = await eng.process(core_request)
         return ChatResponse(
             result=response.result,
             mode=response.mode.name,
@@ -302,8 +333,96 @@ def create_app(engine: RefactoredEngine | None = None) -> FastAPI:
         eng = _get_engine()
         result = eng.metrics
         result["extensions"] = eng._metrics.get_extension_metrics()
+        result["streaming"] = eng._metrics.get_streaming_metrics()
+        result["cancellations"] = eng._metrics.get_cancellation_metrics()
+        result["admission"] = eng._metrics.get_admission_metrics()
+        if eng._admission is not None:
+            for level, state in eng._admission.stats.items():
+                result["admission"].setdefault(level, {}).update(state)
+        if eng._llm_scheduler is not None:
+            result["llm_scheduler"] = eng._llm_scheduler.stats
+        providers = provider_health(eng.llm_client)
+        if providers:
+            result["llm_providers"] = providers
+        hedging = hedge_stats(eng.llm_client)
+        if hedging:
+            result["llm_hedging"] = hedging
+        rate_limits = rate_limit_stats(eng.llm_client)
+        if rate_limits:
+            result["rate_limits"] = rate_limits
+        result["response_cache"] = await eng._model_runtime.acache_stats()
+        result["latency"] = histograms.summary()
+        monitor = get_loop_monitor()
+        if monitor is not None:
+            loop_stats = monitor.stats(top=0)
+            result["event_loop"] = {
+                k: loop_stats[k] for k in ("threshold_ms", "stalls", "max_lag_ms", "p99_lag_ms")
+            }
         return result
 
+    if os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no", "off"):
+
+        @app.get(os.getenv("METRICS_PATH", "/metrics"), include_in_schema=False)
+        async def openmetrics(authorization: str | None = Header(default=None)):
+            """Latency histograms in OpenMetrics text format (for Prometheus scrapes).
+
+            Public unless METRICS_TOKEN is set, then a matching Bearer token is required.
+            """
+            token = os.getenv("METRICS_TOKEN")
+            if token and not hmac.compare_digest(
+                (authorization or "").encode(), f"Bearer {token}".encode()
+            ):
+                raise APIError(401, "UNAUTHORIZED", "Invalid metrics token")
+            return Response(histograms.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+    # ── Profiling (admin) ──
+
+    @app.get("/api/v1/admin/profiles/{trace_id}")
+    async def get_profile(
+        trace_id: str,
+        format: str = "json",
+        admin: TokenData = Depends(require_admin),
+    ):
+        """Saved profile of an `X-Profile: 1` request (json | text | collapsed)."""
+        try:
+            report = await asyncio.to_thread(load_report, trace_id)
+        except ValueError:
+            report = None
+        if report is None:
+            raise APIError(404, "PROFILE_NOT_FOUND", f"No profile for trace {trace_id}")
+        if format == "text":
+            return PlainTextResponse(report.get("text", ""))
+        if format == "collapsed":
+            if "collapsed" not in report:
+                raise APIError(404, "PROFILE_NOT_FOUND", "Report has no collapsed stacks")
+            return PlainTextResponse(report["collapsed"])
+        return report
+
+    @app.post("/api/v1/admin/profile")
+    async def profile_process(
+        seconds: float = 10.0,
+        interval_ms: float = 5.0,
+        admin: TokenData = Depends(require_admin),
+    ):
+        """Sample every thread for `seconds` and return collapsed stacks (flamegraph input)."""
+        if not profiling_enabled():
+            raise APIError(404, "PROFILING_DISABLED", "Profiling is disabled")
+        collapsed = await sample_process(seconds, max(interval_ms, 1.0) / 1000)
+        if collapsed is None:
+            raise APIError(409, "PROFILER_BUSY", "Another profiling session is running")
+        filename = f"profile-{datetime.now():%Y%m%d-%H%M%S}.collapsed"
+        return PlainTextResponse(
+            collapsed, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+    @app.get("/api/v1/admin/loop-stalls")
+    async def loop_stalls(top: int = 20, admin: TokenData = Depends(require_admin)):
+        """Event loop lag summary, top blocking call sites and recent stalls."""
+        monitor = get_loop_monitor()
+        if monitor is None:
+            raise APIError(404, "LOOP_MONITOR_DISABLED", "Event loop monitor is not running")
+        return monitor.stats(top=top)
+
     # ── MCP Management ──
 
     @app.get("/api/v1/mcp/servers")
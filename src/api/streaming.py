@@ -2,9 +2,14 @@
 
 import asyncio
 import json
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
+import anyio
+
+from core.admission import AdmissionRejected
+from core.event_channel import EventChannel, cancel_producer
 from core.models_v2 import EventType, Event
+from core.request_scope import request_scope
 
 
 async def engine_event_generator(
@@ -13,51 +18,81 @@ async def engine_event_generator(
 ) -> AsyncGenerator[dict, None]:
     """Async generator that yields SSE events from engine processing.
 
-    Bridges the engine's callback-based SSE system into a true async
-    generator suitable for sse-starlette's EventSourceResponse.
-    """
-    event_queue: asyncio.Queue = asyncio.Queue()
-    done = asyncio.Event()
+    The engine publishes into a per-request EventChannel bound to the request
+    scope, so concurrent streams never see each other's events and each event
+    is written as soon as it is published (no polling interval).
 
-    def sse_callback(signal: str, data):
-        event_queue.put_nowait({"event": signal, "data": data})
+    EventSourceResponse watches for client disconnects (and fails on broken
+    sends) and cancels this generator; the engine task is then cancelled and
+    awaited, so processors, searches and sandbox runs stop with the request
+    instead of finishing for nobody.
+    """
+    channel = EventChannel()
 
     # Yield connection start
     yield _format_event(EventType.START.value, {"status": "connected"})
 
-    # Wire up callback and run engine in background
-    engine.logger.set_sse_callback(sse_callback)
-
+    # Run engine in background with the channel scoped to this request
     async def _run():
         try:
-            response = await engine.process(request)
+            with request_scope(trace_id=request.trace_id, event_channel=channel):
+                response = await engine.process(request)
             # Final result event
-            event_queue.put_nowait({
-                "event": EventType.RESULT.value,
-                "data": {"response": response.result, "trace_id": response.trace_id},
+            channel.publish(
+                EventType.RESULT.value,
+                {"response": response.result, "trace_id": response.trace_id},
+            )
+        except AdmissionRejected as e:
+            # Headers are already sent: report overload in-band
+            channel.publish(EventType.ERROR.value, {
+                "message": str(e), "code": "OVERLOADED", "retry_after": e.retry_after,
             })
         except Exception as e:
-            event_queue.put_nowait({
-                "event": EventType.ERROR.value,
-                "data": {"message": str(e)},
-            })
+            channel.publish(EventType.ERROR.value, {"message": str(e)})
         finally:
-            done.set()
+            channel.close()
 
     task = asyncio.create_task(_run())
 
     try:
-        while not done.is_set() or not event_queue.empty():
-            try:
-                evt = await asyncio.wait_for(event_queue.get(), timeout=0.1)
-                yield _format_event(evt["event"], evt["data"])
-            except asyncio.TimeoutError:
-                continue
+        async for evt in channel:
+            yield _format_event(evt.event, evt.data)
     finally:
-        if not task.done():
-            task.cancel()
-        # Yield stream end
-        yield _format_event(EventType.END.value, {"status": "complete"})
+        # Shielded: the disconnect arrives as a cancellation of this generator,
+        # and the cleanup below must still get to await the engine task.
+        with anyio.CancelScope(shield=True):
+            stopped = await cancel_producer(task)
+        _record_stream(engine, request, channel, stopped)
+
+    # Yield stream end
+    yield _format_event(EventType.END.value, {"status": "complete"})
+
+
+def _record_stream(engine, request, channel: EventChannel, stopped: Optional[bool] = None) -> None:
+    """Report emit -> SSE write latency for one finished stream.
+
+    `stopped` is cancel_producer's result: None if the engine finished on its
+    own, otherwise the client left early and the work was cancelled (False:
+    it had not stopped within the grace period).
+    """
+    stats = channel.stats
+    metrics = getattr(engine, "_metrics", None)
+    if metrics is not None and hasattr(metrics, "record_stream"):
+        metrics.record_stream(
+            stats["delivered"],
+            stats["avg_emit_to_write_ms"],
+            stats["max_emit_to_write_ms"],
+            disconnected=stopped is not None,
+            cancel_timeout=stopped is False,
+        )
+    logger = getattr(engine, "logger", None)
+    if logger is not None:
+        logger.debug(
+            f"SSE stream closed: {stats['delivered']} events, "
+            f"avg {stats['avg_emit_to_write_ms']}ms, max {stats['max_emit_to_write_ms']}ms"
+            f"{', client disconnected' if stopped is not None else ''} "
+            f"[trace={getattr(request, 'trace_id', None)}]"
+        )
 
 
 def _format_event(event_type: str, data) -> dict:
@@ -1,7 +1,7 @@
 """Authentication module - JWT token handling and FastAPI dependencies."""
 
 from .jwt import encode_token, decode_token, TokenData, UserRole
-from .dependencies import get_current_user, get_optional_user
+from .dependencies import get_current_user, get_optional_user, require_admin
 
 __all__ = [
     "encode_token",
@@ -10,4 +10,5 @@ __all__ = [
     "UserRole",
     "get_current_user",
     "get_optional_user",
+    "require_admin",
 ]
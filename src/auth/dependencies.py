@@ -5,7 +5,7 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from .jwt import TokenData, decode_token
+from .jwt import TokenData, UserRole, decode_token
 
 _bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -37,3 +37,15 @@ async def get_optional_user(
     if credentials is None:
         return None
     return decode_token(credentials.credentials)
+
+
+async def require_admin(
+    user: TokenData = Depends(get_current_user),
+) -> TokenData:
+    """Require a valid JWT bearer token with the admin role."""
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required",
+        )
+    return user
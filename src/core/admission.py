@@ -0,0 +1,150 @@
+"""Admission control per cognitive level.
+
+One DEEP_RESEARCH run fans out to ~20 searches, dozens of page fetches and 15+
+LLM calls; a handful of them on one worker starves System 1 chat. The
+AdmissionController sits in front of RefactoredEngine._execute and bounds, per
+cognitive level (system1 / system2 / agent):
+
+- max_concurrent: requests executing at once
+- max_queue:      requests waiting for a slot; beyond that -> rejected
+- queue_timeout:  seconds a queued request waits before it is rejected
+
+Rejections raise AdmissionRejected carrying a Retry-After estimate, which the
+API layer turns into HTTP 429. Controlled by feature flag `admission.enabled`.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .histogram import QUEUE_WAIT
+
+
+class AdmissionRejected(Exception):
+    """Raised when a cognitive level is saturated (queue full or wait timed out)."""
+
+    def __init__(self, cognitive_level: str, retry_after: int, reason: str):
+        self.cognitive_level = cognitive_level
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(
+            f"Server busy ({cognitive_level}: {reason}), retry after {retry_after}s"
+        )
+
+
+@dataclass
+class LevelLimits:
+    max_concurrent: int
+    max_queue: int
+    queue_timeout: float
+
+
+DEFAULT_LIMITS: Dict[str, LevelLimits] = {
+    "system1": LevelLimits(max_concurrent=64, max_queue=256, queue_timeout=5.0),
+    "system2": LevelLimits(max_concurrent=16, max_queue=64, queue_timeout=15.0),
+    "agent": LevelLimits(max_concurrent=2, max_queue=8, queue_timeout=30.0),
+}
+
+
+class _LevelGate:
+    """Semaphore + bounded wait queue for one cognitive level."""
+
+    SERVICE_TIME_ALPHA = 0.2  # EWMA weight for service time (Retry-After estimate)
+
+    def __init__(self, level: str, limits: LevelLimits):
+        self.level = level
+        self.limits = limits
+        self._sem = asyncio.Semaphore(limits.max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self._avg_service_s = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new arrival."""
+        backlog = self.waiting + 1
+        waves = backlog / max(1, self.limits.max_concurrent)
+        return max(1, math.ceil(waves * self._avg_service_s))
+
+    async def acquire(self) -> float:
+        """Wait for a slot. Returns queue wait in ms; raises AdmissionRejected."""
+        if not self._sem.locked():
+            await self._sem.acquire()  # free slot: completes without suspending
+            self.active += 1
+            return 0.0
+        if self.waiting >= self.limits.max_queue:
+            raise AdmissionRejected(self.level, self.retry_after(), "queue full")
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.limits.queue_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(self.level, self.retry_after(), "queue timeout") from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return (time.perf_counter() - start) * 1000
+
+    def release(self, service_s: float) -> None:
+        self.active -= 1
+        self._avg_service_s += self.SERVICE_TIME_ALPHA * (service_s - self._avg_service_s)
+        self._sem.release()
+
+
+class AdmissionController:
+    """Per-cognitive-level concurrency and queue limits."""
+
+    def __init__(self, limits: Optional[Dict[str, LevelLimits]] = None, metrics=None):
+        self._gates = {
+            level: _LevelGate(level, lim)
+            for level, lim in (limits or DEFAULT_LIMITS).items()
+        }
+        self._metrics = metrics
+
+    @classmethod
+    def from_flags(cls, flags, metrics=None) -> "AdmissionController":
+        limits = {}
+        for level, default in DEFAULT_LIMITS.items():
+            cfg = flags.get_value(f"admission.{level}", {}) or {}
+            limits[level] = LevelLimits(
+                max_concurrent=int(cfg.get("max_concurrent", default.max_concurrent)),
+                max_queue=int(cfg.get("max_queue", default.max_queue)),
+                queue_timeout=float(cfg.get("queue_timeout", default.queue_timeout)),
+            )
+        return cls(limits, metrics=metrics)
+
+    @asynccontextmanager
+    async def admit(self, cognitive_level: str) -> AsyncIterator[None]:
+        """Hold a slot for `cognitive_level` for the duration of the block."""
+        gate = self._gates.get(cognitive_level)
+        if gate is None:
+            yield
+            return
+        try:
+            wait_ms = await gate.acquire()
+        except AdmissionRejected:
+            if self._metrics is not None:
+                self._metrics.record_admission(cognitive_level, 0.0, admitted=False)
+            raise
+        if self._metrics is not None:
+            self._metrics.record_admission(cognitive_level, wait_ms, admitted=True)
+        QUEUE_WAIT.observe(wait_ms / 1000, queue="admission", pool=cognitive_level)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            gate.release(time.perf_counter() - start)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            level: {
+                "active": gate.active,
+                "waiting": gate.waiting,
+                "max_concurrent": gate.limits.max_concurrent,
+                "max_queue": gate.limits.max_queue,
+            }
+            for level, gate in self._gates.items()
+        }
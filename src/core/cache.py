@@ -1,32 +1,215 @@
 """Response cache for System 1 processors.
 
-Hash-based in-memory cache with TTL eviction.
-Controlled by feature flag `system1.enable_cache`.
+ResponseCache hashes (mode, normalized query) into a key, counts hits/misses
+and delegates storage to a CacheBackend. Controlled by feature flag
+`system1.enable_cache`; the backend is chosen by `system1.cache_backend`
+(see core.cache_backends for the shared SQLite / Redis backends).
+
+The default MemoryCacheBackend is an in-process LRU with TTL expiry, bounded by
+entry count and bytes:
+
+- LRU order lives in an OrderedDict: hit = move_to_end, evict = popitem(last=False)
+- every entry shares the same TTL, so expiry order equals insertion order and a
+  FIFO deque of (expires_at, key, entry) acts as the expiry wheel; expired
+  entries are reclaimed on every get/put, not only when they are looked up
+- all operations are O(1) (amortized for the expiry queue)
 """
 
+import asyncio
 import hashlib
 import time
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+KEY_OVERHEAD = 64  # sha256 hex key, counted in byte accounting
+
+
+class CacheBackend(ABC):
+    """Storage for ResponseCache: TTL, size caps and eviction live here.
+
+    Backends that do disk or network I/O set `blocking_io`; their async
+    `aget`/`aset` then run in a worker thread instead of on the event loop.
+    """
+
+    blocking_io = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the live value for key, or None (missing or expired)."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store value under key, evicting as needed."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove key. Returns True if it existed."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    @property
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Backend stats: at least size, bytes, evictions, expirations."""
+
+    def close(self) -> None:
+        """Release resources (connections, files)."""
+
+    async def aget(self, key: str) -> Optional[str]:
+        if self.blocking_io:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    async def aset(self, key: str, value: str) -> None:
+        if self.blocking_io:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    async def astats(self) -> Dict[str, Any]:
+        if self.blocking_io:
+            return await asyncio.to_thread(lambda: self.stats)
+        return self.stats
 
 
 @dataclass
 class CacheEntry:
     value: str
     created_at: float
+    expires_at: float
+    size: int
     hit_count: int = 0
 
 
-class ResponseCache:
-    """Simple in-memory cache keyed on query hash."""
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU + TTL store."""
 
-    def __init__(self, ttl: int = 300, max_size: int = 1000):
+    def __init__(self, ttl: int = 300, max_size: int = 1000, max_bytes: int = DEFAULT_MAX_BYTES):
         self._ttl = ttl
         self._max_size = max_size
-        self._store: Dict[str, CacheEntry] = {}
-        # Metrics
+        self._max_bytes = max_bytes
+        self._store: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._expiry: Deque[Tuple[float, str, CacheEntry]] = deque()
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        self._purge_expired(now)
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if now >= entry.expires_at:
+            self._remove(key)
+            self._expirations += 1
+            return None
+        self._store.move_to_end(key)
+        entry.hit_count += 1
+        return entry.value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.monotonic()
+        self._purge_expired(now)
+        if key in self._store:
+            self._remove(key)
+
+        size = len(value.encode("utf-8", errors="replace")) + KEY_OVERHEAD
+        if size > self._max_bytes:
+            return  # larger than the whole cache: not worth evicting everything
+
+        while self._store and (
+            len(self._store) >= self._max_size or self._bytes + size > self._max_bytes
+        ):
+            self._evict_lru()
+
+        entry = CacheEntry(value=value, created_at=now, expires_at=now + self._ttl, size=size)
+        self._store[key] = entry
+        self._bytes += size
+        self._expiry.append((entry.expires_at, key, entry))
+        self._compact_expiry()
+
+    def delete(self, key: str) -> bool:
+        if key not in self._store:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._expiry.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> CacheEntry:
+        entry = self._store.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _evict_lru(self) -> None:
+        """Remove the least recently used entry to make room."""
+        _, entry = self._store.popitem(last=False)
+        self._bytes -= entry.size
+        self._evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop entries whose TTL has passed, oldest first."""
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            _, key, entry = expiry.popleft()
+            # Skip stale records for entries already evicted or replaced
+            if self._store.get(key) is entry:
+                self._remove(key)
+                self._expirations += 1
+
+    def _compact_expiry(self) -> None:
+        """Drop stale expiry records once they outnumber live entries.
+
+        Runs at most once per ~len(store) puts, so the cost stays amortized O(1).
+        """
+        if len(self._expiry) <= 2 * len(self._store) + 64:
+            return
+        store = self._store
+        self._expiry = deque(rec for rec in self._expiry if store.get(rec[1]) is rec[2])
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "size": len(self._store),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+
+class ResponseCache:
+    """Query-keyed response cache over a pluggable backend."""
+
+    KEY_OVERHEAD = KEY_OVERHEAD
+
+    def __init__(
+        self,
+        ttl: int = 300,
+        max_size: int = 1000,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self._backend = backend or MemoryCacheBackend(ttl=ttl, max_size=max_size, max_bytes=max_bytes)
+        # Metrics (per process, even when the backend is shared)
         self._hits = 0
         self._misses = 0
+        self._errors = 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
 
     @staticmethod
     def _hash_key(query: str, mode: str) -> str:
@@ -35,47 +218,68 @@ class ResponseCache:
 
     def get(self, query: str, mode: str) -> Optional[str]:
         """Look up a cached response. Returns None on miss."""
-        key = self._hash_key(query, mode)
-        entry = self._store.get(key)
-        if entry is None:
-            self._misses += 1
-            return None
-        if time.time() - entry.created_at > self._ttl:
-            del self._store[key]
+        try:
+            value = self._backend.get(self._hash_key(query, mode))
+        except Exception:
+            # A shared backend being unavailable must not fail the request
+            self._errors += 1
+            value = None
+        return self._count(value)
+
+    async def aget(self, query: str, mode: str) -> Optional[str]:
+        """get() without blocking the event loop on shared backends."""
+        try:
+            value = await self._backend.aget(self._hash_key(query, mode))
+        except Exception:
+            self._errors += 1
+            value = None
+        return self._count(value)
+
+    def _count(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
             self._misses += 1
             return None
-        entry.hit_count += 1
         self._hits += 1
-        return entry.value
+        return value
 
     def put(self, query: str, mode: str, value: str) -> None:
         """Store a response in the cache."""
-        if len(self._store) >= self._max_size:
-            self._evict_oldest()
-        key = self._hash_key(query, mode)
-        self._store[key] = CacheEntry(value=value, created_at=time.time())
+        try:
+            self._backend.set(self._hash_key(query, mode), value)
+        except Exception:
+            self._errors += 1
+
+    async def aput(self, query: str, mode: str, value: str) -> None:
+        """put() without blocking the event loop on shared backends."""
+        try:
+            await self._backend.aset(self._hash_key(query, mode), value)
+        except Exception:
+            self._errors += 1
 
     def invalidate(self, query: str, mode: str) -> bool:
         """Remove a specific entry. Returns True if it existed."""
-        key = self._hash_key(query, mode)
-        return self._store.pop(key, None) is not None
+        return self._backend.delete(self._hash_key(query, mode))
 
     def clear(self) -> None:
-        self._store.clear()
+        self._backend.clear()
 
-    def _evict_oldest(self) -> None:
-        """Remove the oldest entry to make room."""
-        if not self._store:
-            return
-        oldest_key = min(self._store, key=lambda k: self._store[k].created_at)
-        del self._store[oldest_key]
+    def close(self) -> None:
+        self._backend.close()
 
     @property
     def stats(self) -> Dict[str, Any]:
+        return self._with_counters(self._backend.stats)
+
+    async def astats(self) -> Dict[str, Any]:
+        """stats without querying a shared backend on the event loop."""
+        return self._with_counters(await self._backend.astats())
+
+    def _with_counters(self, backend_stats: Dict[str, Any]) -> Dict[str, Any]:
         total = self._hits + self._misses
         return {
-            "size": len(self._store),
+            **backend_stats,
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": round(self._hits / total, 4) if total > 0 else 0.0,
+            "errors": self._errors,
         }
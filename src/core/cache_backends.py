@@ -0,0 +1,292 @@
+"""Shared cache backends for ResponseCache.
+
+The default MemoryCacheBackend is per process: with N uvicorn workers there
+are N cold caches and a restart wipes them. The backends here are shared by
+every worker on a host (SQLite file) or across hosts (Redis), and survive
+restarts.
+
+Selected by `system1.cache_backend` in cognitive_features.yaml:
+    memory  - per-process LRU (default)
+    sqlite  - file at `system1.cache_path`, WAL mode, safe for many processes
+    redis   - `system1.cache_redis_url` (requires the `redis` package);
+              set `system1.cache_redis_dedicated_db` when the cache owns that
+              DB, so size is DBSIZE and clear is FLUSHDB instead of key scans
+
+Both do blocking I/O (`blocking_io`): the async aget/aset used on request
+paths run them in a worker thread, including SQLite compaction.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache import CacheBackend, MemoryCacheBackend, DEFAULT_MAX_BYTES, KEY_OVERHEAD
+from .logger import structured_logger
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk cache shared by all processes on a host.
+
+    - WAL journal + busy timeout: concurrent readers, serialized writers
+    - wall-clock TTL (expires_at), so entries survive restarts correctly
+    - LRU by last_access; size caps (entries, bytes) are enforced by
+      `compact()`, which runs every `compact_every` writes, so caps are soft
+      by at most that many entries between compactions
+    """
+
+    blocking_io = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key         TEXT PRIMARY KEY,
+            value       TEXT NOT NULL,
+            size        INTEGER NOT NULL,
+            expires_at  REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at);
+        CREATE INDEX IF NOT EXISTS idx_cache_access ON cache_entries(last_access);
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: int = 300,
+        max_size: int = 1000,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compact_every: int = 100,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.path = Path(path)
+        self._ttl = ttl
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._compact_every = compact_every
+        self._busy_timeout_ms = busy_timeout_ms
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes_since_compact = 0
+        # Stats for this process
+        self._evictions = 0
+        self._expirations = 0
+        self._compactions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not be shared across fork
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path), timeout=self._busy_timeout_ms / 1000,
+                isolation_level=None, check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            conn.executescript(self._SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, now)
+                )
+                self._expirations += 1
+                return None
+            conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8", errors="replace")) + KEY_OVERHEAD
+        if size > self._max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self._ttl, now),
+            )
+            self._writes_since_compact += 1
+            due = self._writes_since_compact >= self._compact_every
+        if due:
+            self.compact()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cur = self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return cur.rowcount > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM cache_entries")
+
+    def compact(self, vacuum: bool = False) -> Dict[str, int]:
+        """Drop expired entries, enforce entry/byte caps (LRU), checkpoint WAL."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = conn.execute(
+                    "DELETE FROM cache_entries WHERE expires_at <= ?", (now,)
+                ).rowcount
+                over_count = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    "  SELECT key FROM cache_entries ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+                    ")",
+                    (self._max_size,),
+                ).rowcount
+                over_bytes = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    "  SELECT key FROM ("
+                    "    SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running"
+                    "    FROM cache_entries"
+                    "  ) WHERE running > ?"
+                    ")",
+                    (self._max_bytes,),
+                ).rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                conn.execute("VACUUM")
+            self._writes_since_compact = 0
+            self._expirations += expired
+            self._evictions += over_count + over_bytes
+            self._compactions += 1
+        return {"expired": expired, "evicted": over_count + over_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "size": count,
+            "bytes": total,
+            "max_bytes": self._max_bytes,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "compactions": self._compactions,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache shared across hosts.
+
+    TTL is native (SET ... EX). Size caps and LRU eviction are delegated to the
+    server (`maxmemory` + `maxmemory-policy allkeys-lru`); `max_bytes` only
+    rejects single values larger than the cap.
+
+    Counting or clearing the cache's keys in a shared DB needs a keyspace
+    scan, so `stats` reports size only with `dedicated_db` (DBSIZE), and
+    `clear` is FLUSHDB there.
+    """
+
+    blocking_io = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        ttl: int = 300,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        prefix: str = "quitcode:response_cache:",
+        dedicated_db: bool = False,
+    ):
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._ttl = max(1, int(ttl))
+        self._max_bytes = max_bytes
+        self._prefix = prefix
+        self._dedicated_db = dedicated_db
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: str) -> None:
+        if len(value.encode("utf-8", errors="replace")) + KEY_OVERHEAD > self._max_bytes:
+            return
+        self._client.set(self._prefix + key, value, ex=self._ttl)
+
+    def delete(self, key: str) -> bool:
+        return bool(self._client.delete(self._prefix + key))
+
+    def clear(self) -> None:
+        if self._dedicated_db:
+            self._client.flushdb()
+            return
+        keys = list(self._client.scan_iter(match=self._prefix + "*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+    def close(self) -> None:
+        self._client.close()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        info = self._client.info("stats")
+        return {
+            "backend": "redis",
+            "size": self._client.dbsize() if self._dedicated_db else None,
+            "bytes": None,
+            "max_bytes": self._max_bytes,
+            "evictions": info.get("evicted_keys", 0),
+            "expirations": info.get("expired_keys", 0),
+        }
+
+
+def create_cache_backend(
+    backend: str = "memory",
+    ttl: int = 300,
+    max_size: int = 1000,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    path: Optional[str] = None,
+    redis_url: Optional[str] = None,
+    redis_dedicated_db: bool = False,
+) -> CacheBackend:
+    """Build the configured backend; falls back to memory if it is unavailable."""
+    try:
+        if backend == "sqlite":
+            from .utils import get_project_root
+            db_path = Path(path or "data/cache/response_cache.db")
+            if not db_path.is_absolute():
+                db_path = get_project_root() / db_path
+            return SQLiteCacheBackend(db_path, ttl=ttl, max_size=max_size, max_bytes=max_bytes)
+        if backend == "redis":
+            return RedisCacheBackend(
+                url=redis_url or "redis://localhost:6379/0", ttl=ttl, max_bytes=max_bytes,
+                dedicated_db=redis_dedicated_db,
+            )
+    except Exception as e:
+        structured_logger.warning(f"Cache backend '{backend}' unavailable, using memory: {e}")
+    else:
+        if backend != "memory":
+            structured_logger.warning(f"Unknown cache backend '{backend}', using memory")
+    return MemoryCacheBackend(ttl=ttl, max_size=max_size, max_bytes=max_bytes)
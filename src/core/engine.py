@@ -4,6 +4,7 @@
 """
 
 import asyncio
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -14,8 +15,15 @@ from .feature_flags import feature_flags
 from .router import DefaultRouter
 from .runtime import ModelRuntime, AgentRuntime
 from .metrics import CognitiveMetrics
+from .histogram import REQUEST_DURATION
 from .service_initializer import ServiceInitializer
 from .context import ContextManager, TodoRecitation, ErrorPreservation, TemplateRandomizer, FileBasedMemory
+from .request_scope import current_scope, request_scope
+from .event_channel import EventChannel, cancel_producer
+from .admission import AdmissionController, AdmissionRejected
+from .llm_scheduler import LLMScheduler
+from .retry_budget import RetryBudget
+from .tracing import current_span, span, start_trace
 
 
 class RefactoredEngine:
@@ -38,29 +46,44 @@ class RefactoredEngine:
         """
         self.llm_client = llm_client
         self.config = config or {}
-        self.processor_factory = ProcessorFactory(llm_client)
+        # Priority-aware LLM scheduling shared by all processors (None when disabled)
+        self._llm_scheduler = (
+            LLMScheduler.from_flags(feature_flags)
+            if feature_flags.is_enabled("llm_scheduler.enabled") else None
+        )
+        if feature_flags.is_enabled("llm_hedging.enabled"):
+            self._configure_hedging()
+        self.processor_factory = ProcessorFactory(self._processor_llm_client)
         self.logger = structured_logger
         self.feature_flags = feature_flags
         self.router = DefaultRouter(feature_flags)
-        self._model_runtime = ModelRuntime(llm_client, self.processor_factory)
-        self._agent_runtime = AgentRuntime(llm_client, self.processor_factory)
+        self._model_runtime = ModelRuntime(self._processor_llm_client, self.processor_factory)
+        self._agent_runtime = AgentRuntime(self._processor_llm_client, self.processor_factory)
         self._metrics = CognitiveMetrics()
+        # Admission control per cognitive level (None when disabled)
+        self._admission = (
+            AdmissionController.from_flags(feature_flags, metrics=self._metrics)
+            if feature_flags.is_enabled("admission.enabled") else None
+        )
         self._mcp_client = None
         self._a2a_client = None
         self._package_manager = None
         self.initialized = False
 
         # Context Engineering (Manus-aligned, feature-flag controlled)
+        # ContextManager / TodoRecitation hold per-request state: the instances
+        # created here are only the out-of-request fallback, process() gives
+        # every request its own pair through the request scope.
         self._ce_enabled = self.feature_flags.is_enabled("context_engineering.enabled")
         if self._ce_enabled and self.feature_flags.is_enabled("context_engineering.append_only_context"):
-            self.context_manager = ContextManager(self.feature_flags)
+            self._context_manager = ContextManager(self.feature_flags)
         else:
-            self.context_manager = None
+            self._context_manager = None
 
         if self._ce_enabled and self.feature_flags.is_enabled("context_engineering.todo_recitation"):
-            self._todo_recitation = TodoRecitation(self.feature_flags)
+            self._default_todo_recitation = TodoRecitation(self.feature_flags)
         else:
-            self._todo_recitation = None
+            self._default_todo_recitation = None
 
         self._error_preservation = (
             self._ce_enabled
@@ -80,6 +103,41 @@ class RefactoredEngine:
         else:
             self._file_memory = None
 
+    @property
+    def _processor_llm_client(self):
+        """LLM client handed to processors: routed through the scheduler when enabled."""
+        if self._llm_scheduler is None:
+            return self.llm_client
+        return self._llm_scheduler.wrap(self.llm_client)
+
+    def _configure_hedging(self) -> None:
+        """Enable hedged LLM calls for the configured modes (fallback chains only)."""
+        from services.llm.multi_provider import MultiProviderLLMClient
+        if not isinstance(self.llm_client, MultiProviderLLMClient):
+            return
+        self.llm_client.enable_hedging(
+            modes=feature_flags.get_value("llm_hedging.modes", ["chat", "knowledge"]),
+            budget=float(feature_flags.get_value("llm_hedging.budget", 0.05)),
+            default_delay_s=float(feature_flags.get_value("llm_hedging.default_delay_s", 2.0)),
+            min_delay_s=float(feature_flags.get_value("llm_hedging.min_delay_s", 0.2)),
+        )
+
+    @property
+    def context_manager(self) -> Optional[ContextManager]:
+        """Append-only context of the current request (None when disabled)."""
+        scope = current_scope()
+        if scope is not None and scope.context_manager is not None:
+            return scope.context_manager
+        return self._context_manager
+
+    @property
+    def _todo_recitation(self) -> Optional[TodoRecitation]:
+        """Todo plan of the current request (None when disabled)."""
+        scope = current_scope()
+        if scope is not None and scope.todo_recitation is not None:
+            return scope.todo_recitation
+        return self._default_todo_recitation
+
     async def initialize(self):
         """初始化引擎 — 建立外部服務（graceful degradation）
 
@@ -120,10 +178,10 @@ class RefactoredEngine:
 
         # Rebuild processor factory and runtimes with services
         self.processor_factory = ProcessorFactory(
-            self.llm_client, services=services, mcp_client=self._mcp_client
+            self._processor_llm_client, services=services, mcp_client=self._mcp_client
         )
-        self._model_runtime = ModelRuntime(self.llm_client, self.processor_factory)
-        self._agent_runtime = AgentRuntime(self.llm_client, self.processor_factory)
+        self._model_runtime = ModelRuntime(self._processor_llm_client, self.processor_factory)
+        self._agent_runtime = AgentRuntime(self._processor_llm_client, self.processor_factory)
 
         self.initialized = True
         self.logger.info(f"AI Engine initialized (services: {list(services.keys()) or 'none'})")
@@ -142,6 +200,31 @@ class RefactoredEngine:
         if not self.initialized:
             await self.initialize()
 
+        # 每個請求獨立的作用域：日誌 trace/context、SSE 回調、Context Engineering 狀態
+        context_manager = None
+        if self._context_manager is not None:
+            context_manager = ContextManager(self.feature_flags)
+        todo_recitation = None
+        if self._default_todo_recitation is not None:
+            todo_recitation = TodoRecitation(self.feature_flags)
+
+        # 共享重試預算：所有重試層（fallback、decorator、runtime）共用同一額度與截止時間
+        retry_budget = None
+        if self.feature_flags.is_enabled("retry_budget.enabled"):
+            retry_budget = RetryBudget.from_flags(self.feature_flags)
+
+        with request_scope(
+            trace_id=request.trace_id,
+            context_manager=context_manager,
+            todo_recitation=todo_recitation,
+            retry_budget=retry_budget,
+        ), start_trace("request", request.trace_id, query_chars=len(request.query)) as root:
+            response = await self._process_in_scope(request)
+            root.set_attributes(mode=str(response.mode), tokens=response.tokens_used)
+            return response
+
+    async def _process_in_scope(self, request: Request) -> Response:
+        """Process a request inside its own RequestScope."""
         # 設置日誌上下文
         self.logger.set_trace(request.trace_id)
         self.logger.set_context(
@@ -157,12 +240,10 @@ class RefactoredEngine:
         )
         context = ProcessingContext(request=request, response=response)
 
-        # Context Engineering: reset and append user query
+        # Context Engineering: append user query (fresh per-request instances)
         if self.context_manager:
-            self.context_manager.reset()
             self.context_manager.append_user(request.query)
         if self._todo_recitation:
-            self._todo_recitation.reset()
             self._todo_recitation.create_initial_plan(request.query, str(request.mode))
 
         try:
@@ -180,9 +261,20 @@ class RefactoredEngine:
             ))
 
             # Route the request
-            decision = await self.router.route(request)
+            with span("route"):
+                decision = await self.router.route(request)
             request.mode = decision.mode
             response.mode = decision.mode
+            scope = current_scope()
+            if scope is not None:
+                scope.mode = str(request.mode)
+                scope.cognitive_level = request.mode.cognitive_level
+                if scope.retry_budget is not None:
+                    deadline_s = self.feature_flags.get_value(
+                        f"retry_budget.deadline_s.{request.mode.cognitive_level}", None
+                    )
+                    if deadline_s is not None:
+                        scope.retry_budget.set_deadline(float(deadline_s))
 
             self.logger.log_tool_decision(
                 tool=str(decision.mode),
@@ -190,9 +282,15 @@ class RefactoredEngine:
                 reason=decision.reason,
             )
 
-            # Execute via runtime dispatch or legacy path
-            with self.logger.measure(f"process_{request.mode}"):
-                result = await self._execute(decision, context)
+            # Execute via runtime dispatch or legacy path (behind admission control)
+            admission = (
+                self._admission.admit(request.mode.cognitive_level)
+                if self._admission else nullcontext()
+            )
+            async with admission:
+                with self.logger.measure(f"process_{request.mode}"), \
+                        span("process", mode=str(request.mode)):
+                    result = await self._execute(decision, context)
 
             # Context Engineering: append assistant result
             if self.context_manager:
@@ -215,7 +313,8 @@ class RefactoredEngine:
             # SSE: 最終結果
             response.add_event(EventType.RESULT, result)
 
-            # Record cognitive metrics (when enabled)
+            # Latency histogram (always on) + cognitive metrics (when enabled)
+            REQUEST_DURATION.observe(response.time_ms / 1000, mode=request.mode, outcome="ok")
             if self.feature_flags.is_enabled("metrics.cognitive_metrics"):
                 self._metrics.record_request(
                     cognitive_level=request.mode.cognitive_level,
@@ -226,8 +325,34 @@ class RefactoredEngine:
 
             return response
 
+        except AdmissionRejected:
+            # 過載：交給 API 層回應 429 + Retry-After
+            REQUEST_DURATION.observe(
+                context.get_elapsed_time() / 1000, mode=request.mode, outcome="rejected"
+            )
+            raise
+
+        except asyncio.CancelledError:
+            # 客戶端斷線：停止處理並記錄被取消的工作，不回傳錯誤響應
+            REQUEST_DURATION.observe(
+                context.get_elapsed_time() / 1000, mode=request.mode, outcome="cancelled"
+            )
+            self._metrics.record_cancellation(
+                request.mode.cognitive_level, context.get_elapsed_time()
+            )
+            self.logger.info(
+                "Request cancelled",
+                time_ms=context.get_elapsed_time(),
+                request_mode=str(request.mode),
+            )
+            raise
+
         except Exception as e:
             # Record failure metric
+            current_span().record_error(e)
+            REQUEST_DURATION.observe(
+                context.get_elapsed_time() / 1000, mode=request.mode, outcome="error"
+            )
             if self.feature_flags.is_enabled("metrics.cognitive_metrics"):
                 self._metrics.record_request(
                     cognitive_level=request.mode.cognitive_level,
@@ -324,47 +449,45 @@ class RefactoredEngine:
     async def process_stream(self, request: Request):
         """Async generator that yields SSE events during processing.
 
-        Uses an asyncio.Queue to bridge the callback-based logger SSE
-        system into a true async generator.
+        Events are published to a per-request EventChannel carried in the
+        request scope; the generator wakes as soon as an event is put and
+        ends when the channel is closed.
         """
-        import json
         request.stream = True
-
-        event_queue: asyncio.Queue = asyncio.Queue()
-        done = asyncio.Event()
-
-        def sse_callback(signal, data):
-            event_queue.put_nowait({"event": signal, "data": data})
-
-        self.logger.set_sse_callback(sse_callback)
+        channel = EventChannel()
 
         async def _run():
             try:
-                resp = await self.process(request)
-                event_queue.put_nowait({
-                    "event": EventType.RESULT.value,
-                    "data": {"response": resp.result, "trace_id": resp.trace_id},
+                with request_scope(trace_id=request.trace_id, event_channel=channel):
+                    resp = await self.process(request)
+                channel.publish(
+                    EventType.RESULT.value,
+                    {"response": resp.result, "trace_id": resp.trace_id},
+                )
+            except AdmissionRejected as e:
+                channel.publish(EventType.ERROR.value, {
+                    "message": str(e), "code": "OVERLOADED", "retry_after": e.retry_after,
                 })
             except Exception as e:
-                event_queue.put_nowait({
-                    "event": EventType.ERROR.value,
-                    "data": {"message": str(e)},
-                })
+                channel.publish(EventType.ERROR.value, {"message": str(e)})
             finally:
-                done.set()
+                channel.close()
 
         task = asyncio.create_task(_run())
 
         try:
-            while not done.is_set() or not event_queue.empty():
-                try:
-                    evt = await asyncio.wait_for(event_queue.get(), timeout=0.1)
-                    yield evt
-                except asyncio.TimeoutError:
-                    continue
+            async for evt in channel:
+                yield {"event": evt.event, "data": evt.data}
         finally:
-            if not task.done():
-                task.cancel()
+            stopped = await cancel_producer(task)
+            stats = channel.stats
+            self._metrics.record_stream(
+                stats["delivered"],
+                stats["avg_emit_to_write_ms"],
+                stats["max_emit_to_write_ms"],
+                disconnected=stopped is not None,
+                cancel_timeout=stopped is False,
+            )
 
     @property
     def metrics(self):
@@ -11,6 +11,7 @@ import logging
 from typing import List, Optional
 
 from .errors import ErrorClassifier, ErrorCategory
+from .retry_budget import allow_retry
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,8 @@ def enhanced_error_handler(
 ):
     """Decorator that adds retry with exponential backoff to async processor methods.
 
+    Retries also draw from the request's shared retry budget (core.retry_budget).
+
     Args:
         max_retries: Maximum number of retry attempts.
         retryable_categories: Error category names that should trigger a retry
@@ -58,6 +61,8 @@ def enhanced_error_handler(
                         raise
 
                     delay = base_delay * (2 ** attempt)
+                    if not allow_retry(delay):
+                        raise
                     logger.warning(
                         "Retry %d/%d after %.1fs (%s): %s",
                         attempt + 1, max_retries, delay, category.value, e,
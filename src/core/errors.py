@@ -11,6 +11,8 @@ import logging
 from enum import Enum
 from typing import Any, Callable, Optional, TypeVar
 
+from .retry_budget import allow_retry
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -78,7 +80,8 @@ async def retry_with_backoff(
 ) -> Any:
     """Call an async function with exponential backoff retry.
 
-    Retries only for network/LLM errors (classified as retryable).
+    Retries only for network/LLM errors (classified as retryable), and only
+    while the request's retry budget and deadline allow (core.retry_budget).
     """
     last_error: Optional[Exception] = None
     for attempt in range(max_retries + 1):
@@ -89,6 +92,8 @@ async def retry_with_backoff(
             if attempt >= max_retries or not ErrorClassifier.is_retryable(e):
                 raise
             delay = base_delay * (2 ** attempt)
+            if not allow_retry(delay):
+                raise
             logger.warning(
                 "Retry %d/%d after %.1fs: %s",
                 attempt + 1, max_retries, delay, e,
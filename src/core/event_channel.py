@@ -0,0 +1,126 @@
+"""Per-request SSE event channel.
+
+Processors publish through the logger (`emit_sse`), which forwards to the
+EventChannel bound to the current RequestScope. The streaming endpoint
+consumes the channel as an async iterator that wakes as soon as an event is
+put and ends on the close sentinel, so there is no polling interval between
+emit and SSE write and no shared callback to overwrite.
+
+Usage:
+    channel = EventChannel()
+    with request_scope(event_channel=channel):
+        ...                       # emit_sse -> channel.publish
+    channel.close()
+
+    async for evt in channel:     # in the SSE generator
+        yield evt.event, evt.data
+
+When the consumer goes away early (client disconnect), `cancel_producer`
+cancels the task publishing into the channel and waits for it to unwind, so
+no request keeps running for a reader that is gone.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+@dataclass
+class ChannelEvent:
+    """One published event plus its emit timestamp (perf_counter)."""
+    event: str
+    data: Any
+    emitted_at: float
+
+
+_CLOSED = object()
+
+# How long a cancelled producer gets to run its cleanup before we stop waiting
+CANCEL_GRACE_S = 5.0
+
+
+class EventChannel:
+    """Single-consumer async event queue scoped to one request."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+        except RuntimeError:
+            pass
+        self._closed = False
+        # Emit -> delivery latency (delivery = consumer asked for the next event,
+        # i.e. the previous one has been written to the client)
+        self._delivered = 0
+        self._total_latency_ms = 0.0
+        self._max_latency_ms = 0.0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, event: str, data: Any) -> None:
+        """Enqueue an event. Safe to call from worker threads."""
+        if self._closed:
+            return
+        self._put(ChannelEvent(event=event, data=data, emitted_at=time.perf_counter()))
+
+    def close(self) -> None:
+        """End the stream once all previously published events are consumed."""
+        if self._closed:
+            return
+        self._closed = True
+        self._put(_CLOSED)
+
+    def _put(self, item: Any) -> None:
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        else:
+            self._queue.put_nowait(item)
+
+    async def __aiter__(self) -> AsyncIterator[ChannelEvent]:
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSED:
+                return
+            yield item
+            self._record_delivery(item)
+
+    def _record_delivery(self, item: ChannelEvent) -> None:
+        latency_ms = (time.perf_counter() - item.emitted_at) * 1000
+        self._delivered += 1
+        self._total_latency_ms += latency_ms
+        if latency_ms > self._max_latency_ms:
+            self._max_latency_ms = latency_ms
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delivered": self._delivered,
+            "avg_emit_to_write_ms": (
+                round(self._total_latency_ms / self._delivered, 3) if self._delivered else 0.0
+            ),
+            "max_emit_to_write_ms": round(self._max_latency_ms, 3),
+        }
+
+
+async def cancel_producer(task: "asyncio.Task", grace_s: float = CANCEL_GRACE_S) -> Optional[bool]:
+    """Cancel a channel's producer task and wait for it to finish unwinding.
+
+    Returns None if the task had already finished, True once a cancelled task
+    has stopped, and False if it is still running after `grace_s` (its result
+    is then retrieved in the background, so nothing is left unobserved).
+    """
+    if task.done():
+        return None
+    task.cancel()
+    await asyncio.wait({task}, timeout=grace_s)
+    if task.done():
+        return True
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return False
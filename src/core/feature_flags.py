@@ -15,6 +15,14 @@ _DEFAULT_CONFIG = {
             "enable_cache": False,
             "cache_ttl": 300,
             "cache_max_size": 1000,
+            "cache_max_bytes": 64 * 1024 * 1024,
+            "cache_backend": "memory",
+            "cache_path": "data/cache/response_cache.db",
+            "cache_redis_url": "redis://localhost:6379/0",
+            "cache_redis_dedicated_db": False,
+            "semantic_cache": False,
+            "semantic_threshold": 0.92,
+            "semantic_max_size": 1000,
         },
         "system2": {
             "enable_thinking_chain": False,
@@ -61,6 +69,46 @@ _DEFAULT_CONFIG = {
             "file_memory_workspace": ".agent_workspace",
             "compress_keep_last": 10,
         },
+        # Admission control per cognitive level
+        "admission": {
+            "enabled": False,
+            "system1": {"max_concurrent": 64, "max_queue": 256, "queue_timeout": 5},
+            "system2": {"max_concurrent": 16, "max_queue": 64, "queue_timeout": 15},
+            "agent": {"max_concurrent": 2, "max_queue": 8, "queue_timeout": 30},
+        },
+        # Prompt-level LLM memoization
+        "llm_memo": {
+            "enabled": False,
+            "scope": "trace",
+            "ttl": 86400,
+            "max_entries": 10000,
+            "path": "data/cache/llm_memo.db",
+        },
+        # Priority-aware LLM call scheduling
+        "llm_scheduler": {
+            "enabled": False,
+            "aging_seconds": 5.0,
+            "max_concurrency": {"default": 8},
+        },
+        # Hedged LLM calls across providers
+        "llm_hedging": {
+            "enabled": False,
+            "modes": ["chat", "knowledge"],
+            "budget": 0.05,
+            "default_delay_s": 2.0,
+            "min_delay_s": 0.2,
+        },
+        # Request-level retry budget shared by all retry layers
+        "retry_budget": {
+            "enabled": False,
+            "max_retries": 4,
+            "deadline_s": {"default": None, "system1": 30, "system2": 120, "agent": 600},
+        },
+        # Hierarchical tracing spans (OTLP-JSON files)
+        "tracing": {
+            "enabled": False,
+            "dir": "data/traces",
+        },
     }
 }
 
@@ -0,0 +1,269 @@
+"""Fixed-memory latency histograms with OpenMetrics export.
+
+CognitiveMetrics keeps sums and averages per cognitive level, which hides the
+tail: a p99 of 40 s disappears in an average of 3 s, and nothing is broken
+down per provider or per pipeline stage. This module adds HDR-style log
+bucket histograms for the latencies that matter when tuning:
+
+    quitcode_request_duration_seconds    {mode, outcome}
+    quitcode_llm_call_duration_seconds   {provider, model, call}
+    quitcode_search_duration_seconds     {provider}
+    quitcode_fetch_duration_seconds      {outcome}
+    quitcode_sandbox_execution_seconds   {language}
+    quitcode_queue_wait_seconds          {queue, pool}
+
+Buckets: every power of two between 2^-14 s (~61 us) and 2^11 s (~34 min)
+is split into SUB_BUCKETS linear sub-buckets, so any recorded value is
+known to within 1/SUB_BUCKETS of its octave (<= 12.5 %) whatever its
+magnitude. Smaller values land in an underflow bucket, larger ones in an
+overflow bucket. Each label set owns one fixed list of ints (~200 slots),
+so memory does not grow with traffic.
+
+Recording is lock-free: `observe()` is a frexp, two int ops and a float add.
+Label sets are created on first use with dict.setdefault (atomic under the
+GIL). Concurrent observers in different threads can in rare cases lose an
+increment, which is acceptable for monitoring and keeps the hot path free of
+locks, so the histograms stay on in production.
+
+`/metrics` renders the registry in OpenMetrics text format. Exported `le`
+boundaries are the octave edges (exact, since sub-buckets never straddle
+them); quantiles in `summary()` interpolate within the fine buckets.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SUB_BUCKETS = 8
+MIN_EXP = -14  # lowest tracked value: 2^MIN_EXP seconds
+MAX_EXP = 11   # highest tracked value: 2^MAX_EXP seconds
+_OCTAVES = MAX_EXP - MIN_EXP
+_NUM_BUCKETS = 1 + _OCTAVES * SUB_BUCKETS + 1  # underflow + octaves + overflow
+_MIN_VALUE = 2.0 ** MIN_EXP
+_MAX_VALUE = 2.0 ** MAX_EXP
+
+
+def _bucket_index(value: float) -> int:
+    if value < _MIN_VALUE:
+        return 0
+    if value >= _MAX_VALUE:
+        return _NUM_BUCKETS - 1
+    mantissa, exp = math.frexp(value)  # value = mantissa * 2**exp, 0.5 <= mantissa < 1
+    return 1 + (exp - 1 - MIN_EXP) * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def _bucket_bounds(index: int) -> Tuple[float, float]:
+    """(lower, upper) of bucket `index`; the overflow bucket's upper is inf."""
+    if index == 0:
+        return 0.0, _MIN_VALUE
+    if index == _NUM_BUCKETS - 1:
+        return _MAX_VALUE, math.inf
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    base = 2.0 ** (MIN_EXP + octave)
+    return base * (1 + sub / SUB_BUCKETS), base * (1 + (sub + 1) / SUB_BUCKETS)
+
+
+# Exported `le` edges: bucket index of the first bucket above each octave edge
+_EXPORT_EDGES: List[Tuple[float, int]] = [
+    (2.0 ** (MIN_EXP + octave), 1 + octave * SUB_BUCKETS) for octave in range(_OCTAVES + 1)
+]
+
+
+class LatencyHistogram:
+    """One label set: bucket counts plus the sum of observed values."""
+
+    __slots__ = ("_counts", "sum")
+
+    def __init__(self):
+        self._counts = [0] * _NUM_BUCKETS
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value in seconds (negative values count as 0)."""
+        if value < 0:
+            value = 0.0
+        self._counts[_bucket_index(value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0..1), interpolated within its bucket."""
+        counts = list(self._counts)
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower, upper = _bucket_bounds(index)
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * max(0.0, rank - seen) / n
+            seen += n
+        return _bucket_bounds(_NUM_BUCKETS - 1)[0]
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(le, cumulative count) at each exported edge, ending with +Inf."""
+        counts = list(self._counts)
+        out = []
+        running = 0
+        start = 0
+        for edge, stop in _EXPORT_EDGES:
+            running += sum(counts[start:stop])
+            start = stop
+            out.append((edge, running))
+        out.append((math.inf, running + sum(counts[start:])))
+        return out
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": round(self.quantile(0.50), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+
+class HistogramFamily:
+    """A named histogram with one LatencyHistogram per label set."""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names: Tuple[str, ...] = tuple(labels)
+        self._children: Dict[Tuple[str, ...], LatencyHistogram] = {}
+
+    def labels(self, **labels: Any) -> LatencyHistogram:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, LatencyHistogram())
+        return child
+
+    def observe(self, value: float, **labels: Any) -> None:
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager that observes the wall time of its block."""
+        return _Timer(self.labels(**labels))
+
+    def items(self) -> List[Tuple[Dict[str, str], LatencyHistogram]]:
+        return [
+            (dict(zip(self.label_names, key)), child)
+            for key, child in sorted(self._children.items())
+        ]
+
+    def reset(self) -> None:
+        self._children = {}
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in labels.items()]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_le(edge: float) -> str:
+    return "+Inf" if math.isinf(edge) else repr(edge)
+
+
+class HistogramRegistry:
+    """Process-wide set of histogram families."""
+
+    def __init__(self):
+        self._families: Dict[str, HistogramFamily] = {}
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = ()) -> HistogramFamily:
+        """Get or create the family `name`."""
+        family = self._families.get(name)
+        if family is None:
+            family = self._families.setdefault(name, HistogramFamily(name, documentation, labels))
+        return family
+
+    def render_openmetrics(self) -> str:
+        """All families in OpenMetrics text format (terminated by # EOF)."""
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.append(f"# TYPE {family.name} histogram")
+            lines.append(f"# UNIT {family.name} seconds")
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            for labels, child in family.items():
+                buckets = child.cumulative()
+                for edge, count in buckets:
+                    lines.append(
+                        f"{family.name}_bucket{_format_labels(labels, ('le', _format_le(edge)))} {count}"
+                    )
+                lines.append(f"{family.name}_count{_format_labels(labels)} {buckets[-1][1]}")
+                lines.append(f"{family.name}_sum{_format_labels(labels)} {child.sum!r}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, List[Dict[str, Any]]]:
+        """count / sum / p50 / p95 / p99 per label set, for the JSON metrics."""
+        return {
+            family.name: [{**labels, **child.snapshot()} for labels, child in family.items()]
+            for family in self._families.values()
+            if family._children
+        }
+
+    def reset(self) -> None:
+        for family in self._families.values():
+            family.reset()
+
+
+histograms = HistogramRegistry()
+
+REQUEST_DURATION = histograms.histogram(
+    "quitcode_request_duration_seconds",
+    "End-to-end engine request latency.",
+    ("mode", "outcome"),
+)
+LLM_CALL_DURATION = histograms.histogram(
+    "quitcode_llm_call_duration_seconds",
+    "LLM provider call latency (full stream for streamed calls).",
+    ("provider", "model", "call"),
+)
+SEARCH_DURATION = histograms.histogram(
+    "quitcode_search_duration_seconds",
+    "Web search latency including fallback.",
+    ("provider",),
+)
+FETCH_DURATION = histograms.histogram(
+    "quitcode_fetch_duration_seconds",
+    "Web page / PDF fetch and text extraction latency.",
+    ("outcome",),
+)
+SANDBOX_EXECUTION = histograms.histogram(
+    "quitcode_sandbox_execution_seconds",
+    "Sandbox code execution time.",
+    ("language",),
+)
+QUEUE_WAIT = histograms.histogram(
+    "quitcode_queue_wait_seconds",
+    "Time spent waiting for admission, an LLM scheduler slot or rate limit capacity.",
+    ("queue", "pool"),
+)
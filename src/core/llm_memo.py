@@ -0,0 +1,146 @@
+"""Prompt-level LLM memoization.
+
+Deep research retries (`_execute_with_retry`, AgentRuntime's retry_with_backoff)
+re-run the workflow from the report plan onward and pay again for every LLM
+call that already succeeded. LLMMemo stores completions keyed on
+(model, prompt hash, temperature, max_tokens) so replays, retries and
+benchmark reruns reuse them.
+
+Scopes:
+    trace  - key also includes the request trace_id: only retries within the
+             same request reuse completions (default, safe for live traffic)
+    global - any request with an identical prompt reuses it until TTL
+
+Storage is a SQLiteCacheBackend file, shared by workers and kept across
+restarts. Controlled by feature flag `llm_memo.enabled`.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import CacheBackend
+from .cache_backends import SQLiteCacheBackend
+from .feature_flags import feature_flags
+
+
+class LLMMemo:
+    """Completion store keyed on model + prompt + sampling parameters."""
+
+    SCOPES = ("trace", "global")
+
+    def __init__(self, backend: CacheBackend, scope: str = "trace"):
+        if scope not in self.SCOPES:
+            raise ValueError(f"Unknown llm_memo scope: {scope}")
+        self._backend = backend
+        self.scope = scope
+        self._hits = 0
+        self._misses = 0
+        self._tokens_saved = 0
+
+    def key(
+        self,
+        model: str,
+        prompt: str,
+        temperature: Any = None,
+        max_tokens: Any = None,
+        trace_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Memo key, or None when a trace-scoped call has no trace."""
+        if self.scope == "trace" and not trace_id:
+            return None
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8", errors="replace")).hexdigest()
+        parts = [str(model), prompt_hash, repr(temperature), repr(max_tokens)]
+        if self.scope == "trace":
+            parts.append(trace_id)
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Tuple[str, Dict[str, int]]]:
+        """Return (response, token_info) or None."""
+        if key is None:
+            return None
+        try:
+            raw = self._backend.get(key)
+        except Exception:
+            raw = None
+        return self._decode(raw)
+
+    async def aget(self, key: Optional[str]) -> Optional[Tuple[str, Dict[str, int]]]:
+        """get() without blocking the event loop on the SQLite file."""
+        if key is None:
+            return None
+        try:
+            raw = await self._backend.aget(key)
+        except Exception:
+            raw = None
+        return self._decode(raw)
+
+    def _decode(self, raw: Optional[str]) -> Optional[Tuple[str, Dict[str, int]]]:
+        if raw is None:
+            self._misses += 1
+            return None
+        record = json.loads(raw)
+        self._hits += 1
+        self._tokens_saved += record["token_info"].get("total_tokens", 0)
+        return record["response"], record["token_info"]
+
+    @staticmethod
+    def _storable(key: Optional[str], response: str) -> bool:
+        return key is not None and bool(response) and bool(response.strip())
+
+    def put(self, key: Optional[str], response: str, token_info: Dict[str, int]) -> None:
+        if not self._storable(key, response):
+            return
+        try:
+            self._backend.set(key, json.dumps({"response": response, "token_info": token_info}))
+        except Exception:
+            pass
+
+    async def aput(self, key: Optional[str], response: str, token_info: Dict[str, int]) -> None:
+        """put() without blocking the event loop on the SQLite file."""
+        if not self._storable(key, response):
+            return
+        try:
+            await self._backend.aset(key, json.dumps({"response": response, "token_info": token_info}))
+        except Exception:
+            pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scope": self.scope,
+            "hits": self._hits,
+            "misses": self._misses,
+            "tokens_saved": self._tokens_saved,
+        }
+
+
+_memo: Optional[LLMMemo] = None
+
+
+def get_llm_memo() -> Optional[LLMMemo]:
+    """Return the process-wide memo when `llm_memo.enabled`, else None."""
+    global _memo
+    if not feature_flags.is_enabled("llm_memo.enabled"):
+        return None
+    if _memo is None:
+        from .utils import get_project_root
+        path = Path(feature_flags.get_value("llm_memo.path", "data/cache/llm_memo.db"))
+        if not path.is_absolute():
+            path = get_project_root() / path
+        backend = SQLiteCacheBackend(
+            path,
+            ttl=feature_flags.get_value("llm_memo.ttl", 86400),
+            max_size=feature_flags.get_value("llm_memo.max_entries", 10000),
+        )
+        _memo = LLMMemo(backend, scope=feature_flags.get_value("llm_memo.scope", "trace"))
+    return _memo
+
+
+def reset_llm_memo() -> None:
+    """Drop the process-wide memo (tests, config reload)."""
+    global _memo
+    if _memo is not None:
+        _memo._backend.close()
+    _memo = None
@@ -0,0 +1,211 @@
+"""Priority-aware scheduler for LLM calls.
+
+Every processor calls `llm_client.generate()` directly, so without a scheduler
+a System 1 chat turn queues FIFO behind the dozens of calls a deep research
+run keeps in flight. LLMScheduler owns a slot pool per provider
+(`max_concurrency`) and hands free slots to waiting calls by priority class:
+
+    system1 (0)  <  system2 (1)  <  agent (2)
+
+The class comes from the cognitive level of the current request scope, which
+the engine sets after routing. Calls made outside a request get system2.
+
+Aging: a waiter's key is `enqueued_at + priority * aging_s`, so a call that
+has waited `aging_s` seconds outranks a fresh call one class above it. Keys
+never change after enqueue, so this is a plain heap and agent work is
+guaranteed to progress under a steady stream of chat traffic.
+
+ScheduledLLMClient wraps a provider with the same generate()/stream()
+interface; `LLMScheduler.wrap()` wraps each provider of a
+MultiProviderLLMClient separately so fallbacks draw from their own pool.
+Controlled by feature flag `llm_scheduler.enabled`.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Deque, Dict, List, Optional
+
+from .histogram import QUEUE_WAIT
+from .request_scope import current_scope
+
+
+PRIORITY_CLASSES: Dict[str, int] = {"system1": 0, "system2": 1, "agent": 2}
+
+
+class _ProviderSlots:
+    """Concurrency slots for one provider with a priority wait heap."""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self._heap: List[Any] = []  # [key, seq, future]
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._heap if not fut.done())
+
+    async def acquire(self, key: float) -> None:
+        if self.active < self.max_concurrency:
+            # Free slots imply no live waiters: release() hands slots over first
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, [key, next(self._seq), fut])
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just before the cancel: pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the best live waiter (active stays the same)
+        while self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+
+class LLMScheduler:
+    """Per-provider concurrency limits with priority classes and aging."""
+
+    WAIT_SAMPLES = 1000  # recent waits kept per class for p95
+
+    def __init__(
+        self,
+        max_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 8,
+        aging_s: float = 5.0,
+    ):
+        self._limits = dict(max_concurrency or {})
+        self._default_concurrency = default_concurrency
+        self.aging_s = aging_s
+        self._providers: Dict[str, _ProviderSlots] = {}
+        self._waits: Dict[str, Deque[float]] = {
+            level: deque(maxlen=self.WAIT_SAMPLES) for level in PRIORITY_CLASSES
+        }
+        self._calls: Dict[str, int] = {level: 0 for level in PRIORITY_CLASSES}
+
+    @classmethod
+    def from_flags(cls, flags) -> "LLMScheduler":
+        limits = dict(flags.get_value("llm_scheduler.max_concurrency", {}) or {})
+        default = int(limits.pop("default", 8))
+        return cls(
+            max_concurrency={name: int(n) for name, n in limits.items()},
+            default_concurrency=default,
+            aging_s=float(flags.get_value("llm_scheduler.aging_seconds", 5.0)),
+        )
+
+    def _slots(self, provider: str) -> _ProviderSlots:
+        slots = self._providers.get(provider)
+        if slots is None:
+            limit = self._limits.get(provider, self._default_concurrency)
+            slots = self._providers[provider] = _ProviderSlots(provider, limit)
+        return slots
+
+    @staticmethod
+    def current_level() -> str:
+        """Cognitive level of the calling request (system2 outside a request)."""
+        scope = current_scope()
+        level = getattr(scope, "cognitive_level", None) if scope is not None else None
+        return level if level in PRIORITY_CLASSES else "system2"
+
+    @asynccontextmanager
+    async def slot(self, provider: str, level: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one of `provider`'s slots for the duration of the block."""
+        level = level if level in PRIORITY_CLASSES else self.current_level()
+        slots = self._slots(provider)
+        start = time.monotonic()
+        await slots.acquire(start + PRIORITY_CLASSES[level] * self.aging_s)
+        waited = time.monotonic() - start
+        self._calls[level] += 1
+        self._waits[level].append(waited * 1000)
+        QUEUE_WAIT.observe(waited, queue="llm_scheduler", pool=level)
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def wrap(self, client: Any) -> Any:
+        """Return `client` routed through this scheduler (None stays None).
+
+        A MultiProviderLLMClient is kept and its providers are wrapped.
+        """
+        if client is None or isinstance(client, ScheduledLLMClient):
+            return client
+        from services.llm.multi_provider import MultiProviderLLMClient
+        if isinstance(client, MultiProviderLLMClient):
+            # In place: the chain's breakers/health stay the ones /health reports
+            client.providers = [self.wrap(p) for p in client.providers]
+            return client
+        return ScheduledLLMClient(client, self)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for level, waits in self._waits.items():
+            ordered = sorted(waits)
+            classes[level] = {
+                "calls": self._calls[level],
+                "avg_wait_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+                "p95_wait_ms": (
+                    round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+                    if ordered else 0.0
+                ),
+            }
+        return {
+            "aging_seconds": self.aging_s,
+            "providers": {
+                name: {
+                    "active": s.active,
+                    "waiting": s.waiting,
+                    "max_concurrency": s.max_concurrency,
+                }
+                for name, s in self._providers.items()
+            },
+            "classes": classes,
+        }
+
+
+class ScheduledLLMClient:
+    """LLM client wrapper: every call waits for a slot from the scheduler.
+
+    Exposes the same generate()/stream() interface as the wrapped provider;
+    other attributes (model_name, provider_name, ...) are delegated.
+    """
+
+    def __init__(self, client: Any, scheduler: LLMScheduler):
+        self._client = client
+        self._scheduler = scheduler
+        name = getattr(client, "provider_name", None)
+        self._provider = name if isinstance(name, str) else "default"
+        if not inspect.isasyncgenfunction(getattr(client, "stream", None)):
+            # Keep callers' streaming capability checks truthful
+            self.stream = getattr(client, "stream", None)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    async def generate(self, prompt: str, **kwargs):
+        async with self._scheduler.slot(self._provider):
+            return await self._client.generate(prompt, **kwargs)
+
+    async def stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
+        # The slot is held until the stream is exhausted or closed
+        async with self._scheduler.slot(self._provider):
+            async for chunk in self._client.stream(prompt, **kwargs):
+                yield chunk
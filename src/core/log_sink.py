@@ -0,0 +1,261 @@
+"""Non-blocking batched log sink.
+
+StructuredLogger used to open, append and close the daily log file (and print
+to the console) synchronously for every line, on the event loop. LogSink moves
+that I/O to one background writer thread:
+
+- callers only format the line and enqueue it (no syscalls on the loop)
+- the writer keeps the file handle open and writes whatever has queued up
+  as one batch (one write + flush per batch)
+- files rotate by day (quitcode_YYYYMMDD.log) and by size
+  (quitcode_YYYYMMDD.1.log, .2.log, ...); suffix and date format are
+  configurable for other append-only files (e.g. the JSONL usage ledger)
+- when the queue is full, lines are dropped and counted (or the caller waits
+  up to `block_timeout` seconds when backpressure is preferred)
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+
+class _Flush:
+    """Queue marker: signals `done` once everything before it is written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class LogSink:
+    """Queue-backed file (and console) sink with a background writer thread."""
+
+    DEFAULT_MAX_BYTES = 50 * 1024 * 1024   # rotate after 50MB per file
+    DEFAULT_MAX_QUEUE = 10000              # pending lines before dropping
+    DEFAULT_BATCH_SIZE = 1000              # max lines per write
+
+    def __init__(
+        self,
+        log_dir: Path,
+        prefix: str = "quitcode",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        block_timeout: float = 0.0,
+        suffix: str = ".log",
+        date_format: str = "%Y%m%d",
+    ):
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.suffix = suffix
+        self.date_format = date_format
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+
+        # Writer-thread state
+        self._file: Optional[BinaryIO] = None
+        self._day: Optional[str] = None
+        self._bytes = 0
+
+        # Stats
+        self._written = 0
+        self._dropped = 0
+        self._reported_dropped = 0
+        self._batches = 0
+        self._rotations = 0
+
+    # ── Producer side ──
+
+    def write(self, line: str, console_line: Optional[str] = None) -> bool:
+        """Enqueue one file line (and optional console line).
+
+        Never blocks unless `block_timeout` > 0. Returns False when the line
+        was dropped because the queue is full.
+        """
+        self._ensure_started()
+        item = (line, console_line)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if self.block_timeout > 0:
+                try:
+                    self._queue.put(item, timeout=self.block_timeout)
+                    return True
+                except queue.Full:
+                    pass
+        with self._drop_lock:
+            self._dropped += 1
+        return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every line enqueued so far is written."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queue, stop the writer and close the file."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "written": self._written,
+            "dropped": self._dropped,
+            "queued": self._queue.qsize(),
+            "batches": self._batches,
+            "rotations": self._rotations,
+        }
+
+    def _ensure_started(self) -> None:
+        # Restart after fork: the writer thread does not survive into children
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == pid:
+                return
+            if self._pid is not None and self._pid != pid:
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._file = None
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.prefix}-log-sink", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    # ── Writer thread ──
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not self._write_batch(batch):
+                    break
+        finally:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _write_batch(self, batch: List[Any]) -> bool:
+        """Write one batch. Returns False when a stop marker was seen."""
+        lines: List[str] = []
+        console: List[str] = []
+        markers: List[_Flush] = []
+        keep_running = True
+
+        for item in batch:
+            if item is _STOP:
+                keep_running = False
+            elif isinstance(item, _Flush):
+                markers.append(item)
+            else:
+                line, console_line = item
+                lines.append(line)
+                if console_line is not None:
+                    console.append(console_line)
+
+        dropped = self._dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            notice = self._format_drop_notice(dropped)
+            if notice is not None:
+                lines.append(notice)
+
+        if lines:
+            try:
+                self._write_lines(lines)
+            except Exception as e:  # never let logging kill the writer
+                sys.stderr.write(f"LogSink write failed: {e}\n")
+        if console:
+            try:
+                stream = sys.stdout
+                stream.write("\n".join(console) + "\n")
+                stream.flush()
+            except Exception:
+                pass
+
+        for marker in markers:
+            marker.done.set()
+        return keep_running
+
+    def _write_lines(self, lines: List[str]) -> None:
+        data = ("\n".join(lines) + "\n").encode("utf-8", errors="replace")
+        day = self._today()
+        if self._file is None or day != self._day:
+            self._open(day)
+        elif self._bytes and self._bytes + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._bytes += len(data)
+        self._written += len(lines)
+        self._batches += 1
+
+    def _today(self) -> str:
+        return datetime.now().strftime(self.date_format)
+
+    def _current_path(self, day: str) -> Path:
+        return self.log_dir / f"{self.prefix}_{day}{self.suffix}"
+
+    def _open(self, day: str) -> None:
+        if self._file:
+            self._file.close()
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        path = self._current_path(day)
+        self._file = open(path, "ab")
+        self._day = day
+        self._bytes = path.stat().st_size
+
+    def _rotate(self) -> None:
+        """Move the current file to the next free .N.log name and reopen."""
+        self._file.close()
+        self._file = None
+        path = self._current_path(self._day)
+        n = 1
+        while (self.log_dir / f"{self.prefix}_{self._day}.{n}{self.suffix}").exists():
+            n += 1
+        path.rename(self.log_dir / f"{self.prefix}_{self._day}.{n}{self.suffix}")
+        self._rotations += 1
+        self._open(self._day)
+
+    def _format_drop_notice(self, count: int) -> Optional[str]:
+        """Line recording dropped lines (None: only count them in stats)."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        return (
+            f"{timestamp} [{'WARNING':8}] [{'system':10}] [--------] "
+            f"{self.prefix}.log_sink | Dropped {count} log lines (queue full)"
+        )
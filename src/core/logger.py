@@ -12,6 +12,8 @@ from pathlib import Path
 from enum import Enum
 
 from .models_v2 import EventType, Event
+from .request_scope import RequestScope, current_scope, set_stage
+from .log_sink import LogSink
 
 
 # ANSI 顏色碼
@@ -63,17 +65,17 @@ class StructuredLogger:
         self.log_level = LogLevel[log_level]
         self.min_level_value = self._get_level_value(self.log_level)
 
-        # SSE 回調函數
-        self._sse_callback: Optional[Callable] = None
-
-        # 當前上下文
-        self.trace_id: Optional[str] = None
-        self.context: Dict[str, Any] = {}
+        # 請求外（CLI、啟動階段）使用的預設作用域；
+        # 請求內的 trace/context/SSE 回調存於 RequestScope（contextvar）
+        self._default_scope = RequestScope()
 
         # 初始化日誌目錄
         self.log_dir = Path(__file__).parent.parent.parent / "logs"
         self.log_dir.mkdir(exist_ok=True)
 
+        # 背景執行緒批次寫入（檔案 + 控制台），不在事件迴圈上做 I/O
+        self._sink = LogSink(self.log_dir, prefix=service_name)
+
     def _get_level_value(self, level: LogLevel) -> int:
         """獲取日誌等級數值"""
         level_values = {
@@ -85,22 +87,39 @@ class StructuredLogger:
         }
         return level_values.get(level, 20)
 
+    def _scope(self) -> RequestScope:
+        """當前請求作用域（無請求時回退到預設作用域）"""
+        return current_scope() or self._default_scope
+
+    @property
+    def trace_id(self) -> Optional[str]:
+        return self._scope().trace_id
+
+    @property
+    def context(self) -> Dict[str, Any]:
+        return self._scope().context
+
+    @property
+    def _sse_callback(self) -> Optional[Callable]:
+        return self._scope().sse_callback
+
     def set_trace(self, trace_id: str):
-        """設置追蹤 ID"""
-        self.trace_id = trace_id
+        """設置追蹤 ID（僅作用於當前請求）"""
+        self._scope().trace_id = trace_id
 
     def set_context(self, **kwargs):
-        """設置上下文"""
-        self.context.update(kwargs)
+        """設置上下文（僅作用於當前請求）"""
+        self._scope().context.update(kwargs)
 
     def clear_context(self):
         """清除上下文"""
-        self.context = {}
-        self.trace_id = None
+        scope = self._scope()
+        scope.context = {}
+        scope.trace_id = None
 
     def set_sse_callback(self, callback: Callable):
-        """設置 SSE 事件回調"""
-        self._sse_callback = callback
+        """設置 SSE 事件回調（僅作用於當前請求）"""
+        self._scope().sse_callback = callback
 
     def _should_log_to_console(self, level: LogLevel, category: LogCategory) -> bool:
         """判斷是否應該輸出到控制台"""
@@ -175,15 +194,12 @@ class StructuredLogger:
         # Sanitize surrogate characters from WSL2 / non-UTF-8 terminal input
         message = message.encode('utf-8', errors='replace').decode('utf-8')
 
-        # 控制台輸出
+        # 控制台輸出（由 sink 寫出）
+        console_msg = None
         if self._should_log_to_console(level, category):
             console_msg = self._format_console_message(level, category, message, **kwargs)
-            print(console_msg)
 
-        # 檔案輸出（純文本格式）- 更易讀
-        log_file = self.log_dir / f"quitcode_{datetime.now().strftime('%Y%m%d')}.log"
-
-        # 格式化檔案日誌
+        # 格式化檔案日誌（純文本格式）- 更易讀
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
 
         # 建構日誌行
@@ -248,9 +264,17 @@ class StructuredLogger:
         # 組合最終日誌行
         log_line = " ".join(log_parts)
 
-        # 寫入檔案 (replace surrogates from WSL2 terminal input)
-        with open(log_file, 'a', encoding='utf-8', errors='replace') as f:
-            f.write(log_line + '\n')
+        # 交給背景 sink 寫入 (surrogates are replaced when encoding)
+        self._sink.write(log_line, console_msg)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待已排入的日誌全部寫出"""
+        return self._sink.flush(timeout)
+
+    @property
+    def sink_stats(self) -> Dict[str, Any]:
+        """日誌 sink 統計（written / dropped / queued / batches / rotations）"""
+        return self._sink.stats
 
     # 標準日誌方法
     def debug(self, message: str, module: str = None, function: str = None, category: LogCategory = LogCategory.SYSTEM, **kwargs):
@@ -268,15 +292,23 @@ class StructuredLogger:
     # SSE 事件方法 - 只寫入檔案，不輸出到控制台
     def emit_sse(self, event: Event):
         """發送 SSE 事件"""
-        if self._sse_callback:
-            self._sse_callback(event.type.value, event.to_dict())
+        # 串流請求：發佈到本請求的事件通道
+        channel = self._scope().event_channel
+        if channel is not None:
+            channel.publish(event.type.value, event.to_dict())
+
+        callback = self._sse_callback
+        if callback:
+            callback(event.type.value, event.to_dict())
 
         # 只記錄到檔案，不輸出控制台
         self._log(LogLevel.DEBUG, f"SSE Event: {event.type.value}", LogCategory.SSE,
                   sse_event=event.to_dict())
 
     def progress(self, step: str, status: str, data: Any = None):
-        """發送進度事件"""
+        """發送進度事件（start 同時標記目前的 pipeline 階段，供用量帳本歸屬）"""
+        if status == "start":
+            set_stage(step)
         event = Event(
             type=EventType.PROGRESS,
             data={"step": step, "status": status, "data": data},
@@ -359,8 +391,9 @@ class StructuredLogger:
                 )
 
     # 專門的日誌方法
-    def log_llm_call(self, model: str, tokens_in: int, tokens_out: int, duration_ms: float):
-        """記錄 LLM 調用"""
+    def log_llm_call(self, model: str, tokens_in: int, tokens_out: int, duration_ms: float,
+                     cached_tokens: int = 0):
+        """記錄 LLM 調用（cached_tokens：provider 前綴快取命中的 prompt tokens）"""
         self.info(
             f"🤖 LLM Call: {model}",
             category=LogCategory.LLM,
@@ -368,6 +401,7 @@ class StructuredLogger:
                 "model": model,
                 "tokens_in": tokens_in,
                 "tokens_out": tokens_out,
+                "cached_tokens": cached_tokens,
                 "total_tokens": tokens_in + tokens_out,
                 "duration_ms": round(duration_ms, 2)
             },
@@ -0,0 +1,261 @@
+"""Event loop lag monitor with blocking-call stack capture.
+
+Synchronous work on the event loop (sync Qdrant / Cohere / OpenAI clients,
+HTML and PDF parsing, exec in SandboxService._execute_python_local, ...)
+stalls every other request on the worker while it runs, and nothing in the
+logs says so.
+
+LoopLagMonitor runs a watchdog thread that schedules a heartbeat onto the
+loop every `interval` seconds (call_soon_threadsafe) and measures how long
+the loop takes to run it:
+
+- every heartbeat's delay goes into the `quitcode_event_loop_lag_seconds`
+  histogram (served at /metrics)
+- when a heartbeat is `threshold` seconds late, the loop is blocked right
+  now: the watchdog grabs the loop thread's stack (sys._current_frames()),
+  looks up the request of the task that is running (request_scope binds
+  tasks to scopes; the monitor's task factory binds child tasks to their
+  creator's scope) and records a stall once the heartbeat finally runs
+
+Stalls are grouped by call site, the innermost frame in this codebase (or
+the innermost frame at all for stacks outside it), so
+`/api/v1/admin/loop-stalls` lists the worst offenders with an example
+stack and the last trace_id that hit them.
+
+Config (env): LOOP_MONITOR_ENABLED (default true), LOOP_LAG_THRESHOLD_MS
+(default 100), LOOP_MONITOR_INTERVAL_MS (default 50).
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from .histogram import histograms
+from .logger import structured_logger
+from .request_scope import bind_task, current_scope, scope_of_task
+
+LOOP_LAG = histograms.histogram(
+    "quitcode_event_loop_lag_seconds",
+    "Delay between scheduling a callback on the event loop and running it.",
+)
+
+_SRC_ROOT = str(Path(__file__).resolve().parent.parent)
+_MAX_SITES = 200
+_MAX_RECENT = 50
+_MAX_DEPTH = 64
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_SRC_ROOT):
+        filename = os.path.relpath(filename, _SRC_ROOT)
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _stack(frame) -> List[str]:
+    """Innermost-first frame labels of `frame`."""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return labels
+
+
+def _call_site(frame) -> str:
+    """Innermost frame in this codebase, else the innermost frame."""
+    innermost = frame
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_SRC_ROOT) and \
+                frame.f_code.co_filename != __file__:
+            return _frame_label(frame)
+        frame = frame.f_back
+    return _frame_label(innermost) if innermost is not None else "unknown"
+
+
+def _task_factory(loop, coro, **kwargs):
+    """Default task creation + bind the task to its creator's request scope."""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    scope = context.run(current_scope) if context is not None else current_scope()
+    if scope is not None:
+        bind_task(task, scope)
+    return task
+
+
+class LoopLagMonitor:
+    """Watchdog thread measuring event loop scheduling delay."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop,
+                 interval: float = 0.05, threshold: float = 0.1):
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._installed_factory = False
+        # Stats: written by the watchdog thread, read by stats() on the loop
+        self._lock = threading.Lock()
+        self._beats = 0
+        self._stalls = 0
+        self._max_lag = 0.0
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=_MAX_RECENT)
+
+    @classmethod
+    def from_env(cls, loop: asyncio.AbstractEventLoop) -> "LoopLagMonitor":
+        def ms(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, default)) / 1000
+            except ValueError:
+                return default / 1000
+        return cls(loop, interval=ms("LOOP_MONITOR_INTERVAL_MS", 50),
+                   threshold=ms("LOOP_LAG_THRESHOLD_MS", 100))
+
+    def start(self) -> None:
+        """Start watching; call from the loop's thread."""
+        if self._thread is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        if self.loop.get_task_factory() is None:
+            self.loop.set_task_factory(_task_factory)
+            self._installed_factory = True
+        self._thread = threading.Thread(target=self._run, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._installed_factory and not self.loop.is_closed():
+            self.loop.set_task_factory(None)
+            self._installed_factory = False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            beat = threading.Event()
+            lag: List[float] = []
+            scheduled = time.perf_counter()
+
+            def on_loop() -> None:
+                delay = time.perf_counter() - scheduled
+                lag.append(delay)
+                LOOP_LAG.observe(delay)
+                beat.set()
+
+            try:
+                self.loop.call_soon_threadsafe(on_loop)
+            except RuntimeError:  # loop closed
+                return
+            if beat.wait(self.threshold):
+                self._after_beat(lag[0])
+                continue
+
+            # The loop has been busy for `threshold` seconds: capture what it is doing
+            stall = self._capture()
+            while not beat.wait(self.interval):
+                if self._stop.is_set() or self.loop.is_closed():
+                    return
+            self._after_beat(lag[0], stall)
+
+    def _capture(self) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = getattr(asyncio.tasks, "_current_tasks", {}).get(self.loop)
+        scope = scope_of_task(task)
+        return {
+            "trace_id": scope.trace_id if scope else None,
+            "mode": scope.mode if scope else None,
+            "task": task.get_name() if task is not None else None,
+            "site": _call_site(frame) if frame is not None else "unknown",
+            "stack": _stack(frame) if frame is not None else [],
+        }
+
+    def _after_beat(self, lag: float, stall: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._beats += 1
+            self._max_lag = max(self._max_lag, lag)
+            if stall is None:
+                return
+            self._stalls += 1
+            lag_ms = round(lag * 1000, 1)
+            stall.update(lag_ms=lag_ms, at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self._recent.append(stall)
+            self._record_site(stall, lag_ms)
+        structured_logger.warning(
+            f"Event loop blocked for {lag_ms} ms at {stall['site']}",
+            loop_lag_ms=lag_ms,
+            blocked_trace_id=stall["trace_id"],
+            blocking_site=stall["site"],
+        )
+
+    def _record_site(self, stall: Dict[str, Any], lag_ms: float) -> None:
+        site = self._sites.get(stall["site"])
+        if site is None:
+            if len(self._sites) >= _MAX_SITES:
+                return
+            site = self._sites[stall["site"]] = {
+                "site": stall["site"], "stalls": 0, "total_lag_ms": 0.0, "max_lag_ms": 0.0,
+            }
+        site["stalls"] += 1
+        site["total_lag_ms"] = round(site["total_lag_ms"] + lag_ms, 1)
+        if lag_ms >= site["max_lag_ms"]:
+            site.update(max_lag_ms=lag_ms, stack=stall["stack"])
+        site["last_trace_id"] = stall["trace_id"]
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        """Summary, top blocking sites (by total lag) and recent stalls."""
+        histogram = LOOP_LAG.labels()
+        with self._lock:
+            sites = [dict(site) for site in self._sites.values()]
+            recent = list(self._recent)
+            beats, stalls, max_lag = self._beats, self._stalls, self._max_lag
+        sites.sort(key=lambda s: s["total_lag_ms"], reverse=True)
+        return {
+            "running": self._thread is not None,
+            "interval_ms": round(self.interval * 1000, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "beats": beats,
+            "stalls": stalls,
+            "max_lag_ms": round(max_lag * 1000, 1),
+            "p99_lag_ms": round(histogram.quantile(0.99) * 1000, 2),
+            "top_sites": sites[:top],
+            "recent": recent[-top:] if top else [],
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def loop_monitor_enabled() -> bool:
+    return os.getenv("LOOP_MONITOR_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+
+def start_loop_monitor() -> Optional[LoopLagMonitor]:
+    """Start the process-wide monitor on the running loop (None when disabled)."""
+    global _monitor
+    if not loop_monitor_enabled():
+        return None
+    if _monitor is None or _monitor.loop is not asyncio.get_running_loop():
+        if _monitor is not None:
+            _monitor.stop()
+        _monitor = LoopLagMonitor.from_env(asyncio.get_running_loop())
+        _monitor.start()
+    return _monitor
+
+
+def stop_loop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
+
+
+def get_loop_monitor() -> Optional[LoopLagMonitor]:
+    return _monitor
@@ -43,6 +43,17 @@ class CognitiveMetrics:
         self._a2a_completed: int = 0
         self._a2a_failed: int = 0
         self._a2a_total_latency: float = 0.0
+        # SSE streaming metrics (emit -> SSE write)
+        self._streams: int = 0
+        self._sse_events: int = 0
+        self._sse_total_latency: float = 0.0
+        self._sse_max_latency: float = 0.0
+        self._disconnects: int = 0
+        self._cancel_timeouts: int = 0
+        # Cancelled work (client went away mid-request), per cognitive level
+        self._cancelled: Dict[str, Dict[str, float]] = {}
+        # Admission control metrics (per cognitive level)
+        self._admission: Dict[str, Dict[str, float]] = {}
 
     def record_request(
         self,
@@ -112,6 +123,83 @@ class CognitiveMetrics:
             },
         }
 
+    # ── SSE streaming metrics ──
+
+    def record_stream(
+        self,
+        events: int,
+        avg_latency_ms: float,
+        max_latency_ms: float,
+        disconnected: bool = False,
+        cancel_timeout: bool = False,
+    ) -> None:
+        """Record one finished SSE stream (emit -> write latency per event).
+
+        disconnected: the client left before the result and the engine task
+        was cancelled; cancel_timeout: that task outlived the cancel grace.
+        """
+        self._streams += 1
+        self._disconnects += int(disconnected)
+        self._cancel_timeouts += int(cancel_timeout)
+        self._sse_events += events
+        self._sse_total_latency += avg_latency_ms * events
+        self._sse_max_latency = max(self._sse_max_latency, max_latency_ms)
+
+    def get_streaming_metrics(self) -> Dict[str, Any]:
+        """Return SSE delivery metrics."""
+        return {
+            "streams": self._streams,
+            "events": self._sse_events,
+            "avg_emit_to_write_ms": round(self._sse_total_latency / self._sse_events, 3) if self._sse_events else 0.0,
+            "max_emit_to_write_ms": round(self._sse_max_latency, 3),
+            "disconnects": self._disconnects,
+            "cancel_timeouts": self._cancel_timeouts,
+        }
+
+    # ── Cancellation metrics ──
+
+    def record_cancellation(self, cognitive_level: str, elapsed_ms: float) -> None:
+        """Record one request cancelled mid-processing and the work spent on it."""
+        m = self._cancelled.setdefault(cognitive_level, {"cancelled": 0, "total_elapsed_ms": 0.0})
+        m["cancelled"] += 1
+        m["total_elapsed_ms"] += elapsed_ms
+
+    def get_cancellation_metrics(self) -> Dict[str, Any]:
+        """Return cancelled requests and their avg elapsed time per cognitive level."""
+        return {
+            level: {
+                "cancelled": int(m["cancelled"]),
+                "avg_elapsed_ms": round(m["total_elapsed_ms"] / m["cancelled"], 2),
+            }
+            for level, m in self._cancelled.items()
+        }
+
+    # ── Admission control metrics ──
+
+    def record_admission(self, cognitive_level: str, wait_ms: float, admitted: bool = True) -> None:
+        """Record one admission decision and its queue wait."""
+        m = self._admission.setdefault(cognitive_level, {
+            "admitted": 0, "rejected": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0,
+        })
+        if admitted:
+            m["admitted"] += 1
+            m["total_wait_ms"] += wait_ms
+            m["max_wait_ms"] = max(m["max_wait_ms"], wait_ms)
+        else:
+            m["rejected"] += 1
+
+    def get_admission_metrics(self) -> Dict[str, Any]:
+        """Return admitted/rejected counts and queue wait per cognitive level."""
+        return {
+            level: {
+                "admitted": int(m["admitted"]),
+                "rejected": int(m["rejected"]),
+                "avg_queue_wait_ms": round(m["total_wait_ms"] / m["admitted"], 2) if m["admitted"] else 0.0,
+                "max_queue_wait_ms": round(m["max_wait_ms"], 2),
+            }
+            for level, m in self._admission.items()
+        }
+
     def reset(self) -> None:
         """Clear all metrics."""
         for m in self._levels.values():
@@ -127,3 +215,11 @@ class CognitiveMetrics:
         self._a2a_completed = 0
         self._a2a_failed = 0
         self._a2a_total_latency = 0.0
+        self._streams = 0
+        self._sse_events = 0
+        self._sse_total_latency = 0.0
+        self._sse_max_latency = 0.0
+        self._disconnects = 0
+        self._cancel_timeouts = 0
+        self._cancelled.clear()
+        self._admission.clear()
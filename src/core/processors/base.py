@@ -6,11 +6,15 @@ Following Linus philosophy: simple data structures, no special cases, ≤500 lin
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple
+import inspect
 import time
 
 from ..models_v2 import ProcessingContext
 from ..logger import structured_logger
+from ..llm_memo import get_llm_memo
+from ..request_scope import current_stage
+from ..tracing import span
 
 
 class BaseProcessor(ABC):
@@ -28,11 +32,27 @@ class BaseProcessor(ABC):
         """處理請求 - 子類必須實現"""
         pass
 
-    async def _call_llm(self, prompt: str, context: ProcessingContext = None) -> str:
-        """調用 LLM - 公共方法"""
+    async def _call_llm(self, prompt: str, context: ProcessingContext = None,
+                        stream: bool = False, system: Optional[str] = None) -> str:
+        """調用 LLM - 公共方法
+
+        stream=True 且 LLM client 支援 stream() 時，逐段轉發 token delta
+        為 MESSAGE(streaming=True) 事件，同時組裝完整回應供快取與 token 統計。
+
+        system: 穩定的系統提示詞（見 PromptTemplates.get_stable_system_prompt），
+        以 system message 送出讓 provider 前綴快取命中；client 不支援時放在
+        prompt 最前面。prompt 只放每次請求不同的內容。
+        """
         if not self.llm_client:
             raise RuntimeError("LLM client not configured — cannot process request")
 
+        llm_kwargs: Dict[str, Any] = {}
+        if system:
+            if getattr(self.llm_client, "supports_system_prompt", False):
+                llm_kwargs["system"] = system
+            else:
+                prompt = f"{system}\n\n{prompt}"
+
         # # 記錄 prompt (截取前500字符用於日誌)
         # self.logger.info(
         #     f"📝 LLM Prompt: {prompt[:500]}...",
@@ -42,17 +62,48 @@ class BaseProcessor(ABC):
         #     prompt_preview=prompt[:200]
         # )
 
+        # Memoization（llm_memo.enabled）：重試/重播直接重用已成功的 completion
+        memo = get_llm_memo()
+        memo_key = None
+        if memo is not None:
+            memo_key = memo.key(
+                model=self._model_name(),
+                prompt=f"{llm_kwargs['system']}\n\n{prompt}" if llm_kwargs else prompt,
+                temperature=getattr(self.llm_client, "temperature", None),
+                max_tokens=getattr(self.llm_client, "max_tokens", None),
+                trace_id=context.request.trace_id if context else self.logger.trace_id,
+            )
+            memoized = await memo.aget(memo_key)
+            if memoized is not None:
+                response, token_info = memoized
+                self.logger.info(
+                    f"LLM memo HIT ({len(response)} chars, "
+                    f"{token_info.get('total_tokens', 0)} tokens saved)",
+                    "llm",
+                    "memo_hit",
+                )
+                if stream:
+                    self.logger.message(response, streaming=True)
+                return response
+
         start_time = time.time()
-        with self.logger.measure("llm_call"):
-            # 使用 return_token_info 參數獲取 token 資訊
-            result = await self.llm_client.generate(prompt, return_token_info=True)
+        with self.logger.measure("llm_call"), \
+                span("llm_call", model=self._model_name(), stage=current_stage(),
+                     prompt_chars=len(prompt), stream=stream) as llm_span:
+            if stream and self._supports_streaming():
+                result = await self._stream_llm(prompt, **llm_kwargs)
+            else:
+                # 使用 return_token_info 參數獲取 token 資訊
+                result = await self.llm_client.generate(prompt, return_token_info=True, **llm_kwargs)
 
             # 處理返回值
+            cached_tokens = 0
             if isinstance(result, tuple):
                 response, token_info = result
                 tokens_in = token_info.get("prompt_tokens", 0)
                 tokens_out = token_info.get("completion_tokens", 0)
                 total_tokens = token_info.get("total_tokens", 0)
+                cached_tokens = token_info.get("cached_tokens", 0) or 0
             else:
                 # 向後兼容：如果返回的是字符串
                 response = result
@@ -61,13 +112,17 @@ class BaseProcessor(ABC):
                 total_tokens = tokens_in + tokens_out
 
             duration_ms = (time.time() - start_time) * 1000
+            llm_span.set_attributes(
+                prompt_tokens=tokens_in, completion_tokens=tokens_out, cached_tokens=cached_tokens,
+            )
 
             # 記錄 LLM 調用 (包含 token 和時間資訊)
             self.logger.log_llm_call(
-                model=getattr(self.llm_client, 'model_name', getattr(self.llm_client, 'provider_name', 'unknown')),
+                model=self._model_name(),
                 tokens_in=tokens_in,
                 tokens_out=tokens_out,
-                duration_ms=duration_ms
+                duration_ms=duration_ms,
+                cached_tokens=cached_tokens,
             )
 
             # Log LLM response — segment if long
@@ -96,6 +151,13 @@ class BaseProcessor(ABC):
                     response_preview=response[:200]
                 )
 
+            if memo is not None:
+                await memo.aput(memo_key, response, {
+                    "prompt_tokens": tokens_in,
+                    "completion_tokens": tokens_out,
+                    "total_tokens": total_tokens,
+                })
+
             # 檢查響應是否為空
             if not response or response.strip() == "":
                 self.logger.warning(
@@ -112,6 +174,50 @@ class BaseProcessor(ABC):
 
             return response
 
+    def _model_name(self) -> str:
+        return getattr(self.llm_client, 'model_name', getattr(self.llm_client, 'provider_name', 'unknown'))
+
+    def _supports_streaming(self) -> bool:
+        """LLM client 是否提供 async generator 形式的 stream()"""
+        return inspect.isasyncgenfunction(getattr(self.llm_client, "stream", None))
+
+    async def _stream_llm(self, prompt: str, **kwargs) -> Tuple[str, Dict[str, int]]:
+        """串流調用 LLM：每個 delta 立即發送 SSE，回傳 (完整回應, token 資訊)"""
+        chunks: List[str] = []
+        first_token_ms = None
+        token_info: Dict[str, Any] = {}
+        start = time.perf_counter()
+        async for delta in self.llm_client.stream(prompt, token_info=token_info, **kwargs):
+            if not delta:
+                continue
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            chunks.append(delta)
+            self.logger.message(delta, streaming=True)
+        response = "".join(chunks)
+
+        if first_token_ms is not None:
+            self.logger.debug(
+                f"LLM stream: first token {first_token_ms:.0f}ms, {len(chunks)} chunks",
+                "llm",
+                "stream",
+                ttft_ms=round(first_token_ms, 1),
+                chunks=len(chunks)
+            )
+
+        # provider 在串流結束時填入 token_info (實際 usage)
+        if token_info.get("total_tokens"):
+            return response, token_info
+
+        # client 未回報 usage，沿用粗略估算
+        tokens_in = len(prompt.split())
+        tokens_out = len(response.split())
+        return response, {
+            "prompt_tokens": tokens_in,
+            "completion_tokens": tokens_out,
+            "total_tokens": tokens_in + tokens_out,
+        }
+
     async def _log_tool_decision(self, tool_name: str, reason: str, confidence: float = 0.9):
         """記錄工具決策"""
         self.logger.log_tool_decision(tool_name, confidence, reason)
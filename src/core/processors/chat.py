@@ -31,19 +31,21 @@ class ChatProcessor(BaseProcessor):
                 return cached_response
 
         # Step 2: Build Prompt (符合狀態機 BuildPrompt)
-        system_prompt = PromptTemplates.get_system_instruction("chat")
-        output_guidelines = PromptTemplates.get_output_guidelines()
-        full_prompt = f"{system_prompt}\n\n{output_guidelines}\n\nUser: {context.request.query}"
+        # 穩定前綴走 system message（provider 前綴快取），每次不同的只有 user prompt
+        system_prompt = PromptTemplates.get_stable_system_prompt("chat")
+        user_prompt = f"User: {context.request.query}"
 
         # Step 3: Call LLM (符合狀態機 CallLLM)
-        response = await self._call_llm(full_prompt, context)
+        response = await self._call_llm(
+            user_prompt, context, stream=context.request.stream, system=system_prompt
+        )
 
         # Step 4: Cache Put (System 1 特性)
         if cache:
             cache.put(cache_key, response, ttl=300)
             self.logger.info("💾 Cache PUT for chat response", "chat", "cache_put")
 
-        # 發送消息
+        # 發送消息（串流時為完整版本，取代前面的 delta）
         self.logger.message(response)
 
         context.mark_step_complete("chat")
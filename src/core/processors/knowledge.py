@@ -78,15 +78,18 @@ class KnowledgeProcessor(BaseProcessor):
                 "Knowledge base unavailable — falling back to LLM direct answer",
                 "knowledge", "no_rag"
             )
-            system_prompt = PromptTemplates.get_system_instruction("knowledge")
+            system_prompt = PromptTemplates.get_stable_system_prompt(
+                "knowledge", output_guidelines=False
+            )
             fallback_prompt = (
-                f"{system_prompt}\n\n"
                 f"[NOTE: Knowledge base is currently unavailable. "
                 f"Answer based on your training data and clearly state that "
                 f"this answer is NOT grounded in the local knowledge base.]\n\n"
                 f"User: {context.request.query}"
             )
-            response = await self._call_llm(fallback_prompt, context)
+            response = await self._call_llm(
+                fallback_prompt, context, stream=context.request.stream, system=system_prompt
+            )
             self.logger.message(response)
             context.mark_step_complete("knowledge-retrieval")
             self.logger.progress("knowledge-retrieval", "end")
@@ -127,11 +130,14 @@ class KnowledgeProcessor(BaseProcessor):
             context=' '.join(relevant_docs)
         )
 
-        # 加上引用規則
-        citation_rules = PromptTemplates.get_citation_rules()
-        full_prompt = f"{prompt}\n\n{citation_rules}"
+        # 引用規則放在穩定的 system 前綴，檢索內容留在 user prompt
+        system_prompt = PromptTemplates.get_stable_system_prompt(
+            "knowledge", output_guidelines=False, citation_rules=True
+        )
 
-        response = await self._call_llm(full_prompt, context)
+        response = await self._call_llm(
+            prompt, context, stream=context.request.stream, system=system_prompt
+        )
 
         # Step 5: Cache Put (System 1 特性 - 符合狀態機)
         if cache:
@@ -22,6 +22,7 @@ from ..base import BaseProcessor
 from ...models_v2 import ProcessingContext
 from ...prompts import PromptTemplates
 from ...logger import structured_logger
+from ...tracing import span
 
 from .config import SearchEngineConfig, SearchProviderType
 from .events import ResearchEvent
@@ -136,8 +137,13 @@ class DeepResearchProcessor(BaseProcessor):
 
     async def _execute_with_retry(self, context: ProcessingContext,
                                   workflow_state: dict) -> str:
-        """Execute research workflow with retry mechanism."""
-        from core.errors import ErrorClassifier
+        """Execute research workflow with retry mechanism.
+
+        A retry re-runs the whole workflow, so it only happens when the request
+        carries a retry budget (retry_budget.enabled) and the budget grants it.
+        """
+        from core.errors import ErrorClassifier, ErrorCategory
+        from core.retry_budget import current_retry_budget
 
         MAX_RETRIES = 2
         retry_count = 0
@@ -156,9 +162,12 @@ class DeepResearchProcessor(BaseProcessor):
                     "step": workflow_state["current_step"]
                 })
 
-                if error_category in ["NETWORK", "LLM"] and retry_count < MAX_RETRIES:
+                retryable = error_category in (ErrorCategory.NETWORK, ErrorCategory.LLM)
+                delay = 2 ** (retry_count + 1)
+                budget = current_retry_budget()
+                if (retryable and retry_count < MAX_RETRIES
+                        and budget is not None and budget.try_acquire(delay)):
                     retry_count += 1
-                    delay = 2 ** retry_count
                     self.logger.warning(
                         f"Retryable error ({error_category}), retrying "
                         f"{retry_count}/{MAX_RETRIES} after {delay}s",
@@ -193,7 +202,8 @@ class DeepResearchProcessor(BaseProcessor):
 
         # 1. Report plan
         workflow_state["current_step"] = "plan"
-        report_plan = await self.planner.write_report_plan(context)
+        with span("deep_research.plan"):
+            report_plan = await self.planner.write_report_plan(context)
 
         # Research iteration loop with progressive synthesis
         MAX_ITERATIONS = 3
@@ -210,44 +220,50 @@ class DeepResearchProcessor(BaseProcessor):
                 "deep_research", "iteration"
             )
 
-            # 2. Generate search queries
-            workflow_state["current_step"] = "search"
-            if iteration == 1:
-                search_tasks = await self.planner.generate_serp_queries(
-                    context, report_plan,
-                    search_config=self.search_config,
-                    language=user_language,
-                )
-            else:
-                search_tasks = await self.planner.generate_followup_queries(
-                    context, report_plan, all_search_results,
-                    executed_queries=executed_queries,
-                    search_config=self.search_config,
-                )
-
-            if not search_tasks:
-                break
-
-            # 3. Execute search tasks
-            search_results = await self.search_exec.execute_search_tasks(
-                context, search_tasks
-            )
-            all_search_results.extend(search_results)
-            executed_queries.extend(t.get('query', '') for t in search_tasks)
-
-            # 4. Progressive intermediate synthesis
-            workflow_state["current_step"] = "synthesis"
-            synthesis_result = await self.analyzer.intermediate_synthesis(
-                context, report_plan, search_results, accumulated_synthesis,
-            )
-            accumulated_synthesis = synthesis_result.get("synthesis", "")
-            section_coverage = synthesis_result.get("section_coverage", {})
-
-            # 5. Structured completeness review
-            is_sufficient, gap_report = await self.planner.review_research_completeness(
-                context, report_plan, all_search_results, iteration,
-                section_coverage=section_coverage,
-            )
+            with span("deep_research.iteration", iteration=iteration) as iteration_span:
+                # 2. Generate search queries
+                workflow_state["current_step"] = "search"
+                with span("deep_research.queries"):
+                    if iteration == 1:
+                        search_tasks = await self.planner.generate_serp_queries(
+                            context, report_plan,
+                            search_config=self.search_config,
+                            language=user_language,
+                        )
+                    else:
+                        search_tasks = await self.planner.generate_followup_queries(
+                            context, report_plan, all_search_results,
+                            executed_queries=executed_queries,
+                            search_config=self.search_config,
+                        )
+
+                if not search_tasks:
+                    break
+
+                # 3. Execute search tasks
+                with span("deep_research.search_tasks", tasks=len(search_tasks)):
+                    search_results = await self.search_exec.execute_search_tasks(
+                        context, search_tasks
+                    )
+                all_search_results.extend(search_results)
+                executed_queries.extend(t.get('query', '') for t in search_tasks)
+
+                # 4. Progressive intermediate synthesis
+                workflow_state["current_step"] = "synthesis"
+                with span("deep_research.synthesis"):
+                    synthesis_result = await self.analyzer.intermediate_synthesis(
+                        context, report_plan, search_results, accumulated_synthesis,
+                    )
+                accumulated_synthesis = synthesis_result.get("synthesis", "")
+                section_coverage = synthesis_result.get("section_coverage", {})
+
+                # 5. Structured completeness review
+                with span("deep_research.review"):
+                    is_sufficient, gap_report = await self.planner.review_research_completeness(
+                        context, report_plan, all_search_results, iteration,
+                        section_coverage=section_coverage,
+                    )
+                iteration_span.set_attribute("sufficient", bool(is_sufficient))
 
             if is_sufficient:
                 self.logger.info(
@@ -276,22 +292,25 @@ class DeepResearchProcessor(BaseProcessor):
         # 6. Section-aware hierarchical synthesis
         workflow_state["current_step"] = "section_synthesis"
         references_list = self.reporter.extract_references(all_search_results)
-        hierarchical = await self.section_synth.build_hierarchical_context(
-            context, report_plan, all_search_results,
-            references_list=references_list,
-            language=user_language,
-        )
+        with span("deep_research.section_synthesis", references=len(references_list)):
+            hierarchical = await self.section_synth.build_hierarchical_context(
+                context, report_plan, all_search_results,
+                references_list=references_list,
+                language=user_language,
+            )
         section_context = hierarchical["structured_context"]
         evidence_index = hierarchical["evidence_index"]
 
         # 7. Final report (with section-organized context + evidence index)
         workflow_state["current_step"] = "synthesize"
-        final_report = await self.reporter.write_final_report(
-            context, all_search_results, report_plan,
-            synthesis=section_context or synthesis,
-            language=user_language,
-            evidence_index=evidence_index,
-        )
+        with span("deep_research.final_report") as report_span:
+            final_report = await self.reporter.write_final_report(
+                context, all_search_results, report_plan,
+                synthesis=section_context or synthesis,
+                language=user_language,
+                evidence_index=evidence_index,
+            )
+            report_span.set_attribute("report_chars", len(final_report or ""))
 
         workflow_state["status"] = "completed"
         self.logger.info(
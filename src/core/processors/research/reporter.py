@@ -96,7 +96,9 @@ class ReportGenerator:
         )
 
         self.logger.reasoning("綜合所有研究結果，生成最終報告...", streaming=True)
-        report_body = await self._call_llm(enhanced_prompt, context)
+        report_body = await self._call_llm(
+            enhanced_prompt, context, stream=context.request.stream
+        )
 
         cited_refs, uncited_refs, citation_stats = self.analyze_citations(
             report_body, references_list
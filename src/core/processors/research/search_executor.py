@@ -15,6 +15,7 @@ from typing import Dict, List, Optional, Any, Callable, Awaitable
 from ...models_v2 import ProcessingContext
 from ...prompts import PromptTemplates
 from ...logger import structured_logger
+from ...tracing import span
 from .config import SearchEngineConfig, SearchProviderType
 from .events import ResearchEvent
 
@@ -89,6 +90,9 @@ class SearchExecutor:
             batch_results = await asyncio.gather(*async_tasks, return_exceptions=True)
 
             for task, result in zip(batch_tasks, batch_results):
+                if isinstance(result, asyncio.CancelledError):
+                    # The request was cancelled: stop instead of reporting a failed search
+                    raise result
                 if isinstance(result, Exception):
                     self.logger.error(
                         f"Search task failed: {str(result)}",
@@ -123,41 +127,46 @@ class SearchExecutor:
     async def _execute_single_search_task(self, index: int, task: Dict,
                                           query: str, goal: str, priority: int) -> Dict:
         """Execute a single search task."""
-        try:
-            self.logger.progress("search-task", "start", {"name": query})
-            self.logger.reasoning(f"正在搜索：{query}...", streaming=True)
-
-            search_result = await self._perform_parallel_deep_search(query, goal)
-            search_result = await self.enrich_with_full_content(search_result)
+        with span("search_task", index=index, query=query, priority=priority) as task_span:
+            try:
+                self.logger.progress("search-task", "start", {"name": query})
+                self.logger.reasoning(f"正在搜索：{query}...", streaming=True)
+
+                search_result = await self._perform_parallel_deep_search(query, goal)
+                search_result = await self.enrich_with_full_content(search_result)
+                task_span.set_attributes(
+                    sources=len(search_result.get('sources', [])),
+                    full_content_chars=len(search_result.get('full_content', '')),
+                )
 
-            self.logger.info(
-                f"Search Result {index}: Found {len(search_result.get('sources', []))} sources",
-                "deep_research", "search_result",
-                task_index=index,
-                sources_count=len(search_result.get('sources', [])),
-                relevance_score=search_result.get('relevance', 0)
-            )
+                self.logger.info(
+                    f"Search Result {index}: Found {len(search_result.get('sources', []))} sources",
+                    "deep_research", "search_result",
+                    task_index=index,
+                    sources_count=len(search_result.get('sources', [])),
+                    relevance_score=search_result.get('relevance', 0)
+                )
 
-            self.logger.message(
-                f"搜索 {index}: {query}\n結果: {search_result.get('summary', '')[:200]}..."
-            )
+                self.logger.message(
+                    f"搜索 {index}: {query}\n結果: {search_result.get('summary', '')[:200]}..."
+                )
 
-            self.logger.progress("search-task", "end", {
-                "name": query, "data": search_result
-            })
+                self.logger.progress("search-task", "end", {
+                    "name": query, "data": search_result
+                })
 
-            return {
-                'query': query,
-                'goal': goal,
-                'priority': priority,
-                'result': search_result
-            }
-        except Exception as e:
-            self.logger.error(
-                f"Error in search task: {str(e)}",
-                "deep_research", "task_error"
-            )
-            raise
+                return {
+                    'query': query,
+                    'goal': goal,
+                    'priority': priority,
+                    'result': search_result
+                }
+            except Exception as e:
+                self.logger.error(
+                    f"Error in search task: {str(e)}",
+                    "deep_research", "task_error"
+                )
+                raise
 
     async def _perform_parallel_deep_search(self, query: str, goal: str) -> Dict:
         """Execute parallel deep search — race mode or enhanced fallback."""
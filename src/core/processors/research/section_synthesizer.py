@@ -21,6 +21,7 @@ from typing import Dict, List, Any, Callable, Awaitable, Optional
 from ...models_v2 import ProcessingContext
 from ...prompts import PromptTemplates
 from ...logger import structured_logger
+from ...tracing import span
 
 
 class SectionSynthesizer:
@@ -238,18 +239,20 @@ class SectionSynthesizer:
         )
 
         # Step 2: Classify results to sections (1 LLM call)
-        section_mapping = await self.classify_results_to_sections(
-            context, sections, search_results,
-        )
+        with span("section_classification", sections=len(sections)):
+            section_mapping = await self.classify_results_to_sections(
+                context, sections, search_results,
+            )
 
         # Step 3: Per-section synthesis (parallel LLM calls)
         async def _synth(section):
             indices = section_mapping.get(section["title"], [])
             section_results = [search_results[i] for i in indices if i < len(search_results)]
-            return section["title"], await self.synthesize_section(
-                context, section, section_results, report_plan,
-                references_list, language,
-            )
+            with span("section", section=section["title"], results=len(section_results)):
+                return section["title"], await self.synthesize_section(
+                    context, section, section_results, report_plan,
+                    references_list, language,
+                )
 
         results = await asyncio.gather(*[_synth(s) for s in sections])
         section_syntheses = dict(results)
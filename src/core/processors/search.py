@@ -120,10 +120,13 @@ class SearchProcessor(BaseProcessor):
             f"[{ref['id']}] {ref['title']} - {ref['url']}"
             for ref in references
         )
-        citation_rules = PromptTemplates.get_citation_rules()
-        full_prompt = f"{prompt}\n\nAvailable References:\n{ref_mapping}\n\n{citation_rules}"
+        # Citation rules live in the stable system prefix; results and references are volatile
+        system_prompt = PromptTemplates.get_stable_system_prompt(
+            "search", output_guidelines=False, citation_rules=True
+        )
+        full_prompt = f"{prompt}\n\nAvailable References:\n{ref_mapping}"
 
-        response = await self._call_llm(full_prompt, context)
+        response = await self._call_llm(full_prompt, context, system=system_prompt)
 
         # Append reference list
         if references:
@@ -180,11 +180,10 @@ Thinking Process Summary:
 Please provide a complete, well-structured answer that synthesizes all insights from the above analysis.
 """
 
-        # 使用輸出指南確保答案品質
-        output_guidelines = PromptTemplates.get_output_guidelines()
-        final_prompt = f"{final_synthesis_prompt}\n\n{output_guidelines}"
+        # 使用輸出指南確保答案品質（穩定前綴走 system message）
+        system_prompt = PromptTemplates.get_stable_system_prompt("thinking")
 
-        final_response = await self._call_llm(final_prompt, context)
+        final_response = await self._call_llm(final_synthesis_prompt, context, system=system_prompt)
 
         # 只輸出最終答案作為回應
         self.logger.message(final_response)
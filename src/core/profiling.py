@@ -0,0 +1,235 @@
+"""On-demand profiling: per-request profiles and whole-process sampling sessions.
+
+When one request type is slow in production there is no way to see where its
+time goes short of redeploying with instrumentation. This module provides two
+admin-only surfaces (wired up in api/routes.py):
+
+- per request: `X-Profile: 1` on /api/v1/chat wraps that `engine.process`
+  call in `profiled(trace_id)`. With pyinstrument installed it runs in async
+  mode (await time is attributed to the awaiting coroutine); otherwise a
+  pure-Python StackSampler samples the event loop thread. The report is
+  saved as `<PROFILE_DIR>/<trace_id>.json`, where every worker can read it.
+- whole process: `sample_process(seconds)` samples every thread for a fixed
+  window and returns collapsed stacks ("frame;frame;frame count" lines), the
+  input format of flamegraph.pl, speedscope and inferno.
+
+The sampler is a daemon thread reading `sys._current_frames()` every
+`interval` seconds; nothing is hooked into the interpreter, so profiling
+costs nothing when no session is running. Only one session runs at a time;
+a second one is skipped rather than producing two distorted profiles.
+
+The pure-Python sampler sees the loop thread, not a single task: samples
+taken while other requests run on the loop are included. Use pyinstrument
+for per-task attribution on a busy worker.
+
+Config (env): PROFILING_ENABLED (default true), PROFILE_DIR (default
+data/profiles).
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from .logger import structured_logger
+
+DEFAULT_INTERVAL_S = 0.005
+MAX_SESSION_S = 120.0
+_MAX_DEPTH = 128
+
+_session_lock = threading.Lock()
+_DEFAULT_DIR = Path(__file__).parent.parent.parent / "data" / "profiles"
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("PROFILING_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+
+def profile_dir() -> Path:
+    return Path(os.getenv("PROFILE_DIR") or _DEFAULT_DIR)
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename.replace("\\", "/")
+    for marker in ("/site-packages/", "/src/", "/lib/python"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _fold(frame) -> str:
+    """Root-first `;`-joined stack of `frame`."""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples thread stacks from a daemon thread into collapsed-stack counts."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_S,
+                 thread_ids: Optional[Iterable[int]] = None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration_s = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration_s = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                thread = names.get(ident, str(ident)).replace(";", ":").replace(" ", "_")
+                self.counts[f"{thread};{_fold(frame)}"] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, heaviest first (flamegraph.pl / speedscope input)."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+    def top_functions(self, limit: int = 25) -> str:
+        """Text table of the functions with the most inclusive / self samples."""
+        total: Counter = Counter()
+        own: Counter = Counter()
+        for stack, n in self.counts.items():
+            frames = stack.split(";")[1:]  # drop the thread name
+            for label in set(frames):
+                total[label] += n
+            if frames:
+                own[frames[-1]] += n
+        samples = sum(self.counts.values()) or 1
+        lines = [f"{'total %':>8} {'self %':>7}  function"]
+        for label, n in total.most_common(limit):
+            lines.append(f"{n / samples:>8.1%} {own[label] / samples:>7.1%}  {label}")
+        return "\n".join(lines)
+
+
+def _pyinstrument():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return None
+    return Profiler
+
+
+class _RequestProfiler:
+    """pyinstrument (async mode) when installed, else a loop-thread StackSampler."""
+
+    def __init__(self, interval: float):
+        profiler_cls = _pyinstrument()
+        self.kind = "pyinstrument" if profiler_cls else "sampling"
+        if profiler_cls is not None:
+            self._profiler = profiler_cls(interval=interval, async_mode="enabled")
+        else:
+            self._profiler = StackSampler(interval, thread_ids=[threading.get_ident()])
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._profiler.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self._profiler.stop()
+        report: Dict[str, Any] = {
+            "profiler": self.kind,
+            "duration_ms": round((time.perf_counter() - self._start) * 1000, 1),
+        }
+        if self.kind == "pyinstrument":
+            report["text"] = self._profiler.output_text(unicode=False, color=False)
+        else:
+            report["samples"] = self._profiler.samples
+            report["text"] = self._profiler.top_functions()
+            report["collapsed"] = self._profiler.collapsed()
+        return report
+
+
+def _write_report(path: Path, report: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(report, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _report_path(trace_id: str) -> Optional[Path]:
+    if not _TRACE_ID_RE.match(trace_id):
+        return None
+    return profile_dir() / f"{trace_id}.json"
+
+
+@asynccontextmanager
+async def profiled(trace_id: str, interval: float = DEFAULT_INTERVAL_S) -> AsyncIterator[bool]:
+    """Profile the block and save the report under `trace_id`.
+
+    Yields False (and profiles nothing) when another session is running.
+    """
+    path = _report_path(trace_id)
+    if path is None:
+        raise ValueError(f"Invalid trace_id for a profile report: {trace_id!r}")
+    if not _session_lock.acquire(blocking=False):
+        structured_logger.warning(f"Profiling skipped for {trace_id}: another session is running")
+        yield False
+        return
+    try:
+        profiler = _RequestProfiler(interval)
+        profiler.start()
+        try:
+            yield True
+        finally:
+            report = profiler.stop()
+    finally:
+        _session_lock.release()
+    report.update(trace_id=trace_id, created_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    await asyncio.to_thread(_write_report, path, report)
+
+
+def load_report(trace_id: str) -> Optional[Dict[str, Any]]:
+    """Saved report for `trace_id`, None if there is none."""
+    path = _report_path(trace_id)
+    if path is None or not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+async def sample_process(seconds: float, interval: float = DEFAULT_INTERVAL_S) -> Optional[str]:
+    """Sample all threads for `seconds`; collapsed stacks, None if busy."""
+    seconds = max(0.1, min(float(seconds), MAX_SESSION_S))
+    if not _session_lock.acquire(blocking=False):
+        return None
+    try:
+        sampler = StackSampler(interval)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+    finally:
+        _session_lock.release()
+    return sampler.collapsed()
@@ -73,13 +73,15 @@ class PromptTemplates:
             mode: Processing mode — one of auto, chat, knowledge, search,
                   code, thinking, deep_research.  Selects mode-specific
                   behavioural extensions appended to the base instruction.
-            now:  Current timestamp string.  If ``None``, uses
-                  ``datetime.now()`` formatted as ``%Y-%m-%d %H:%M:%S``.
+            now:  Current date string.  If ``None``, uses ``datetime.now()``
+                  formatted as ``%Y-%m-%d`` — date granularity keeps the
+                  system prompt byte-identical all day, so provider prompt
+                  (prefix) caches can hit.
             language: Output language (e.g. "繁體中文", "English").
                       If provided, instructs the model to respond in this language.
         """
         if now is None:
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            now = datetime.now().strftime("%Y-%m-%d")
 
         lang_instruction = ""
         if language:
@@ -104,6 +106,24 @@ Evidence calibration:
             return f"{base}\n{extension}"
         return base
 
+    @staticmethod
+    def get_stable_system_prompt(mode: str = "auto", output_guidelines: bool = True,
+                                 citation_rules: bool = False, language: str = None) -> str:
+        """獲取穩定的系統提示詞（可被 provider 前綴快取）
+
+        System instruction + output guidelines + citation rules, in that
+        order.  Contains nothing per-request, so it is byte-identical for the
+        same arguments on the same day.  Send it as the system message and
+        put volatile content (query, retrieved context, references) in the
+        user message after it.
+        """
+        parts = [PromptTemplates.get_system_instruction(mode, language=language)]
+        if output_guidelines:
+            parts.append(PromptTemplates.get_output_guidelines())
+        if citation_rules:
+            parts.append(PromptTemplates.get_citation_rules())
+        return "\n\n".join(parts)
+
     @staticmethod
     def get_code_generation_prompt(code_request: str) -> str:
         """Code generation prompt for CodeProcessor"""
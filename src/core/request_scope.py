@@ -0,0 +1,131 @@
+"""Request-scoped execution state.
+
+One RefactoredEngine instance serves every in-flight request on a worker, so
+per-request state (logger trace/context, SSE sink, context-engineering
+objects) must not live on shared instances. RequestScope holds that state
+and is carried in a contextvar: asyncio copies the current context into every
+task it creates, so child tasks (gather, create_task) see their request's
+scope while concurrent requests stay isolated.
+
+Usage:
+    with request_scope(trace_id=request.trace_id) as scope:
+        ...  # structured_logger.trace_id == request.trace_id here
+"""
+
+import asyncio
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+@dataclass
+class RequestScope:
+    """Mutable state owned by exactly one request."""
+    trace_id: Optional[str] = None
+    context: Dict[str, Any] = field(default_factory=dict)
+    sse_callback: Optional[Callable] = None
+    event_channel: Any = None        # EventChannel (streaming requests)
+    mode: Optional[str] = None             # set after routing (LLM hedging)
+    cognitive_level: Optional[str] = None  # set after routing (LLM scheduling)
+    context_manager: Any = None      # ContextManager (per request)
+    todo_recitation: Any = None      # TodoRecitation (per request)
+    retry_budget: Any = None         # RetryBudget shared by all retry layers
+
+
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar(
+    "quitcode_request_scope", default=None
+)
+
+# Pipeline stage of the current task (e.g. "report-plan", "search-task").
+# A contextvar of its own rather than a RequestScope field: parallel child
+# tasks of one request run different stages at the same time.
+_current_stage: ContextVar[Optional[str]] = ContextVar(
+    "quitcode_pipeline_stage", default=None
+)
+
+
+# Scope by asyncio task, for observers that can't read the task's contextvars
+# (the event loop lag monitor samples the loop from another thread).
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, RequestScope]" = weakref.WeakKeyDictionary()
+
+
+def bind_task(task: "asyncio.Task", scope: Optional[RequestScope]) -> None:
+    """Record `scope` as the request scope `task` runs in."""
+    if scope is None:
+        _task_scopes.pop(task, None)
+    else:
+        _task_scopes[task] = scope
+
+
+def scope_of_task(task: Optional["asyncio.Task"]) -> Optional[RequestScope]:
+    """Request scope bound to `task` (None if unknown); safe from any thread."""
+    if task is None:
+        return None
+    try:
+        return _task_scopes.get(task)
+    except TypeError:
+        return None
+
+
+def _running_task() -> Optional["asyncio.Task"]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:  # no running event loop
+        return None
+
+
+def current_scope() -> Optional[RequestScope]:
+    """Return the active request scope, or None outside a request."""
+    return _current_scope.get()
+
+
+def current_stage() -> Optional[str]:
+    """Return the pipeline stage last started in this task, or None."""
+    return _current_stage.get()
+
+
+def set_stage(stage: Optional[str]) -> None:
+    """Mark the start of a pipeline stage for this task (and tasks it creates)."""
+    _current_stage.set(stage)
+
+
+@contextmanager
+def request_scope(
+    trace_id: Optional[str] = None,
+    sse_callback: Optional[Callable] = None,
+    event_channel: Any = None,
+    **state: Any,
+) -> Iterator[RequestScope]:
+    """Enter a new request scope for the current task.
+
+    The SSE sinks (event channel / callback) are inherited from an enclosing
+    scope when not given, so a streaming endpoint can open a scope with its
+    channel and the engine can open the per-request scope underneath without
+    losing it.
+    """
+    parent = _current_scope.get()
+    if parent is not None:
+        if sse_callback is None:
+            sse_callback = parent.sse_callback
+        if event_channel is None:
+            event_channel = parent.event_channel
+    scope = RequestScope(
+        trace_id=trace_id,
+        sse_callback=sse_callback,
+        event_channel=event_channel,
+        **state,
+    )
+    token = _current_scope.set(scope)
+    stage_token = _current_stage.set(None)
+    task = _running_task()
+    if task is not None:
+        bind_task(task, scope)
+    try:
+        yield scope
+    finally:
+        _current_stage.reset(stage_token)
+        _current_scope.reset(token)
+        if task is not None:
+            bind_task(task, parent)
@@ -0,0 +1,81 @@
+"""Request-level retry budget and deadline shared by every retry layer.
+
+A failing LLM call in deep research can be retried by the provider fallback
+chain, enhanced_error_handler, DeepResearchProcessor._execute_with_retry and
+AgentRuntime's retry_with_backoff, each with its own max_retries, so the
+attempts multiply. RetryBudget is created once per request by
+RefactoredEngine.process and carried in the request scope (a contextvar), so
+every layer draws from the same pool:
+
+- max_retries: total retries for the request, across all layers
+- deadline:    no retry is started (and no backoff sleep runs) past it
+
+Outside a request (no budget in scope) the helpers allow the retry, which
+keeps each layer's own max_retries as the only limit. Controlled by feature
+flag `retry_budget.enabled`.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from .request_scope import current_scope
+
+
+class RetryBudget:
+    """Retries left and deadline for one request."""
+
+    def __init__(self, max_retries: int = 4, deadline_s: Optional[float] = None):
+        self.max_retries = max_retries
+        self._start = time.monotonic()
+        self._deadline = self._start + deadline_s if deadline_s is not None else None
+        self.used = 0
+        self.denied = 0
+
+    @classmethod
+    def from_flags(cls, flags) -> "RetryBudget":
+        return cls(
+            max_retries=int(flags.get_value("retry_budget.max_retries", 4)),
+            deadline_s=flags.get_value("retry_budget.deadline_s.default", None),
+        )
+
+    def set_deadline(self, deadline_s: float) -> None:
+        """Deadline `deadline_s` after the request started (e.g. once routed)."""
+        self._deadline = self._start + deadline_s
+
+    def remaining_time(self) -> Optional[float]:
+        """Seconds until the deadline (None = no deadline)."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def try_acquire(self, delay: float = 0.0) -> bool:
+        """Consume one retry if the budget allows one after `delay` seconds."""
+        remaining = self.remaining_time()
+        if self.used >= self.max_retries or (remaining is not None and delay >= remaining):
+            self.denied += 1
+            return False
+        self.used += 1
+        return True
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_retries": self.max_retries,
+            "used": self.used,
+            "denied": self.denied,
+            "remaining_s": self.remaining_time(),
+        }
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    scope = current_scope()
+    return scope.retry_budget if scope is not None else None
+
+
+def allow_retry(delay: float = 0.0) -> bool:
+    """Whether a retry layer may retry after sleeping `delay` seconds.
+
+    Consumes one retry from the request's budget when it allows.
+    """
+    budget = current_retry_budget()
+    return budget is None or budget.try_acquire(delay)
@@ -3,13 +3,16 @@ ModelRuntime - Stateless execution for System 1 and System 2 processors.
 Wraps ProcessorFactory, adds cognitive-level awareness and optional cache.
 """
 
-from typing import Optional, Set
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Set
 
 from .base import BaseRuntime
 from ..models_v2 import ProcessingContext, Modes
 from ..processors.factory import ProcessorFactory
 from ..logger import structured_logger
 from ..cache import ResponseCache
+from ..cache_backends import create_cache_backend
+from ..semantic_cache import SemanticCache, default_embed_fn
 from ..feature_flags import feature_flags
 
 
@@ -29,11 +32,24 @@ _CACHEABLE_MODES = {
 }
 
 
+class _LeaderCancelled(Exception):
+    """Set on a single-flight future when its leader was cancelled.
+
+    Followers retry (one of them becomes the new leader) instead of
+    inheriting a cancellation that was not theirs.
+    """
+
+
 class ModelRuntime(BaseRuntime):
     """Stateless runtime for System 1 (fast) and System 2 (deep) processors.
 
     Delegates to ProcessorFactory for actual execution.
-    System 1 cache: enabled by feature flag `system1.enable_cache`.
+    System 1 cache: enabled by feature flag `system1.enable_cache`; storage
+    backend (memory / sqlite / redis) chosen by `system1.cache_backend`.
+    Semantic tier: enabled by feature flag `system1.semantic_cache`; exact
+    misses are looked up by embedding similarity before running the processor.
+    Concurrent cache misses for the same (mode, normalized query) are
+    coalesced: one leader runs the processor, followers await its result.
     """
 
     def __init__(self, llm_client=None, processor_factory: ProcessorFactory = None):
@@ -42,7 +58,32 @@ class ModelRuntime(BaseRuntime):
         self._logger = structured_logger
         ttl = feature_flags.get_value("system1.cache_ttl", 300)
         max_size = feature_flags.get_value("system1.cache_max_size", 1000)
-        self._cache = ResponseCache(ttl=ttl, max_size=max_size)
+        max_bytes = feature_flags.get_value("system1.cache_max_bytes", 64 * 1024 * 1024)
+        backend = create_cache_backend(
+            feature_flags.get_value("system1.cache_backend", "memory"),
+            ttl=ttl, max_size=max_size, max_bytes=max_bytes,
+            path=feature_flags.get_value("system1.cache_path"),
+            redis_url=feature_flags.get_value("system1.cache_redis_url"),
+            redis_dedicated_db=feature_flags.get_value("system1.cache_redis_dedicated_db", False),
+        )
+        self._cache = ResponseCache(backend=backend)
+        # Single-flight: cache key -> leader's future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._coalesced = 0
+        # Semantic tier (created on first use, when the flag is on)
+        self._semantic_cache: Optional[SemanticCache] = None
+
+    def _get_semantic_cache(self) -> Optional[SemanticCache]:
+        if not feature_flags.is_enabled("system1.semantic_cache"):
+            return None
+        if self._semantic_cache is None:
+            self._semantic_cache = SemanticCache(
+                embed_fn=default_embed_fn(),
+                threshold=feature_flags.get_value("system1.semantic_threshold", 0.92),
+                max_size=feature_flags.get_value("system1.semantic_max_size", 1000),
+                ttl=feature_flags.get_value("system1.cache_ttl", 300),
+            )
+        return self._semantic_cache
 
     def supports(self, mode) -> bool:
         return mode in _MODEL_MODES
@@ -64,19 +105,85 @@ class ModelRuntime(BaseRuntime):
         )
 
         if use_cache:
-            cached = self._cache.get(query, str(mode))
+            cached = await self._cache.aget(query, str(mode))
             if cached is not None:
                 self._logger.info(f"Cache HIT for {mode}")
                 return cached
 
-        processor = self._factory.get_processor(mode)
-        result = await processor.process(context)
+        semantic = self._get_semantic_cache() if use_cache else None
+        vector = None
+        if semantic is not None:
+            vector = await semantic.embed(query)
+            if vector is not None:
+                cached = semantic.get(vector, str(mode))
+                if cached is not None:
+                    self._logger.info(f"Semantic cache HIT for {mode}")
+                    return cached
 
-        if use_cache:
-            self._cache.put(query, str(mode), result)
+        processor = self._factory.get_processor(mode)
+        if not use_cache:
+            return await processor.process(context)
+
+        async def run() -> str:
+            result = await processor.process(context)
+            await self._cache.aput(query, str(mode), result)
+            if vector is not None:
+                semantic.put(vector, str(mode), result)
+            return result
+
+        return await self._single_flight(
+            ResponseCache._hash_key(query, str(mode)), run
+        )
 
-        return result
+    async def _single_flight(self, key: str, run: Callable[[], Awaitable[str]]) -> str:
+        """Run `run` once per key; concurrent callers share the leader's result.
+
+        - leader error: propagated to every follower (same call, same failure)
+        - leader cancelled: followers retry, one becomes the new leader
+        - follower cancelled: only that follower stops (the shared future is shielded)
+        """
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                result = await asyncio.shield(fut)
+            except _LeaderCancelled:
+                continue
+            self._coalesced += 1
+            self._logger.info("Single-flight: coalesced with in-flight request")
+            return result
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            fut.set_exception(_LeaderCancelled())
+            fut.exception()  # mark retrieved: there may be no followers
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
 
     @property
     def cache_stats(self):
-        return self._cache.stats
+        return self._with_runtime_stats(self._cache.stats)
+
+    async def acache_stats(self):
+        """cache_stats for async callers (metrics routes): backend stats off the loop."""
+        return self._with_runtime_stats(await self._cache.astats())
+
+    def _with_runtime_stats(self, stats):
+        stats["coalesced"] = self._coalesced
+        stats["inflight"] = len(self._inflight)
+        if self._semantic_cache is not None:
+            stats["semantic"] = self._semantic_cache.stats
+        return stats
@@ -0,0 +1,174 @@
+"""Semantic (embedding-similarity) response cache for System 1 modes.
+
+ResponseCache only matches the exact normalized query, so paraphrases such as
+"what is RAG" / "What's RAG?" both miss. SemanticCache embeds the query and
+returns a cached answer when the cosine similarity to a previous query of the
+same mode is above `threshold`.
+
+- vectors live in one contiguous float32 matrix (max_size x dim), L2-normalized
+  at insert, so lookup is a single matrix-vector product
+- LRU eviction over slots, TTL expiry, per-mode isolation
+- near misses (best similarity just under the threshold) are counted to help
+  tune the threshold
+
+Controlled by feature flag `system1.semantic_cache`.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+EmbedFn = Callable[[str], List[float]]
+
+
+def default_embed_fn() -> EmbedFn:
+    """Embed with the knowledge-base Indexer's provider setup (Cohere/OpenAI)."""
+    def embed(text: str) -> List[float]:
+        from services.knowledge.indexer import get_indexer
+        return get_indexer().get_embedding(text, input_type="search_query")
+    return embed
+
+
+class SemanticCache:
+    """Vectorized cosine-similarity cache with LRU eviction and TTL."""
+
+    NEAR_MISS_MARGIN = 0.05  # best similarity within this of the threshold
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        threshold: float = 0.92,
+        max_size: int = 1000,
+        ttl: int = 300,
+    ):
+        self._embed_fn = embed_fn
+        self._threshold = threshold
+        self._max_size = max_size
+        self._ttl = ttl
+
+        # Allocated on first insert, once the embedding dimension is known
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_size, dtype=bool)
+        self._expires_at = np.zeros(max_size, dtype=np.float64)
+        self._mode_ids = np.full(max_size, -1, dtype=np.int32)
+        self._values: List[Optional[str]] = [None] * max_size
+        self._modes: Dict[str, int] = {}
+        self._free: List[int] = list(range(max_size - 1, -1, -1))
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._near_misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._embed_errors = 0
+        self._hit_similarity_sum = 0.0
+
+    async def embed(self, query: str) -> Optional[np.ndarray]:
+        """Embed and normalize a query off the event loop. None on failure."""
+        try:
+            vector = await asyncio.to_thread(self._embed_fn, query.strip())
+        except Exception:
+            self._embed_errors += 1
+            return None
+        if not vector:
+            self._embed_errors += 1
+            return None
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return None
+        return vec / norm
+
+    def get(self, vector: np.ndarray, mode: str) -> Optional[str]:
+        """Return the cached answer of the most similar query, or None."""
+        mode_id = self._modes.get(mode)
+        if self._matrix is None or mode_id is None or vector.shape[0] != self._matrix.shape[1]:
+            self._misses += 1
+            return None
+
+        self._purge_expired(time.monotonic())
+        candidates = self._valid & (self._mode_ids == mode_id)
+        if not candidates.any():
+            self._misses += 1
+            return None
+
+        sims = self._matrix @ vector
+        sims[~candidates] = -np.inf
+        slot = int(np.argmax(sims))
+        best = float(sims[slot])
+
+        if best < self._threshold:
+            self._misses += 1
+            if best >= self._threshold - self.NEAR_MISS_MARGIN:
+                self._near_misses += 1
+            return None
+
+        self._lru.move_to_end(slot)
+        self._hits += 1
+        self._hit_similarity_sum += best
+        return self._values[slot]
+
+    def put(self, vector: np.ndarray, mode: str, value: str) -> None:
+        """Store an answer under the query's embedding."""
+        if self._matrix is None:
+            self._matrix = np.zeros((self._max_size, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._matrix.shape[1]:
+            return  # embedding provider changed dimension; ignore
+
+        self._purge_expired(time.monotonic())
+        if not self._free:
+            self._evict_lru()
+        slot = self._free.pop()
+
+        mode_id = self._modes.setdefault(mode, len(self._modes))
+        self._matrix[slot] = vector
+        self._valid[slot] = True
+        self._expires_at[slot] = time.monotonic() + self._ttl
+        self._mode_ids[slot] = mode_id
+        self._values[slot] = value
+        self._lru[slot] = None
+
+    def clear(self) -> None:
+        for slot in list(self._lru):
+            self._release(slot)
+
+    def _release(self, slot: int) -> None:
+        self._valid[slot] = False
+        self._values[slot] = None
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+    def _evict_lru(self) -> None:
+        slot, _ = self._lru.popitem(last=False)
+        self._release(slot)
+        self._evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        expired = np.flatnonzero(self._valid & (self._expires_at <= now))
+        for slot in expired:
+            self._release(int(slot))
+        self._expirations += len(expired)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "size": len(self._lru),
+            "threshold": self._threshold,
+            "hits": self._hits,
+            "misses": self._misses,
+            "near_misses": self._near_misses,
+            "hit_rate": round(self._hits / total, 4) if total > 0 else 0.0,
+            "avg_hit_similarity": (
+                round(self._hit_similarity_sum / self._hits, 4) if self._hits else 0.0
+            ),
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "embed_errors": self._embed_errors,
+        }
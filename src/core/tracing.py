@@ -0,0 +1,285 @@
+"""Hierarchical tracing spans (OpenTelemetry data model, local OTLP-JSON files).
+
+A deep research run takes minutes, and `logger.measure` only leaves flat
+"took > 100 ms" lines, so there is no way to tell which search task, fetch or
+section synthesis the wall-clock time went to. This module records one trace
+per request as a tree of spans:
+
+    request
+    ├── route
+    ├── deep_research.plan
+    ├── deep_research.iteration            (iteration=1)
+    │   ├── deep_research.queries
+    │   ├── deep_research.search_tasks     (tasks=4)
+    │   │   └── search_task                (query=...)
+    │   │       ├── search                 (provider, results)
+    │   │       └── fetch                  (url, bytes)
+    │   ├── deep_research.synthesis
+    │   └── deep_research.review
+    ├── deep_research.section_synthesis
+    │   └── section                        (section=...)
+    ├── deep_research.final_report
+    └── ... llm_call spans under whichever stage made the call (tokens, model)
+
+Span nesting follows the current span ContextVar, so tasks started with
+asyncio.gather / create_task parent to the span that was current when they
+were created. Spans are only recorded inside a trace started by the engine
+(`start_trace`, feature flag `tracing.enabled`); everywhere else `span()`
+returns a shared no-op span, so instrumented code costs one ContextVar read
+when tracing is off.
+
+Finished spans are written through a LogSink (background writer thread) as
+one OTLP/JSON ExportTraceServiceRequest per line to
+`<tracing.dir>/spans_YYYY-MM-DD.jsonl`, the same shape the OpenTelemetry
+Collector file exporter produces, so the files can be replayed into any OTLP
+backend. scripts/trace_report.py renders the critical path and a waterfall
+for one trace_id.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .feature_flags import feature_flags
+from .log_sink import LogSink
+
+SERVICE_NAME = "quitcode"
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def otel_trace_id(trace_id: str) -> str:
+    """32-hex OTLP trace id for a request trace_id (UUIDs keep their hex)."""
+    compact = trace_id.replace("-", "").lower()
+    if len(compact) == 32 and all(c in "0123456789abcdef" for c in compact):
+        return compact
+    return hashlib.md5(trace_id.encode("utf-8")).hexdigest()
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "name", "attributes",
+        "start_ns", "end_ns", "status", "status_message",
+    )
+
+    def __init__(self, trace_id: str, name: str, parent_span_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Returned outside a trace: accepts and discards everything."""
+
+    __slots__ = ()
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span():
+    """The active span of the calling context (NOOP_SPAN outside a trace)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+class _SpanSink(LogSink):
+    def _format_drop_notice(self, count: int) -> Optional[str]:
+        return None  # keep every line valid JSON; drops are counted in stats
+
+
+class JsonFileSpanExporter:
+    """Appends finished spans as OTLP/JSON lines (one request per span)."""
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self._sink = _SpanSink(self.log_dir, prefix="spans", suffix=".jsonl",
+                               date_format="%Y-%m-%d")
+        self._resource = {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})}
+
+    def export(self, span: Span) -> None:
+        self._sink.write(json.dumps({
+            "resourceSpans": [{
+                "resource": self._resource,
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp()]}],
+            }]
+        }, ensure_ascii=False))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return self._sink.flush(timeout)
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list (tests, ad-hoc inspection)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return True
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Process-wide exporter (JSON files under `tracing.dir` unless replaced).
+
+    A relative `tracing.dir` is resolved against the project root, not the
+    working directory, so scripts/trace_report.py finds the spans.
+    """
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                from .utils import get_project_root
+                trace_dir = Path(feature_flags.get_value("tracing.dir", "data/traces"))
+                if not trace_dir.is_absolute():
+                    trace_dir = get_project_root() / trace_dir
+                _exporter = JsonFileSpanExporter(trace_dir)
+    return _exporter
+
+
+def set_exporter(exporter):
+    """Replace the process-wide exporter; returns the previous one."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+# ---------------------------------------------------------------------------
+# Span API
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+        get_exporter().export(span)
+
+
+@contextmanager
+def start_trace(name: str, trace_id: str, **attributes: Any) -> Iterator[Any]:
+    """Root span of a request trace (no-op unless `tracing.enabled`)."""
+    if not feature_flags.is_enabled("tracing.enabled"):
+        yield NOOP_SPAN
+        return
+    root = Span(otel_trace_id(trace_id), name,
+                attributes={"quitcode.trace_id": trace_id, **attributes})
+    with _activate(root) as active:
+        yield active
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Child span of the current span; no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _activate(Span(parent.trace_id, name, parent.span_id, attributes)) as active:
+        yield active
+
@@ -6,8 +6,15 @@ Retriever - Hybrid Search (向量 + BM25) + Cohere Rerank
 2. 全文檢索 (BM25)
 3. 混合排序 (RRF - Reciprocal Rank Fusion)
 4. Cohere Rerank 重排序 (可選)
+
+非同步路徑 (asearch / asearch_multiple)：
+KnowledgeBaseService 跑在 event loop 上，同步的 embedding / Qdrant / rerank
+呼叫會卡住整個 worker。asearch 使用 AsyncQdrantClient、AsyncOpenAI、
+cohere.AsyncClient；沒有對應 async client 的 backend 改丟到 thread pool
+(asyncio.to_thread)，BM25 建索引與計分也在 thread 裡做。
 """
 
+import asyncio
 import os
 import logging
 from typing import List, Dict, Any, Optional, Tuple
@@ -176,14 +183,21 @@ class HybridRetriever:
         self.cohere_client = None
         self.openai_client = None
         self.qdrant_client = None
+
+        # Async clients (None 表示 asearch 改用 thread pool 呼叫同步 client)
+        self.async_cohere_client = None
+        self.async_openai_client = None
+        self.async_qdrant_client = None
         
         # Embedding 設定
         self.embed_provider = None
         self.embed_model = None
         
-        # BM25 索引
+        # BM25 索引 (每組 filters 一個索引，建好後不再修改，可跨 thread 共用)
         self.bm25_index = BM25Index()
-        self._bm25_docs_cache = {}  # file_name -> docs
+        self._bm25_docs_cache = {}  # filters -> docs
+        self._bm25_indexes: Dict[str, BM25Index] = {}
+        self._bm25_builds: Dict[str, asyncio.Future] = {}  # 建立中的索引 (single-flight)
         
         self._initialize()
     
@@ -259,6 +273,7 @@ class HybridRetriever:
         
         # 初始化 Qdrant
         self._init_qdrant()
+        self._init_async_clients(cohere_key, openai_key, openai_base_url)
     
     def _init_qdrant(self):
         """初始化 Qdrant client"""
@@ -269,55 +284,95 @@ class HybridRetriever:
         except Exception as e:
             logger.error(f"❌ [HybridRetriever] Qdrant 初始化失敗: {e}")
             raise
+
+    def _init_async_clients(self, cohere_key: Optional[str], openai_key: Optional[str],
+                            openai_base_url: str):
+        """初始化 async clients；失敗時 asearch 會改用 thread pool"""
+        try:
+            if self.cohere_client:
+                import cohere
+                self.async_cohere_client = cohere.AsyncClient(api_key=cohere_key)
+            elif self.openai_client:
+                from openai import AsyncOpenAI
+                self.async_openai_client = AsyncOpenAI(api_key=openai_key, base_url=openai_base_url)
+        except Exception as e:
+            logger.warning(f"⚠️ [HybridRetriever] async embedding client 不可用，改用 thread pool: {e}")
+        try:
+            from qdrant_client import AsyncQdrantClient
+            self.async_qdrant_client = AsyncQdrantClient(url=self.qdrant_url)
+        except Exception as e:
+            logger.warning(f"⚠️ [HybridRetriever] AsyncQdrantClient 不可用，改用 thread pool: {e}")
+
+    async def aclose(self):
+        """關閉 async clients"""
+        for client in (self.async_qdrant_client, self.async_openai_client, self.async_cohere_client):
+            if client is None:
+                continue
+            try:
+                close = getattr(client, "close", None)
+                if close is not None:
+                    await close()
+                elif hasattr(client, "__aexit__"):
+                    # cohere.AsyncClient 沒有 close()，__aexit__ 會關閉它的 httpx client
+                    await client.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"⚠️ [HybridRetriever] 關閉 async client 失敗: {e}")
     
+    @staticmethod
+    def _build_filter(filters: Optional[Dict[str, Any]]):
+        """filters dict -> Qdrant Filter (list 值為 OR)"""
+        if not filters:
+            return None
+        from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+        conditions = []
+        for key, value in filters.items():
+            if isinstance(value, list):
+                conditions.append(Filter(should=[
+                    FieldCondition(key=key, match=MatchValue(value=v))
+                    for v in value
+                ]))
+            else:
+                conditions.append(
+                    FieldCondition(key=key, match=MatchValue(value=value))
+                )
+        return Filter(must=conditions) if conditions else None
+
+    @staticmethod
+    def _bm25_cache_key(filters: Optional[Dict[str, Any]]) -> str:
+        return str(filters) if filters else "all"
+
+    def _bm25_scroll_kwargs(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # 注意：這裡只載入前 1000 個文檔，避免記憶體問題
+        return dict(
+            collection_name=self.collection_name,
+            scroll_filter=self._build_filter(filters),
+            limit=1000,
+            with_payload=True,
+            with_vectors=False
+        )
+
+    def _store_bm25_index(self, cache_key: str, points) -> None:
+        """用 Qdrant points 建立 BM25 索引並放入快取"""
+        documents = [
+            (str(p.id), p.payload.get("text", ""), p.payload)
+            for p in points
+        ]
+        index = BM25Index()
+        index.build_index(documents)
+        self._bm25_indexes[cache_key] = index
+        self._bm25_docs_cache[cache_key] = documents
+        self.bm25_index = index
+
     def _build_bm25_index_from_qdrant(self, filters: Optional[Dict[str, Any]] = None):
         """從 Qdrant 載入文檔並建立 BM25 索引"""
+        cache_key = self._bm25_cache_key(filters)
+        if cache_key in self._bm25_docs_cache:
+            logger.info(f"📚 [BM25] 使用快取索引: {cache_key}")
+            return
         try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-            
-            # 建構過濾條件
-            search_filter = None
-            cache_key = str(filters) if filters else "all"
-            
-            # 檢查快取
-            if cache_key in self._bm25_docs_cache:
-                logger.info(f"📚 [BM25] 使用快取索引: {cache_key}")
-                return
-            
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        conditions.append(Filter(should=[
-                            FieldCondition(key=key, match=MatchValue(value=v))
-                            for v in value
-                        ]))
-                    else:
-                        conditions.append(
-                            FieldCondition(key=key, match=MatchValue(value=value))
-                        )
-                if conditions:
-                    search_filter = Filter(must=conditions)
-            
-            # 從 Qdrant 載入文檔
-            # 注意：這裡只載入前 1000 個文檔，避免記憶體問題
-            points, _ = self.qdrant_client.scroll(
-                collection_name=self.collection_name,
-                scroll_filter=search_filter,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            # 建立索引
-            documents = [
-                (str(p.id), p.payload.get("text", ""), p.payload)
-                for p in points
-            ]
-            
-            self.bm25_index.build_index(documents)
-            self._bm25_docs_cache[cache_key] = documents
-            
+            points, _ = self.qdrant_client.scroll(**self._bm25_scroll_kwargs(filters))
+            self._store_bm25_index(cache_key, points)
         except Exception as e:
             logger.warning(f"⚠️ [BM25] 索引建立失敗: {e}，將只使用語義搜尋")
     
@@ -360,35 +415,24 @@ class HybridRetriever:
         filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """純向量語義搜尋"""
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-        
         query_vector = self.get_query_embedding(query)
-        
-        # 建構過濾條件
-        search_filter = None
-        if filters:
-            conditions = []
-            for key, value in filters.items():
-                if isinstance(value, list):
-                    conditions.append(Filter(should=[
-                        FieldCondition(key=key, match=MatchValue(value=v))
-                        for v in value
-                    ]))
-                else:
-                    conditions.append(
-                        FieldCondition(key=key, match=MatchValue(value=value))
-                    )
-            if conditions:
-                search_filter = Filter(must=conditions)
-        
         results = self.qdrant_client.query_points(
+            **self._query_kwargs(query_vector, top_k, filters)
+        )
+        return self._vector_hits(results)
+
+    def _query_kwargs(self, query_vector: List[float], top_k: int,
+                      filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return dict(
             collection_name=self.collection_name,
             query=query_vector,
-            query_filter=search_filter,
+            query_filter=self._build_filter(filters),
             limit=top_k,
             with_payload=True
         )
-        
+
+    @staticmethod
+    def _vector_hits(results) -> List[Dict[str, Any]]:
         return [
             {
                 "id": str(p.id),
@@ -411,13 +455,14 @@ class HybridRetriever:
         """BM25 關鍵字搜尋"""
         # 建立/更新 BM25 索引
         self._build_bm25_index_from_qdrant(filters)
-        
-        cache_key = str(filters) if filters else "all"
+        return self._bm25_hits(query, top_k, self._bm25_cache_key(filters))
+
+    def _bm25_hits(self, query: str, top_k: int, cache_key: str) -> List[Dict[str, Any]]:
         if cache_key not in self._bm25_docs_cache:
             return []
         
         documents = self._bm25_docs_cache[cache_key]
-        results = self.bm25_index.search(query, top_k=top_k)
+        results = self._bm25_indexes[cache_key].search(query, top_k=top_k)
         
         return [
             {
@@ -507,21 +552,24 @@ class HybridRetriever:
                 documents=texts,
                 top_n=top_k
             )
-            
-            # 重新排序
-            reranked = []
-            for item in response.results:
-                doc = documents[item.index].copy()
-                doc["rerank_score"] = item.relevance_score
-                doc["original_index"] = item.index
-                reranked.append(doc)
-            
-            logger.info(f"✅ [Rerank] 重排序完成，返回 top {len(reranked)}")
-            return reranked
+            return self._apply_rerank(documents, response)
             
         except Exception as e:
             logger.warning(f"⚠️ [Rerank] 失敗: {e}，使用原始排序")
             return documents[:top_k]
+
+    @staticmethod
+    def _apply_rerank(documents: List[Dict], response) -> List[Dict]:
+        """依 rerank 結果重新排序"""
+        reranked = []
+        for item in response.results:
+            doc = documents[item.index].copy()
+            doc["rerank_score"] = item.relevance_score
+            doc["original_index"] = item.index
+            reranked.append(doc)
+        
+        logger.info(f"✅ [Rerank] 重排序完成，返回 top {len(reranked)}")
+        return reranked
     
     def search(
         self,
@@ -573,36 +621,40 @@ class HybridRetriever:
             else:
                 final_results = fused_results[:top_k]
             
-            # 轉換為標準格式
-            results = [
-                {
-                    "text": r["text"],
-                    "file_name": r["file_name"],
-                    "page_label": r["page_label"],
-                    "score": r.get("rerank_score", r.get("rrf_score", r.get("score", 0))),
-                    "metadata": r.get("metadata", {}),
-                    "search_info": {
-                        "vector_rank": r.get("vector_rank"),
-                        "bm25_rank": r.get("bm25_rank"),
-                        "rrf_score": r.get("rrf_score"),
-                        "rerank_score": r.get("rerank_score"),
-                        "source": r.get("source", "hybrid")
-                    }
-                }
-                for r in final_results
-            ]
-            
-            logger.info(f"✅ [HybridRetriever] 最終返回 {len(results)} 結果")
-            for i, r in enumerate(results[:3]):
-                logger.info(f"  [{i+1}] score={r['score']:.4f}, file={r['file_name']}")
-            
-            return results
+            return self._format_results(final_results)
             
         except Exception as e:
             logger.error(f"❌ [HybridRetriever] 搜尋失敗: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return []
+
+    @staticmethod
+    def _format_results(final_results: List[Dict]) -> List[Dict[str, Any]]:
+        """轉換為標準格式"""
+        results = [
+            {
+                "text": r["text"],
+                "file_name": r["file_name"],
+                "page_label": r["page_label"],
+                "score": r.get("rerank_score", r.get("rrf_score", r.get("score", 0))),
+                "metadata": r.get("metadata", {}),
+                "search_info": {
+                    "vector_rank": r.get("vector_rank"),
+                    "bm25_rank": r.get("bm25_rank"),
+                    "rrf_score": r.get("rrf_score"),
+                    "rerank_score": r.get("rerank_score"),
+                    "source": r.get("source", "hybrid")
+                }
+            }
+            for r in final_results
+        ]
+        
+        logger.info(f"✅ [HybridRetriever] 最終返回 {len(results)} 結果")
+        for i, r in enumerate(results[:3]):
+            logger.info(f"  [{i+1}] score={r['score']:.4f}, file={r['file_name']}")
+        
+        return results
     
     def search_multiple(
         self,
@@ -613,12 +665,16 @@ class HybridRetriever:
         """多查詢搜尋"""
         logger.info(f"🔍 [HybridRetriever] 多查詢搜尋: {len(queries)} 個查詢")
         
+        per_query = [self.search(query, top_k=top_k, filters=filters) for query in queries]
+        return self._merge_multiple(queries, per_query)
+
+    @staticmethod
+    def _merge_multiple(queries: List[str], per_query: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """合併多查詢結果 (依文字前 100 字去重)"""
         all_results = []
         seen_texts = set()
         
-        for query in queries:
-            results = self.search(query, top_k=top_k, filters=filters)
-            
+        for results in per_query:
             for r in results:
                 text_key = r["text"][:100] if r["text"] else ""
                 if text_key and text_key not in seen_texts:
@@ -636,6 +692,163 @@ class HybridRetriever:
             "total": len(all_results)
         }
 
+    # ========== 非同步路徑 ==========
+
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        """取得查詢的 embedding 向量 (不阻塞 event loop)"""
+        if self.cohere_client:
+            if self.async_cohere_client is None:
+                return await asyncio.to_thread(self._get_cohere_embedding, query)
+            try:
+                response = await self.async_cohere_client.embed(
+                    texts=[query],
+                    model=self.embed_model,
+                    input_type="search_query"
+                )
+                return response.embeddings[0]
+            except Exception as e:
+                logger.error(f"❌ [HybridRetriever] Cohere embedding 失敗: {e}")
+                raise
+        if self.async_openai_client is None:
+            return await asyncio.to_thread(self._get_openai_embedding, query)
+        try:
+            response = await self.async_openai_client.embeddings.create(
+                model=self.embed_model,
+                input=query
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.error(f"❌ [HybridRetriever] OpenAI embedding 失敗: {e}")
+            raise
+
+    async def _avector_search(
+        self,
+        query: str,
+        top_k: int = 20,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """純向量語義搜尋 (async)"""
+        query_vector = await self.aget_query_embedding(query)
+        kwargs = self._query_kwargs(query_vector, top_k, filters)
+        if self.async_qdrant_client is not None:
+            results = await self.async_qdrant_client.query_points(**kwargs)
+        else:
+            results = await asyncio.to_thread(self.qdrant_client.query_points, **kwargs)
+        return self._vector_hits(results)
+
+    async def _abm25_search(
+        self,
+        query: str,
+        top_k: int = 20,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """BM25 關鍵字搜尋 (async；建索引與計分在 thread pool)"""
+        cache_key = self._bm25_cache_key(filters)
+        if cache_key not in self._bm25_docs_cache:
+            # 同一組 filters 只建一次索引：並行的查詢 (asearch_multiple) 等待同一個 build
+            build = self._bm25_builds.get(cache_key)
+            if build is None:
+                build = asyncio.ensure_future(self._abuild_bm25_index(cache_key, filters))
+                self._bm25_builds[cache_key] = build
+                build.add_done_callback(lambda _: self._bm25_builds.pop(cache_key, None))
+            # shield：單一查詢被取消不會中斷其他查詢共用的 build
+            await asyncio.shield(build)
+            if cache_key not in self._bm25_docs_cache:
+                return []
+        return await asyncio.to_thread(self._bm25_hits, query, top_k, cache_key)
+
+    async def _abuild_bm25_index(self, cache_key: str, filters: Optional[Dict[str, Any]]) -> None:
+        """從 Qdrant 載入文檔並建立 BM25 索引 (async)"""
+        if self.async_qdrant_client is None:
+            await asyncio.to_thread(self._build_bm25_index_from_qdrant, filters)
+            return
+        try:
+            points, _ = await self.async_qdrant_client.scroll(**self._bm25_scroll_kwargs(filters))
+            await asyncio.to_thread(self._store_bm25_index, cache_key, points)
+        except Exception as e:
+            logger.warning(f"⚠️ [BM25] 索引建立失敗: {e}，將只使用語義搜尋")
+
+    async def _acohere_rerank(
+        self,
+        query: str,
+        documents: List[Dict],
+        top_k: int = 10
+    ) -> List[Dict]:
+        """使用 Cohere Rerank 重排序 (async)"""
+        if self.async_cohere_client is None:
+            return await asyncio.to_thread(self._cohere_rerank, query, documents, top_k)
+        if not self.use_rerank:
+            return documents[:top_k]
+        if not documents:
+            return []
+        try:
+            response = await self.async_cohere_client.rerank(
+                model="rerank-multilingual-v3.0",
+                query=query,
+                documents=[doc["text"] for doc in documents],
+                top_n=top_k
+            )
+            return self._apply_rerank(documents, response)
+        except Exception as e:
+            logger.warning(f"⚠️ [Rerank] 失敗: {e}，使用原始排序")
+            return documents[:top_k]
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        use_hybrid: bool = True,
+        use_rerank: bool = None
+    ) -> List[Dict[str, Any]]:
+        """
+        混合搜尋 (async 版本，結果與 search 相同)
+
+        向量搜尋與 BM25 並行執行；全程不阻塞 event loop。
+        """
+        logger.info(f"🔍 [HybridRetriever] ====== 開始搜尋 (async) ======")
+        logger.info(f"🔍 Query: {query[:50]}...")
+        logger.info(f"🔍 Top-K: {top_k}, Hybrid: {use_hybrid}, Rerank: {use_rerank}")
+        
+        try:
+            search_k = top_k * 4 if (use_rerank or self.use_rerank) else top_k * 2
+            if use_hybrid:
+                vector_results, bm25_results = await asyncio.gather(
+                    self._avector_search(query, top_k=search_k, filters=filters),
+                    self._abm25_search(query, top_k=search_k, filters=filters),
+                )
+                logger.info(f"✅ 向量搜尋: {len(vector_results)} 結果, BM25 搜尋: {len(bm25_results)} 結果")
+                fused_results = self._rrf_fusion(vector_results, bm25_results)
+            else:
+                fused_results = await self._avector_search(query, top_k=search_k, filters=filters)
+            
+            should_rerank = use_rerank if use_rerank is not None else self.use_rerank
+            if should_rerank and self.cohere_client:
+                final_results = await self._acohere_rerank(query, fused_results, top_k=top_k)
+            else:
+                final_results = fused_results[:top_k]
+            
+            return self._format_results(final_results)
+            
+        except Exception as e:
+            logger.error(f"❌ [HybridRetriever] 搜尋失敗: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return []
+
+    async def asearch_multiple(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """多查詢搜尋 (async，各查詢並行)"""
+        logger.info(f"🔍 [HybridRetriever] 多查詢搜尋 (async): {len(queries)} 個查詢")
+        per_query = await asyncio.gather(*[
+            self.asearch(query, top_k=top_k, filters=filters) for query in queries
+        ])
+        return self._merge_multiple(queries, list(per_query))
+
 
 # 向後兼容的別名
 Retriever = HybridRetriever
@@ -186,6 +186,8 @@ class KnowledgeBaseService(MCPServiceProtocol, LongTermMemoryProtocol):
     async def shutdown(self) -> None:
         """關閉服務"""
         logger.info(f"🛑 [Service] {self.service_id} shutdown")
+        if self.retriever:
+            await self.retriever.aclose()
         reset_indexer()
         reset_retriever()
     
@@ -224,7 +226,7 @@ class KnowledgeBaseService(MCPServiceProtocol, LongTermMemoryProtocol):
         if not self.retriever:
             raise RuntimeError("Retriever not initialized")
         
-        results = self.retriever.search(query, top_k=top_k, filters=filters)
+        results = await self.retriever.asearch(query, top_k=top_k, filters=filters)
         
         return [
             {
@@ -259,7 +261,7 @@ class KnowledgeBaseService(MCPServiceProtocol, LongTermMemoryProtocol):
                 "error": "Retriever 未初始化"
             }
         
-        results = self.retriever.search(query, top_k=top_k, filters=filters)
+        results = await self.retriever.asearch(query, top_k=top_k, filters=filters)
         
         return {
             "query": query,
@@ -292,7 +294,7 @@ class KnowledgeBaseService(MCPServiceProtocol, LongTermMemoryProtocol):
                 "error": "Retriever 未初始化"
             }
         
-        result = self.retriever.search_multiple(queries, top_k=top_k, filters=filters)
+        result = await self.retriever.asearch_multiple(queries, top_k=top_k, filters=filters)
         
         return {
             "queries": queries,
@@ -1,9 +1,13 @@
 """Anthropic (Claude) LLM provider."""
 
 import os
+import time
 from typing import Any, AsyncGenerator, Dict, Optional
 
+from .base import report_stream_usage
 from .errors import AnthropicError
+from .rate_limiter import RateLimiter, response_headers
+from .usage_ledger import record_usage
 
 
 class AnthropicLLMClient:
@@ -11,8 +15,14 @@ class AnthropicLLMClient:
 
     Lazily imports the anthropic SDK so the package is only required
     when this provider is actually instantiated.
+
+    `system=` is sent as the system block with a `cache_control` breakpoint,
+    so the stable prefix is read from Anthropic's prompt cache on later calls
+    (prefixes shorter than the model's minimum are simply not cached).
     """
 
+    supports_system_prompt = True
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -31,6 +41,7 @@ class AnthropicLLMClient:
         import anthropic
 
         self.client = anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+        self.rate_limiter = RateLimiter.from_env(self.provider_name)
 
     @property
     def provider_name(self) -> str:
@@ -40,23 +51,39 @@ class AnthropicLLMClient:
     def is_available(self) -> bool:
         return bool(self.api_key)
 
+    def _params(self, prompt: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        params = {
+            "model": self.model,
+            "max_tokens": kwargs.get("max_tokens", self.max_tokens),
+            "temperature": kwargs.get("temperature", self.temperature),
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        system = kwargs.get("system")
+        if system:
+            # Cache breakpoint at the end of the stable prefix
+            params["system"] = [{
+                "type": "text", "text": system, "cache_control": {"type": "ephemeral"},
+            }]
+        return params
+
     async def generate(self, prompt: str, **kwargs) -> str | tuple[str, Dict[str, Any]]:
         """Generate a response via Anthropic Messages API."""
         try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=kwargs.get("max_tokens", self.max_tokens),
-                temperature=kwargs.get("temperature", self.temperature),
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            content = response.content[0].text if response.content else ""
-
-            token_info = {
-                "prompt_tokens": response.usage.input_tokens,
-                "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
-            }
+            params = self._params(prompt, kwargs)
+            async with self.rate_limiter.reserve(
+                (kwargs.get("system") or "") + prompt, params["max_tokens"]
+            ) as reservation:
+                # Raw response: rate-limit headers resync the limiter
+                start = time.perf_counter()
+                raw = await self.client.messages.with_raw_response.create(**params)
+                reservation.observe_headers(raw.headers)
+                response = raw.parse()
+
+                content = response.content[0].text if response.content else ""
+
+                token_info = _token_info(response.usage)
+                reservation.settle(token_info)
+            record_usage(self.provider_name, self.model, token_info, time.perf_counter() - start)
 
             if kwargs.get("return_token_info", False):
                 return content, token_info
@@ -67,13 +94,46 @@ class AnthropicLLMClient:
     async def stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
         """Stream response tokens via Anthropic Messages API."""
         try:
-            async with self.client.messages.stream(
-                model=self.model,
-                max_tokens=kwargs.get("max_tokens", self.max_tokens),
-                temperature=kwargs.get("temperature", self.temperature),
-                messages=[{"role": "user", "content": prompt}],
-            ) as stream:
-                async for text in stream.text_stream:
-                    yield text
+            chunks = []
+            params = self._params(prompt, kwargs)
+            async with self.rate_limiter.reserve(
+                (kwargs.get("system") or "") + prompt, params["max_tokens"]
+            ) as reservation:
+                start = time.perf_counter()
+                async with self.client.messages.stream(**params) as stream:
+                    reservation.observe_headers(response_headers(stream))
+                    async for text in stream.text_stream:
+                        chunks.append(text)
+                        yield text
+                    message = await stream.get_final_message()
+                token_info = reservation.settle_stream(
+                    _token_info(message.usage) if message.usage else None, "".join(chunks)
+                )
+            record_usage(self.provider_name, self.model, token_info, time.perf_counter() - start,
+                         estimated=token_info.get("estimated", False), call="stream")
+            report_stream_usage(kwargs, token_info)
         except Exception as e:
             raise AnthropicError(f"Anthropic streaming failed: {e}") from e
+
+
+def _token_info(usage: Any) -> Dict[str, int]:
+    """Token counts incl. prompt-cache reads/writes.
+
+    Anthropic's input_tokens excludes cached input, so prompt_tokens adds the
+    cache read and cache write counts back in.
+    """
+    def count(name: str) -> int:
+        value = getattr(usage, name, 0)
+        return value if isinstance(value, int) else 0
+
+    cache_read = count("cache_read_input_tokens")
+    cache_write = count("cache_creation_input_tokens")
+    prompt_tokens = count("input_tokens") + cache_read + cache_write
+    completion_tokens = count("output_tokens")
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cached_tokens": cache_read,
+        "cache_creation_tokens": cache_write,
+    }
@@ -32,4 +32,17 @@ class LLMProvider(ABC):
 
     @abstractmethod
     async def stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
-        """Yield response tokens as an async generator."""
+        """Yield response tokens as an async generator.
+
+        token_info=<dict> in kwargs is filled, once the stream is exhausted,
+        with the same token_info generate() returns (reported usage when the
+        provider sends it, else an estimate with "estimated": True).
+        """
+
+
+def report_stream_usage(kwargs: Dict[str, Any], token_info: Dict[str, Any]) -> None:
+    """Hand a finished stream's token_info to the caller's token_info= dict."""
+    sink = kwargs.get("token_info")
+    if isinstance(sink, dict):
+        sink.clear()
+        sink.update(token_info)
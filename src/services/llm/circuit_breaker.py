@@ -0,0 +1,197 @@
+"""Per-provider circuit breakers and health scores for the fallback chain.
+
+Without them MultiProviderLLMClient tries providers in fixed order, so while
+the primary is degraded every call first waits for its timeout before falling
+back. ProviderHealth tracks each provider and drives two decisions:
+
+Circuit breaker (closed -> open -> half-open -> closed):
+    closed     calls flow; a rolling window of the last `window` outcomes is
+               kept, where errors and calls slower than `slow_call_s` count
+               as failures. At `failure_threshold` failure rate (after
+               `min_calls`) the breaker opens.
+    open       the provider is skipped for `cooldown_s`.
+    half-open  up to `half_open_probes` trial calls; a success closes the
+               breaker, a failure re-opens it. A probe slot held longer than
+               `probe_timeout_s` (default `slow_call_s`) is reclaimed, so a
+               probe whose outcome is never recorded can't wedge the breaker.
+
+Health score = rolling success rate / (1 + EWMA latency / LATENCY_REF_S).
+Providers are ordered by breaker state, then by score bucket, then by their
+configured position, so small score differences never reshuffle the chain.
+Health with no new outcome for `cooldown_s` reverts to a neutral prior, and an
+open breaker whose cooldown has elapsed ranks like a closed one, so a demoted
+primary gets its probe call and its place back once it recovers.
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Optional
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Circuit breaker + rolling health score for one provider."""
+
+    EWMA_ALPHA = 0.3
+    LATENCY_REF_S = 20.0   # EWMA latency that halves the score
+    PRIOR_SCORE = 0.8      # providers with no calls yet
+    SCORE_BUCKETS = 5      # ordering granularity
+    LATENCY_SAMPLES = 100  # recent successful latencies kept for percentiles
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_threshold: float = 0.5,
+        slow_call_s: float = 30.0,
+        cooldown_s: float = 30.0,
+        half_open_probes: int = 1,
+        probe_timeout_s: Optional[float] = None,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_s = slow_call_s
+        self.cooldown_s = cooldown_s
+        self.half_open_probes = half_open_probes
+        self.probe_timeout_s = slow_call_s if probe_timeout_s is None else probe_timeout_s
+
+        self.state = BreakerState.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = success
+        self._ewma_latency: Optional[float] = None
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)  # successes
+        self._last_outcome_at = 0.0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+        # Stats
+        self._successes = 0
+        self._failures = 0
+        self._rejected = 0
+        self._opened = 0
+
+    # ── breaker ──
+
+    def allow_request(self) -> bool:
+        """Whether a call may be sent now (takes a probe slot when half-open)."""
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown_s:
+                self._rejected += 1
+                return False
+            self.state = BreakerState.HALF_OPEN
+            self._probes = 0
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probes_exhausted():
+                self._rejected += 1
+                return False
+            if self._probes >= self.half_open_probes:
+                self._probes = 0  # outstanding probes timed out
+            self._probes += 1
+            self._probe_started_at = time.monotonic()
+        return True
+
+    def _probes_exhausted(self) -> bool:
+        return (
+            self._probes >= self.half_open_probes
+            and time.monotonic() - self._probe_started_at < self.probe_timeout_s
+        )
+
+    def record_success(self, latency_s: float) -> None:
+        self._observe_latency(latency_s)
+        if latency_s > self.slow_call_s:
+            self._on_failure()
+            return
+        self._successes += 1
+        self._outcomes.append(True)
+        self._latencies.append(latency_s)
+        if self.state == BreakerState.HALF_OPEN:
+            self.state = BreakerState.CLOSED
+            self._outcomes.clear()
+
+    def record_failure(self, latency_s: float) -> None:
+        self._observe_latency(latency_s)
+        self._on_failure()
+
+    def record_ignored(self) -> None:
+        """A call that says nothing about provider health (e.g. a bad request)."""
+        if self.state == BreakerState.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def _on_failure(self) -> None:
+        self._failures += 1
+        self._outcomes.append(False)
+        if self.state == BreakerState.HALF_OPEN:
+            self._open()
+        elif (
+            self.state == BreakerState.CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and self.failure_rate >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._opened += 1
+
+    def _observe_latency(self, latency_s: float) -> None:
+        self._last_outcome_at = time.monotonic()
+        if self._ewma_latency is None:
+            self._ewma_latency = latency_s
+        else:
+            self._ewma_latency += self.EWMA_ALPHA * (latency_s - self._ewma_latency)
+
+    # ── health score ──
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return 1.0 - sum(self._outcomes) / len(self._outcomes)
+
+    def latency_percentile(self, q: float, min_samples: int = 10) -> Optional[float]:
+        """Latency (s) at quantile q of recent successful calls, None if too few."""
+        if len(self._latencies) < min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    @property
+    def score(self) -> float:
+        stale = time.monotonic() - self._last_outcome_at > self.cooldown_s
+        if not self._outcomes or self._ewma_latency is None or stale:
+            return self.PRIOR_SCORE
+        return (1.0 - self.failure_rate) / (1.0 + self._ewma_latency / self.LATENCY_REF_S)
+
+    def sort_key(self, position: int) -> tuple:
+        if self.state == BreakerState.OPEN:
+            cooling = time.monotonic() - self._opened_at < self.cooldown_s
+            rank = 2 if cooling else 0  # due for its half-open probe
+        elif self.state == BreakerState.HALF_OPEN:
+            rank = 1 if self._probes_exhausted() else 0
+        else:
+            rank = 0
+        bucket = min(int(self.score * self.SCORE_BUCKETS), self.SCORE_BUCKETS - 1)
+        return (rank, -bucket, position)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "score": round(self.score, 3),
+            "failure_rate": round(self.failure_rate, 3),
+            "ewma_latency_ms": (
+                round(self._ewma_latency * 1000, 1) if self._ewma_latency is not None else None
+            ),
+            "successes": self._successes,
+            "failures": self._failures,
+            "rejected": self._rejected,
+            "times_opened": self._opened,
+        }
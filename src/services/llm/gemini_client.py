@@ -1,9 +1,13 @@
 """Google Gemini LLM provider."""
 
 import os
+import time
 from typing import Any, AsyncGenerator, Dict, Optional
 
+from .base import report_stream_usage
 from .errors import GeminiError
+from .rate_limiter import RateLimiter
+from .usage_ledger import record_usage
 
 
 class GeminiLLMClient:
@@ -11,8 +15,13 @@ class GeminiLLMClient:
 
     Lazily imports google.genai so the package is only required
     when this provider is actually instantiated.
+
+    `system=` is sent as the system instruction; implicit context-cache hits
+    are reported as `cached_tokens`.
     """
 
+    supports_system_prompt = True
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -29,6 +38,8 @@ class GeminiLLMClient:
         from google import genai
 
         self.client = genai.Client(api_key=self.api_key)
+        # google-genai exposes no rate-limit headers: limits come from env only
+        self.rate_limiter = RateLimiter.from_env(self.provider_name)
 
     @property
     def provider_name(self) -> str:
@@ -46,24 +57,24 @@ class GeminiLLMClient:
             config = types.GenerateContentConfig(
                 temperature=kwargs.get("temperature", self.temperature),
                 max_output_tokens=kwargs.get("max_tokens", self.max_tokens),
+                system_instruction=kwargs.get("system") or None,
             )
 
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=config,
-            )
+            async with self.rate_limiter.reserve(
+                (kwargs.get("system") or "") + prompt, config.max_output_tokens
+            ) as reservation:
+                start = time.perf_counter()
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config,
+                )
 
-            content = response.text or ""
+                content = response.text or ""
 
-            token_info = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-            if hasattr(response, "usage_metadata") and response.usage_metadata:
-                meta = response.usage_metadata
-                token_info = {
-                    "prompt_tokens": getattr(meta, "prompt_token_count", 0) or 0,
-                    "completion_tokens": getattr(meta, "candidates_token_count", 0) or 0,
-                    "total_tokens": getattr(meta, "total_token_count", 0) or 0,
-                }
+                token_info = _token_info(getattr(response, "usage_metadata", None))
+                reservation.settle(token_info)
+            record_usage(self.provider_name, self.model_name, token_info, time.perf_counter() - start)
 
             if kwargs.get("return_token_info", False):
                 return content, token_info
@@ -79,15 +90,42 @@ class GeminiLLMClient:
             config = types.GenerateContentConfig(
                 temperature=kwargs.get("temperature", self.temperature),
                 max_output_tokens=kwargs.get("max_tokens", self.max_tokens),
+                system_instruction=kwargs.get("system") or None,
             )
 
-            response = self.client.aio.models.generate_content_stream(
-                model=self.model_name,
-                contents=prompt,
-                config=config,
-            )
-            async for chunk in response:
-                if chunk.text:
-                    yield chunk.text
+            chunks = []
+            async with self.rate_limiter.reserve(
+                (kwargs.get("system") or "") + prompt, config.max_output_tokens
+            ) as reservation:
+                start = time.perf_counter()
+                response = self.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config,
+                )
+                meta = None
+                async for chunk in response:
+                    # Every chunk carries usage_metadata; the last one has the totals
+                    meta = getattr(chunk, "usage_metadata", None) or meta
+                    if chunk.text:
+                        chunks.append(chunk.text)
+                        yield chunk.text
+                token_info = reservation.settle_stream(
+                    _token_info(meta) if meta else None, "".join(chunks)
+                )
+            record_usage(self.provider_name, self.model_name, token_info, time.perf_counter() - start,
+                         estimated=token_info.get("estimated", False), call="stream")
+            report_stream_usage(kwargs, token_info)
         except Exception as e:
             raise GeminiError(f"Gemini streaming failed: {e}") from e
+
+
+def _token_info(meta: Any) -> Dict[str, int]:
+    if not meta:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    return {
+        "prompt_tokens": getattr(meta, "prompt_token_count", 0) or 0,
+        "completion_tokens": getattr(meta, "candidates_token_count", 0) or 0,
+        "total_tokens": getattr(meta, "total_token_count", 0) or 0,
+        "cached_tokens": getattr(meta, "cached_content_token_count", 0) or 0,
+    }
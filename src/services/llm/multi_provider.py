@@ -3,11 +3,22 @@
 Wraps multiple LLM providers behind the same generate()/stream() interface.
 On failure, transparently falls to the next provider in the chain.
 Integrates with ErrorClassifier from core.errors for smart retry decisions.
+
+Each provider has a circuit breaker and health score (see circuit_breaker.py):
+open breakers are skipped and the chain is tried in health order.
+
+Hedging (opt-in per mode, see enable_hedging): when the first provider has
+not answered within its rolling p90 latency, the same prompt is also sent to
+the next provider; the first success wins and the other call is cancelled.
+Hedges are capped at `budget` x hedge-eligible calls.
 """
 
+import asyncio
 import logging
-from typing import Any, AsyncGenerator, Dict, List
+import time
+from typing import Any, AsyncGenerator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from .circuit_breaker import ProviderHealth
 from .errors import LLMError
 
 logger = logging.getLogger(__name__)
@@ -20,11 +31,56 @@ class MultiProviderLLMClient:
     (processors, engine) don't know or care about the chain.
     """
 
-    def __init__(self, providers: List[Any]):
+    def __init__(self, providers: List[Any], breaker_config: Optional[Dict[str, Any]] = None):
         if not providers:
             raise ValueError("At least one LLM provider is required")
         self.providers = providers
         self._last_provider: str = providers[0].provider_name
+        self.health: Dict[str, ProviderHealth] = {
+            p.provider_name: ProviderHealth(p.provider_name, **(breaker_config or {}))
+            for p in providers
+        }
+        # Hedging (disabled until enable_hedging)
+        self._hedge_modes: Set[str] = set()
+        self._hedge_budget = 0.05
+        self._hedge_default_delay_s = 2.0
+        self._hedge_min_delay_s = 0.2
+        self._hedge_eligible = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._hedge_budget_skips = 0
+
+    def enable_hedging(
+        self,
+        modes: Iterable[str],
+        budget: float = 0.05,
+        default_delay_s: float = 2.0,
+        min_delay_s: float = 0.2,
+    ) -> None:
+        """Hedge generate() calls made by requests in `modes`.
+
+        Args:
+            modes: mode names (e.g. "chat", "knowledge") whose calls may be hedged
+            budget: max hedges as a fraction of hedge-eligible calls
+            default_delay_s: hedge delay until the primary has enough latency samples
+            min_delay_s: lower bound on the hedge delay (p90 of a fast provider)
+        """
+        self._hedge_modes = {str(m) for m in modes}
+        self._hedge_budget = budget
+        self._hedge_default_delay_s = default_delay_s
+        self._hedge_min_delay_s = min_delay_s
+
+    @property
+    def hedge_stats(self) -> Dict[str, Any]:
+        return {
+            "modes": sorted(self._hedge_modes),
+            "budget": self._hedge_budget,
+            "eligible_calls": self._hedge_eligible,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+            "win_rate": round(self._hedge_wins / self._hedges, 4) if self._hedges else 0.0,
+            "budget_skips": self._hedge_budget_skips,
+        }
 
     @property
     def provider_name(self) -> str:
@@ -34,13 +90,151 @@ class MultiProviderLLMClient:
     def is_available(self) -> bool:
         return any(p.is_available for p in self.providers)
 
+    @property
+    def supports_system_prompt(self) -> bool:
+        """True when every provider accepts `system=` (any may serve the call)."""
+        return all(getattr(p, "supports_system_prompt", False) for p in self.providers)
+
+    @property
+    def health_stats(self) -> Dict[str, Any]:
+        """Breaker state and health score per provider, in current chain order."""
+        return {p.provider_name: self._health(p).stats for p in self._ordered()}
+
+    def _health(self, provider: Any) -> ProviderHealth:
+        name = provider.provider_name
+        if name not in self.health:
+            self.health[name] = ProviderHealth(name)
+        return self.health[name]
+
+    def _ordered(self) -> List[Any]:
+        """Providers by breaker state, then health score, then configured order."""
+        return [
+            p for _, p in sorted(
+                enumerate(self.providers),
+                key=lambda ip: self._health(ip[1]).sort_key(ip[0]),
+            )
+        ]
+
+    def _chain(self) -> Iterator[Any]:
+        """Yield providers whose breaker admits a call, lazily.
+
+        Breakers are asked only when the previous provider failed, so a
+        half-open probe slot is taken only for a call that is really sent.
+        When every breaker is open the healthiest provider is still tried:
+        failing fast on all providers would turn a degradation into an outage.
+        """
+        ordered = self._ordered()
+        tried = False
+        for provider in ordered:
+            if self._health(provider).allow_request():
+                tried = True
+                yield provider
+        if not tried:
+            yield ordered[0]
+
+    def _record(self, provider: Any, start: float, error: Optional[Exception] = None) -> None:
+        health = self._health(provider)
+        latency = time.monotonic() - start
+        if error is None:
+            health.record_success(latency)
+        elif self._is_retryable(error):
+            health.record_failure(latency)
+        else:
+            health.record_ignored()
+
+    def _hedging_applies(self) -> bool:
+        if not self._hedge_modes or len(self.providers) < 2:
+            return False
+        try:
+            from core.request_scope import current_scope
+        except ImportError:
+            return False
+        scope = current_scope()
+        return scope is not None and scope.mode in self._hedge_modes
+
+    def _hedge_delay(self, provider: Any) -> float:
+        p90 = self._health(provider).latency_percentile(0.9)
+        delay = self._hedge_default_delay_s if p90 is None else p90
+        return max(self._hedge_min_delay_s, delay)
+
+    async def _attempt(self, provider: Any, prompt: str, kwargs: Dict[str, Any]) -> Any:
+        start = time.monotonic()
+        try:
+            result = await provider.generate(prompt, **kwargs)
+        except asyncio.CancelledError:
+            self._health(provider).record_ignored()  # lost a hedge race
+            raise
+        except Exception as e:
+            self._record(provider, start, e)
+            raise
+        self._record(provider, start)
+        return result
+
+    async def _generate_hedged(
+        self, chain: Iterator[Any], prompt: str, kwargs: Dict[str, Any]
+    ) -> Tuple[bool, Any, int]:
+        """Race the first provider against a delayed hedge on the next one.
+
+        Returns (succeeded, result or last error, providers tried). Providers
+        not consumed from `chain` are left for the regular fallback loop.
+        """
+        primary = next(chain)
+        self._hedge_eligible += 1
+        tasks = {asyncio.create_task(self._attempt(primary, prompt, kwargs)): primary}
+        hedge = None
+        last_error: Optional[Exception] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            if not done:
+                if self._hedges < self._hedge_budget * self._hedge_eligible:
+                    hedge = next(chain, None)
+                    if hedge is not None:
+                        self._hedges += 1
+                        tasks[asyncio.create_task(self._attempt(hedge, prompt, kwargs))] = hedge
+                else:
+                    self._hedge_budget_skips += 1
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self._last_provider = provider.provider_name
+                        if provider is hedge:
+                            self._hedge_wins += 1
+                            logger.info("Hedge won: %s beat %s", hedge.provider_name, primary.provider_name)
+                        return True, task.result(), 1 if hedge is None else 2
+                    logger.warning("Provider %s failed: %s", provider.provider_name, error)
+                    if not self._is_retryable(error):
+                        raise error
+                    last_error = error
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return False, last_error, 1 if hedge is None else 2
+
     async def generate(self, prompt: str, **kwargs) -> str | tuple[str, Dict[str, Any]]:
-        """Try each provider in order until one succeeds."""
+        """Try each provider in health order until one succeeds."""
         last_error = None
+        chain = self._chain()
+        tried = 0
 
-        for i, provider in enumerate(self.providers):
+        if self._hedging_applies():
+            succeeded, outcome, tried = await self._generate_hedged(chain, prompt, kwargs)
+            if succeeded:
+                return outcome
+            last_error = outcome
+            if not self._budget_allows_fallback():
+                raise last_error
+
+        for i, provider in enumerate(chain, start=tried):
+            start = time.monotonic()
             try:
                 result = await provider.generate(prompt, **kwargs)
+                self._record(provider, start)
                 self._last_provider = provider.provider_name
 
                 if i > 0:
@@ -50,31 +244,43 @@ class MultiProviderLLMClient:
                     )
                 return result
 
+            except asyncio.CancelledError:
+                self._health(provider).record_ignored()  # caller gave up: release the probe slot
+                raise
             except Exception as e:
+                self._record(provider, start, e)
                 last_error = e
                 logger.warning(
                     "Provider %s failed: %s%s",
                     provider.provider_name, e,
-                    f" -> trying {self.providers[i + 1].provider_name}"
+                    " -> trying next provider"
                     if i + 1 < len(self.providers) else " -> no more providers",
                 )
 
                 # Check retryability: use error.retryable attribute if available,
                 # otherwise fall back to ErrorClassifier
                 should_fallback = self._is_retryable(e)
-                if not should_fallback:
+                if not should_fallback or not self._budget_allows_fallback():
                     raise
 
         raise last_error  # type: ignore[misc]
 
     async def stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
-        """Try each provider's stream in order until one succeeds."""
+        """Try each provider's stream in health order until one succeeds."""
         last_error = None
 
-        for i, provider in enumerate(self.providers):
+        for i, provider in enumerate(self._chain()):
+            started = False
+            start = time.monotonic()
             try:
                 async for chunk in provider.stream(prompt, **kwargs):
+                    if not started:
+                        # Health tracks time to first chunk for streams
+                        self._record(provider, start)
+                        started = True
                     yield chunk
+                if not started:
+                    self._record(provider, start)
                 self._last_provider = provider.provider_name
                 if i > 0:
                     logger.info(
@@ -82,18 +288,37 @@ class MultiProviderLLMClient:
                         provider.provider_name, i,
                     )
                 return
+            except asyncio.CancelledError:
+                if not started:
+                    self._health(provider).record_ignored()
+                raise
             except Exception as e:
+                if not started:
+                    self._record(provider, start, e)
                 last_error = e
                 logger.warning(
                     "Stream provider %s failed: %s", provider.provider_name, e,
                 )
+                # Chunks already reached the caller: switching providers
+                # would splice two different answers together
+                if started:
+                    raise
                 should_fallback = self._is_retryable(e)
-                if not should_fallback:
+                if not should_fallback or not self._budget_allows_fallback():
                     raise
 
         if last_error:
             raise last_error
 
+    @staticmethod
+    def _budget_allows_fallback() -> bool:
+        """A fallback is a retry: it draws from the request's retry budget."""
+        try:
+            from core.retry_budget import allow_retry
+        except ImportError:
+            return True
+        return allow_retry()
+
     def _is_retryable(self, error: Exception) -> bool:
         """Determine if an error should trigger fallback to the next provider.
 
@@ -116,3 +341,17 @@ class MultiProviderLLMClient:
             if isinstance(error, (ValueError, KeyError, TypeError)):
                 return False
             return True  # Default to retryable for unknown errors
+
+
+def hedge_stats(client: Any) -> Dict[str, Any]:
+    """Hedging stats of a fallback chain ({} when hedging is off)."""
+    if isinstance(client, MultiProviderLLMClient) and client._hedge_modes:
+        return client.hedge_stats
+    return {}
+
+
+def provider_health(client: Any) -> Dict[str, Any]:
+    """Breaker/health stats of a fallback chain ({} for a single provider)."""
+    if isinstance(client, MultiProviderLLMClient):
+        return client.health_stats
+    return {}
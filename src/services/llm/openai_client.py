@@ -1,17 +1,31 @@
 """OpenAI LLM provider."""
 
 import os
+import time
 from typing import Any, AsyncGenerator, Dict, Optional
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, BadRequestError
 
-from .base import LLMProvider
+from .base import LLMProvider, report_stream_usage
 from .errors import OpenAIError
 from .gpt5_adapter import GPT5Adapter
+from .rate_limiter import RateLimiter
+from .usage_ledger import record_usage
 
 
 class OpenAILLMClient(LLMProvider):
-    """OpenAI LLM client (GPT-4o, GPT-4o-mini, etc.)."""
+    """OpenAI LLM client (GPT-4o, GPT-4o-mini, etc.).
+
+    `system=` is sent as the first (system) message. OpenAI caches prompt
+    prefixes automatically; cache hits are reported as `cached_tokens`.
+
+    Streams request usage with `stream_options` unless OPENAI_STREAM_USAGE is
+    off. An OpenAI-compatible server (BASE_URL) that rejects the field with a
+    400 is retried once without it and not sent it again; those streams fall
+    back to the estimated usage.
+    """
+
+    supports_system_prompt = True
 
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, model: str = "gpt-4o-mini"):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -24,6 +38,8 @@ class OpenAILLMClient(LLMProvider):
             raise ValueError("OPENAI_API_KEY is required")
 
         self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.stream_usage = os.getenv("OPENAI_STREAM_USAGE", "true").lower() not in ("0", "false", "no", "off")
+        self.rate_limiter = RateLimiter.from_env(self.provider_name)
 
     @property
     def provider_name(self) -> str:
@@ -33,12 +49,16 @@ class OpenAILLMClient(LLMProvider):
     def is_available(self) -> bool:
         return bool(self.api_key)
 
+    def _output_cap(self, params: Dict[str, Any]) -> int:
+        """Completion budget to reserve: the cap sent (GPT-5 renames it), else the client default."""
+        return params.get("max_completion_tokens") or params.get("max_tokens") or self.max_tokens
+
     async def generate(self, prompt: str, **kwargs) -> str | tuple[str, Dict[str, Any]]:
         """Generate a response via OpenAI ChatCompletion."""
         try:
             params = {
                 "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
+                "messages": _messages(prompt, kwargs.get("system")),
                 "temperature": kwargs.get("temperature", self.temperature)
             }
 
@@ -50,13 +70,18 @@ class OpenAILLMClient(LLMProvider):
             # 使用 GPT5Adapter 適配參數
             params = GPT5Adapter.adapt_parameters(self.model, params)
 
-            response = await self.client.chat.completions.create(**params)
+            async with self.rate_limiter.reserve(
+                (kwargs.get("system") or "") + prompt, self._output_cap(params)
+            ) as reservation:
+                # Raw response: rate-limit headers resync the limiter
+                start = time.perf_counter()
+                raw = await self.client.chat.completions.with_raw_response.create(**params)
+                reservation.observe_headers(raw.headers)
+                response = raw.parse()
 
-            token_info = {
-                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                "total_tokens": response.usage.total_tokens if response.usage else 0,
-            }
+                token_info = _token_info(response.usage)
+                reservation.settle(token_info)
+            record_usage(self.provider_name, self.model, token_info, time.perf_counter() - start)
 
             # 檢查響應內容是否為空
             content = response.choices[0].message.content
@@ -77,10 +102,13 @@ class OpenAILLMClient(LLMProvider):
         """Stream response tokens via OpenAI ChatCompletion."""
         params = {
             "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": _messages(prompt, kwargs.get("system")),
             "temperature": kwargs.get("temperature", self.temperature),
             "stream": True,
         }
+        if self.stream_usage:
+            # Final chunk carries the usage (choices == [])
+            params["stream_options"] = {"include_usage": True}
 
         # 只有當明確指定 max_tokens 時才添加此參數
         max_tokens = kwargs.get("max_tokens")
@@ -90,6 +118,55 @@ class OpenAILLMClient(LLMProvider):
         # 使用 GPT5Adapter 適配參數
         params = GPT5Adapter.adapt_parameters(self.model, params)
 
-        async for chunk in await self.client.chat.completions.create(**params):
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        chunks = []
+        usage = None
+        async with self.rate_limiter.reserve(
+            (kwargs.get("system") or "") + prompt, self._output_cap(params)
+        ) as reservation:
+            start = time.perf_counter()
+            try:
+                raw = await self.client.chat.completions.with_raw_response.create(**params)
+            except BadRequestError:
+                if "stream_options" not in params:
+                    raise
+                # OpenAI-compatible server without stream_options support
+                self.stream_usage = False
+                params.pop("stream_options")
+                raw = await self.client.chat.completions.with_raw_response.create(**params)
+            reservation.observe_headers(raw.headers)
+            async for chunk in raw.parse():
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            token_info = reservation.settle_stream(
+                _token_info(usage) if usage else None, "".join(chunks)
+            )
+        record_usage(self.provider_name, self.model, token_info, time.perf_counter() - start,
+                     estimated=token_info.get("estimated", False), call="stream")
+        report_stream_usage(kwargs, token_info)
+
+
+def _messages(prompt: str, system: Optional[str] = None) -> list:
+    """Stable system prompt first, then the per-request user prompt."""
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    return messages
+
+
+def _token_info(usage: Any) -> Dict[str, int]:
+    return {
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        "total_tokens": usage.total_tokens if usage else 0,
+        "cached_tokens": _cached_tokens(usage),
+    }
+
+
+def _cached_tokens(usage: Any) -> int:
+    """Prompt tokens served from OpenAI's prompt cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0)
+    return cached if isinstance(cached, int) else 0
@@ -0,0 +1,309 @@
+"""Client-side rate limiting per LLM provider (RPM + TPM token buckets).
+
+Deep research bursts used to run straight into provider 429s, after which
+retry_with_backoff slept blindly. Each provider now owns a RateLimiter with
+two token buckets:
+
+- requests per minute (RPM): one unit per call
+- tokens per minute (TPM):  a pre-flight estimate of prompt (+ max_tokens)
+
+Callers wait just long enough for both buckets before sending. After the
+call the estimate is corrected with the real `token_info`, and rate-limit
+response headers (OpenAI `x-ratelimit-*`, Anthropic `anthropic-ratelimit-*`,
+`retry-after`) resync the buckets with the provider's own accounting.
+
+Limits come from env (`OPENAI_RPM`, `OPENAI_TPM`, `ANTHROPIC_RPM`, ...). A
+bucket with no configured limit is unlimited until a `*-limit-*` header
+tells it the real one.
+"""
+
+import asyncio
+import math
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+from core.histogram import QUEUE_WAIT
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count without a tokenizer.
+
+    ~4 ASCII characters per token; CJK and other non-ASCII characters are
+    closer to one token each.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+class TokenBucket:
+    """Continuous-refill bucket: `capacity` units per minute."""
+
+    def __init__(self, per_minute: Optional[float] = None):
+        self.capacity: Optional[float] = None
+        self.level = 0.0
+        self._updated = time.monotonic()
+        if per_minute:
+            self.set_limit(per_minute)
+
+    def set_limit(self, per_minute: float) -> None:
+        first = self.capacity is None
+        self.capacity = float(per_minute)
+        if first:
+            self.level = self.capacity
+        self.level = min(self.level, self.capacity)
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is not None:
+            elapsed = max(0.0, now - self._updated)
+            self.level = min(self.capacity, self.level + elapsed * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if unlimited)."""
+        if self.capacity is None:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversized calls wait for a full bucket
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing * 60.0 / self.capacity
+
+    def take(self, amount: float, now: float) -> None:
+        """Consume units; negative amounts refund. The level may go into debt."""
+        if self.capacity is None:
+            return
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Adopt the provider's remaining count when it is lower than ours."""
+        if self.capacity is None:
+            return
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+def _parse_reset(value: str) -> Optional[float]:
+    """Seconds until reset from '1s', '6m0s', '120ms', '2.5' or an RFC 3339 time."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, reset_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    """RPM + TPM buckets for one provider; waiters are served in arrival order."""
+
+    # (limit, remaining, reset) header names per bucket, OpenAI then Anthropic
+    _HEADERS = {
+        "requests": (
+            ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining",
+             "anthropic-ratelimit-requests-reset"),
+        ),
+        "tokens": (
+            ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+            ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining",
+             "anthropic-ratelimit-tokens-reset"),
+        ),
+    }
+
+    def __init__(self, provider: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        # Stats
+        self._calls = 0
+        self._waits = 0
+        self._wait_s = 0.0
+        self._rate_limited = 0
+        self._estimated = 0
+        self._correction = 0
+
+    @classmethod
+    def from_env(cls, provider: str) -> "RateLimiter":
+        def limit(kind: str) -> Optional[float]:
+            raw = os.getenv(f"{provider.upper()}_{kind}")
+            try:
+                return float(raw) if raw else None
+            except ValueError:
+                return None
+        return cls(provider, rpm=limit("RPM"), tpm=limit("TPM"))
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and `tokens` tokens fit, then consume them."""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self._blocked_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    break
+                self._waits += 1
+                self._wait_s += wait
+                await asyncio.sleep(wait)
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            self._calls += 1
+            self._estimated += tokens
+        QUEUE_WAIT.observe(time.monotonic() - start, queue="rate_limiter", pool=self.provider)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the TPM bucket with the real usage of a finished call."""
+        if actual <= 0:
+            return
+        self.tokens.take(actual - estimated, time.monotonic())
+        self._correction += actual - estimated
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Resync buckets from rate-limit response headers."""
+        if not headers:
+            return
+        now = time.monotonic()
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            for limit_h, remaining_h, _ in self._HEADERS[kind]:
+                limit = headers.get(limit_h)
+                if limit:
+                    try:
+                        bucket.set_limit(float(limit))
+                    except ValueError:
+                        pass
+                remaining = headers.get(remaining_h)
+                if remaining:
+                    try:
+                        bucket.sync(float(remaining), now)
+                    except ValueError:
+                        pass
+
+    def observe_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Record a 429: hold every caller until the provider's retry-after/reset."""
+        self._rate_limited += 1
+        now = time.monotonic()
+        delay = None
+        if headers:
+            for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens",
+                         "anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"):
+                value = headers.get(name)
+                if value:
+                    delay = _parse_reset(value)
+                    if delay is not None:
+                        break
+        if delay is None:
+            delay = 1.0
+        self._blocked_until = max(self._blocked_until, now + delay)
+        return delay
+
+    @asynccontextmanager
+    async def reserve(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator["Reservation"]:
+        """Wait for capacity, yield a Reservation to settle; records 429s."""
+        reservation = Reservation(self, estimate_tokens(prompt), max_tokens)
+        await self.acquire(reservation.estimate)
+        try:
+            yield reservation
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.observe_rate_limited(response_headers(e))
+            raise
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+            "calls": self._calls,
+            "waits": self._waits,
+            "total_wait_ms": round(self._wait_s * 1000, 1),
+            "rate_limited": self._rate_limited,
+            "estimated_tokens": self._estimated,
+            "estimate_correction_tokens": self._correction,
+        }
+
+
+class Reservation:
+    """Pre-flight estimate of one call, corrected once the call finishes."""
+
+    def __init__(self, limiter: RateLimiter, prompt_tokens: int, max_tokens: Optional[int] = None):
+        self._limiter = limiter
+        self.prompt_tokens = prompt_tokens
+        self.estimate = prompt_tokens + (max_tokens or 0)
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        self._limiter.observe_headers(headers)
+
+    def settle(self, token_info: Optional[Dict[str, Any]]) -> None:
+        actual = (token_info or {}).get("total_tokens", 0) or 0
+        self._limiter.settle(self.estimate, int(actual))
+
+    def settle_stream(self, token_info: Optional[Dict[str, Any]], completion: str) -> Dict[str, Any]:
+        """Settle a streamed call with the usage it reported, else from its text.
+
+        Returns the token_info; an estimate carries "estimated": True.
+        """
+        if token_info and token_info.get("total_tokens"):
+            self.settle(token_info)
+            return token_info
+        return {**self.settle_text(completion), "estimated": True}
+
+    def settle_text(self, completion: str) -> Dict[str, int]:
+        """Settle a streamed call that reported no usage from its output text.
+
+        Returns the estimated token_info.
+        """
+        completion_tokens = estimate_tokens(completion)
+        self._limiter.settle(self.estimate, self.prompt_tokens + completion_tokens)
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": self.prompt_tokens + completion_tokens,
+        }
+
+
+def response_headers(obj: Any) -> Optional[Mapping[str, str]]:
+    """Headers of an SDK raw response / API error, if it exposes them."""
+    headers = getattr(obj, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(obj, "response", None), "headers", None)
+    return headers if hasattr(headers, "get") else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def rate_limit_stats(client: Any) -> Dict[str, Any]:
+    """Limiter stats of every provider behind `client` (single or multi)."""
+    providers = getattr(client, "providers", None) or [client]
+    stats = {}
+    for provider in providers:
+        limiter = getattr(provider, "rate_limiter", None)
+        if isinstance(limiter, RateLimiter):
+            stats[limiter.provider] = limiter.stats
+    return stats
@@ -0,0 +1,185 @@
+"""Per-call LLM usage ledger (tokens, latency, cost) as daily JSONL files.
+
+Every provider call appends one line to `data/cost/usage_YYYY-MM-DD.jsonl`:
+
+    {"timestamp", "provider", "model", "prompt_tokens", "completion_tokens",
+     "cached_tokens", "cache_creation_tokens", "total_tokens", "latency_ms",
+     "cost_usd", "priced", "estimated", "trace_id", "mode", "stage"}
+
+trace_id and mode come from the request scope, stage from the pipeline stage
+last started with `structured_logger.progress(step, "start")`. Streamed calls
+record the usage reported at the end of the stream; only a stream that
+reports none is recorded from an estimate (`estimated: true`).
+
+Lines go through a LogSink (background writer thread, one buffered write per
+batch, daily + size rotation), so recording never does file I/O on the event
+loop. scripts/measure_kv_cache.py and scripts/stage_cost_report.py read the
+files.
+
+Config (env): USAGE_LEDGER_ENABLED (default true), USAGE_LEDGER_DIR
+(default data/cost).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from core.histogram import LLM_CALL_DURATION
+from core.log_sink import LogSink
+from core.request_scope import current_scope, current_stage
+
+# USD per 1M tokens: (input, cached input, output, cache write).
+# Matched by longest model-name prefix; list prices, used as estimates.
+PRICES: Dict[str, Tuple[float, float, float, float]] = {
+    "gpt-4o": (2.50, 1.25, 10.00, 2.50),
+    "gpt-4o-mini": (0.15, 0.075, 0.60, 0.15),
+    "gpt-4.1": (2.00, 0.50, 8.00, 2.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60, 0.40),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40, 0.10),
+    "gpt-5": (1.25, 0.125, 10.00, 1.25),
+    "gpt-5-mini": (0.25, 0.025, 2.00, 0.25),
+    "gpt-5-nano": (0.05, 0.005, 0.40, 0.05),
+    "claude-opus-4": (15.00, 1.50, 75.00, 18.75),
+    "claude-opus-4-5": (5.00, 0.50, 25.00, 6.25),
+    "claude-sonnet-4": (3.00, 0.30, 15.00, 3.75),
+    "claude-3-7-sonnet": (3.00, 0.30, 15.00, 3.75),
+    "claude-3-5-sonnet": (3.00, 0.30, 15.00, 3.75),
+    "claude-haiku-4": (1.00, 0.10, 5.00, 1.25),
+    "claude-3-5-haiku": (0.80, 0.08, 4.00, 1.00),
+    "claude-3-opus": (15.00, 1.50, 75.00, 18.75),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40, 0.10),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50, 0.30),
+    "gemini-2.5-pro": (1.25, 0.31, 10.00, 1.25),
+    "deepseek-chat": (0.27, 0.07, 1.10, 0.27),
+}
+
+
+def _price(model: str) -> Optional[Tuple[float, float, float, float]]:
+    model = (model or "").lower()
+    best = None
+    for prefix in PRICES:
+        if model.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return PRICES[best] if best else None
+
+
+def estimate_cost(model: str, token_info: Dict[str, Any]) -> Optional[float]:
+    """USD cost of one call from the price table, None for unknown models.
+
+    prompt_tokens includes cached and cache-write tokens; each part is billed
+    at its own rate.
+    """
+    price = _price(model)
+    if price is None:
+        return None
+    input_rate, cached_rate, output_rate, write_rate = price
+    cached = token_info.get("cached_tokens", 0) or 0
+    written = token_info.get("cache_creation_tokens", 0) or 0
+    uncached = max(0, (token_info.get("prompt_tokens", 0) or 0) - cached - written)
+    completion = token_info.get("completion_tokens", 0) or 0
+    return (
+        uncached * input_rate
+        + cached * cached_rate
+        + written * write_rate
+        + completion * output_rate
+    ) / 1_000_000
+
+
+def _request_labels() -> Dict[str, Optional[str]]:
+    """trace_id / mode / stage of the calling request (None outside one)."""
+    scope = current_scope()
+    return {
+        "trace_id": scope.trace_id if scope else None,
+        "mode": scope.mode if scope else None,
+        "stage": current_stage(),
+    }
+
+
+class _LedgerSink(LogSink):
+    def _format_drop_notice(self, count: int) -> Optional[str]:
+        return None  # keep every line valid JSON; drops are counted in stats
+
+
+class UsageLedger:
+    """Append-only JSONL ledger of LLM calls."""
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self._sink = _LedgerSink(self.log_dir, prefix="usage", suffix=".jsonl",
+                                 date_format="%Y-%m-%d")
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        token_info: Optional[Dict[str, Any]],
+        latency_s: float,
+        estimated: bool = False,
+    ) -> Dict[str, Any]:
+        """Append one call; returns the entry written."""
+        info = token_info or {}
+        cost = estimate_cost(model, info)
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": info.get("prompt_tokens", 0) or 0,
+            "completion_tokens": info.get("completion_tokens", 0) or 0,
+            "cached_tokens": info.get("cached_tokens", 0) or 0,
+            "cache_creation_tokens": info.get("cache_creation_tokens", 0) or 0,
+            "total_tokens": info.get("total_tokens", 0) or 0,
+            "latency_ms": round(latency_s * 1000, 1),
+            "cost_usd": round(cost, 6) if cost is not None else 0.0,
+            "priced": cost is not None,
+            "estimated": estimated,
+            **_request_labels(),
+        }
+        self._sink.write(json.dumps(entry, ensure_ascii=False))
+        return entry
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return self._sink.flush(timeout)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self._sink.stats
+
+
+_DEFAULT_DIR = Path(__file__).parent.parent.parent.parent / "data" / "cost"
+_ledgers: Dict[str, UsageLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """Process-wide ledger for USAGE_LEDGER_DIR, None when disabled."""
+    if os.getenv("USAGE_LEDGER_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+    log_dir = os.getenv("USAGE_LEDGER_DIR") or str(_DEFAULT_DIR)
+    ledger = _ledgers.get(log_dir)
+    if ledger is None:
+        with _ledgers_lock:
+            ledger = _ledgers.get(log_dir)
+            if ledger is None:
+                ledger = _ledgers[log_dir] = UsageLedger(Path(log_dir))
+    return ledger
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    token_info: Optional[Dict[str, Any]],
+    latency_s: float,
+    estimated: bool = False,
+    call: str = "generate",
+) -> None:
+    """Record one provider call in the latency histogram and the ledger.
+
+    call: "generate" or "stream" (histogram label, independent of `estimated`).
+    """
+    LLM_CALL_DURATION.observe(latency_s, provider=provider, model=model, call=call)
+    ledger = get_usage_ledger()
+    if ledger is not None:
+        ledger.record(provider, model, token_info, latency_s, estimated)
@@ -12,6 +12,7 @@ Sandbox Service - 安全沙箱執行服務（Docker 隔離版）
 
 from typing import List, Dict, Any, Optional, Tuple
 import asyncio
+import functools
 import json
 import os
 import logging
@@ -22,7 +23,9 @@ import threading
 import time
 import uuid
 import re
+import signal
 
+from core.histogram import SANDBOX_EXECUTION
 from core.protocols import MCPServiceProtocol
 
 logger = logging.getLogger(__name__)
@@ -184,6 +187,10 @@ class CodeSecurityFilter:
         return code
 
 
+# Queued by _PersistentSandbox.interrupt() to wake a cancelled execute()
+_INTERRUPTED = {"status": "interrupted"}
+
+
 class _PersistentSandbox:
     """
     Persistent Docker container with a long-running Python REPL process.
@@ -209,6 +216,7 @@ class _PersistentSandbox:
         self._response_queue: queue.Queue = queue.Queue()
         self._lock = threading.Lock()
         self._alive = False
+        self._current: Optional[threading.Event] = None  # cancel flag of the running execute()
 
     def start(self) -> bool:
         """Create container, attach socket, start reader, wait for ready signal."""
@@ -258,8 +266,14 @@ class _PersistentSandbox:
             self.stop()
             return False
 
-    def execute(self, code: str, timeout: int = 60) -> dict:
-        """Send code to the persistent container, wait for result with timeout."""
+    def execute(self, code: str, timeout: int = 60,
+                cancelled: Optional[threading.Event] = None) -> dict:
+        """Send code to the persistent container, wait for result with timeout.
+
+        `cancelled` is set (and interrupt() called) when the awaiting caller
+        is cancelled: the code is then not sent, or the container is
+        restarted to kill it.
+        """
         with self._lock:
             if not self._alive or not self._container:
                 raise RuntimeError("Persistent sandbox is not running")
@@ -271,6 +285,11 @@ class _PersistentSandbox:
                 except queue.Empty:
                     break
 
+            self._current = cancelled
+            if cancelled is not None and cancelled.is_set():
+                self._current = None
+                return self._cancelled_result()
+
             payload = json.dumps({"code": code}, ensure_ascii=False) + "\n"
             try:
                 self._socket._sock.sendall(payload.encode('utf-8'))
@@ -279,7 +298,7 @@ class _PersistentSandbox:
                 raise RuntimeError(f"Sandbox socket broken: {e}")
 
             try:
-                return self._response_queue.get(timeout=timeout)
+                msg = self._response_queue.get(timeout=timeout)
             except queue.Empty:
                 logger.warning(
                     f"Persistent sandbox timed out after {timeout}s, restarting"
@@ -292,6 +311,30 @@ class _PersistentSandbox:
                     "stdout": "", "stderr": "",
                     "figures": [], "return_value": None
                 }
+            finally:
+                self._current = None
+
+            if msg is _INTERRUPTED:
+                logger.info("Persistent sandbox execution cancelled, restarting")
+                self._restart()
+                return self._cancelled_result()
+            return msg
+
+    def interrupt(self, cancelled: threading.Event):
+        """Abort the execute() call owning `cancelled` (its caller went away)."""
+        cancelled.set()
+        if self._current is cancelled:
+            self._response_queue.put(_INTERRUPTED)
+
+    @staticmethod
+    def _cancelled_result() -> dict:
+        return {
+            "success": False,
+            "error": "Execution cancelled",
+            "error_type": "CancelledError",
+            "stdout": "", "stderr": "",
+            "figures": [], "return_value": None
+        }
 
     def _read_loop(self):
         """Background thread: parse Docker multiplexed stream, collect JSON lines."""
@@ -501,16 +544,18 @@ class SandboxService(MCPServiceProtocol):
         logger.debug(f"🔧 [Sandbox] 參數: {params}")
         
         if method == "execute_python":
-            return await self._execute_python(
-                code=params.get("code", ""),
-                timeout=params.get("timeout", self.timeout)
-            )
+            with SANDBOX_EXECUTION.time(language="python"):
+                return await self._execute_python(
+                    code=params.get("code", ""),
+                    timeout=params.get("timeout", self.timeout)
+                )
         
         elif method == "execute_bash":
-            return await self._execute_bash(
-                command=params.get("command", ""),
-                timeout=params.get("timeout", self.timeout)
-            )
+            with SANDBOX_EXECUTION.time(language="bash"):
+                return await self._execute_bash(
+                    command=params.get("command", ""),
+                    timeout=params.get("timeout", self.timeout)
+                )
         
         elif method == "file_read":
             return await self._file_read(params.get("path", ""))
@@ -630,12 +675,19 @@ class SandboxService(MCPServiceProtocol):
         """Execute Python — prefer persistent sandbox, fallback to ephemeral."""
         # Try persistent sandbox first (zero cold start)
         if self._persistent_sandbox and self._persistent_sandbox.is_alive:
+            sandbox = self._persistent_sandbox
+            cancelled = threading.Event()
             try:
                 loop = asyncio.get_event_loop()
                 result = await loop.run_in_executor(
-                    None, self._persistent_sandbox.execute, code, timeout
+                    None, sandbox.execute, code, timeout, cancelled
                 )
                 return result
+            except asyncio.CancelledError:
+                # The worker thread keeps waiting on the REPL: wake it so it
+                # restarts the container and the cancelled code stops running
+                sandbox.interrupt(cancelled)
+                raise
             except RuntimeError as e:
                 logger.warning(
                     f"Persistent sandbox failed: {e}, falling back to ephemeral"
@@ -681,9 +733,11 @@ class SandboxService(MCPServiceProtocol):
             socket._sock.shutdown(1)  # 關閉寫入端
             socket.close()
             
-            # 等待完成
+            # 等待完成（在執行緒中等待，取消時由 finally 強制移除容器）
             try:
-                result = container.wait(timeout=timeout)
+                result = await asyncio.get_event_loop().run_in_executor(
+                    None, functools.partial(container.wait, timeout=timeout)
+                )
                 exit_code = result.get("StatusCode", -1)
             except Exception as e:
                 # 超時
@@ -862,12 +916,14 @@ class SandboxService(MCPServiceProtocol):
             return await self._execute_bash_docker(command, timeout)
         
         # 本地執行
+        proc = None
         try:
             proc = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=self.working_dir
+                cwd=self.working_dir,
+                start_new_session=(os.name == "posix"),  # 以行程群組終止子行程
             )
             
             stdout, stderr = await asyncio.wait_for(
@@ -883,7 +939,12 @@ class SandboxService(MCPServiceProtocol):
                 "error": None if proc.returncode == 0 else "Command failed"
             }
             
+        except asyncio.CancelledError:
+            # 請求已取消：終止子行程，避免遺留孤兒行程
+            await self._kill_process(proc)
+            raise
         except asyncio.TimeoutError:
+            await self._kill_process(proc)
             return {
                 "success": False,
                 "stdout": "",
@@ -900,6 +961,20 @@ class SandboxService(MCPServiceProtocol):
                 "error": str(e)
             }
     
+    @staticmethod
+    async def _kill_process(proc) -> None:
+        """Kill a local subprocess (and the commands its shell started) and reap it."""
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            return
+        await proc.wait()
+
     async def _execute_bash_docker(
         self,
         command: str,
@@ -917,7 +992,9 @@ class SandboxService(MCPServiceProtocol):
             )
             
             try:
-                result = container.wait(timeout=timeout)
+                result = await asyncio.get_event_loop().run_in_executor(
+                    None, functools.partial(container.wait, timeout=timeout)
+                )
                 logs = container.logs().decode("utf-8", errors="replace")
                 exit_code = result.get("StatusCode", -1)
                 
@@ -0,0 +1,309 @@
+"""
+HTML / PDF 內容擷取 - 在 event loop 之外執行
+
+WebSearchService.fetch_url 以前直接在 event loop 上跑 BeautifulSoup
+(html.parser + decompose + class regex)，每頁 100–500 ms 的 CPU 時間
+會卡住同一個 worker 上的所有請求。
+
+- extract_main_text(data, charset)：純函式，輸入原始 bytes (已截斷)，
+  輸出清理後的文字。先走 lxml 快速路徑 (article / main / readability
+  評分)，失敗或內容太少時退回原本的 BeautifulSoup 路徑。編碼偵測
+  (UnicodeDammit：header charset → <meta charset> → 猜測) 也在這裡做。
+- extract_pdf_text(data)：PyMuPDF 直接開記憶體中的 bytes
+  (fitz.open(stream=...))，文字累積到 MAX_PDF_CHARS 就停止，不再固定讀滿
+  MAX_PDF_PAGES 頁。
+- ExtractionPool：固定 worker 數的 ProcessPoolExecutor (spawn)，
+  bs4 / lxml / PyMuPDF 的 CPU 時間不佔用 event loop 的 GIL。子 process
+  當掉時以 backoff 重建 pool；只有無法建立 process pool 時退回 thread pool。
+
+設定 (env)：HTML_EXTRACT_WORKERS (預設 min(4, CPU 數)，0 = 使用 thread)，
+FETCH_MAX_HTML_BYTES (預設 2 MB，超過的部分在解析前丟棄)。
+"""
+
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_CHARS = 5000
+MIN_FAST_TEXT_CHARS = 200  # 快速路徑擷取到的文字少於此值時改用 bs4
+MAX_PDF_PAGES = 30
+MAX_PDF_CHARS = 15000
+
+_DROP_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript', 'form')
+_CONTENT_CLASS_RE = re.compile(r'content|article|post|entry|text')
+_CANDIDATE_TAGS = {'div', 'section', 'td', 'article', 'main'}
+
+
+def max_html_bytes() -> int:
+    try:
+        return int(os.getenv("FETCH_MAX_HTML_BYTES", 2 * 1024 * 1024))
+    except ValueError:
+        return 2 * 1024 * 1024
+
+
+def _decode(data: bytes, charset: Optional[str]) -> str:
+    from bs4.dammit import UnicodeDammit
+    dammit = UnicodeDammit(data, [charset] if charset else [], is_html=True)
+    return dammit.unicode_markup or data.decode('utf-8', errors='replace')
+
+
+def _finalize(text: str) -> Optional[str]:
+    # 清理多餘空行
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    # 限制長度
+    if len(text) > MAX_TEXT_CHARS:
+        text = text[:MAX_TEXT_CHARS] + "...[內容截斷]"
+    return text or None
+
+
+# ─── BeautifulSoup 路徑 (原本的實作) ───
+
+def extract_with_bs4(html: str) -> Optional[str]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # 移除不需要的元素
+    for tag in soup(list(_DROP_TAGS)):
+        tag.decompose()
+
+    # 嘗試找主要內容區塊
+    main_content = (
+        soup.find('article') or
+        soup.find('main') or
+        soup.find(class_=_CONTENT_CLASS_RE) or
+        soup.find('body')
+    )
+    if not main_content:
+        return None
+    return _finalize(main_content.get_text(separator='\n', strip=True))
+
+
+# ─── lxml 快速路徑 ───
+
+def _text_of(element) -> str:
+    # 等同 bs4 get_text(separator='\n', strip=True)
+    return '\n'.join(s.strip() for s in element.itertext() if s.strip())
+
+
+def _link_density(element, text_len: int) -> float:
+    link_len = sum(len(a.text_content()) for a in element.iter('a'))
+    return link_len / text_len if text_len else 1.0
+
+
+def _readability_candidate(root):
+    """簡化版 readability：段落分數累加到父節點 (祖父節點一半)，再依連結密度打折"""
+    scores: Dict = defaultdict(float)
+    for p in root.iter('p', 'pre', 'blockquote'):
+        text = p.text_content().strip()
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(',') + text.count('，') + min(len(text) // 100, 3)
+        parent = p.getparent()
+        if parent is None:
+            continue
+        scores[parent] += score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] += score / 2
+
+    best, best_score = None, 0.0
+    for element, score in scores.items():
+        if element.tag not in _CANDIDATE_TAGS:
+            continue
+        score *= 1 - _link_density(element, len(element.text_content()))
+        if score > best_score:
+            best, best_score = element, score
+    return best
+
+
+def extract_with_lxml(html: str) -> Optional[str]:
+    import lxml.html
+
+    parser = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+    root = lxml.html.document_fromstring(html.encode('utf-8', errors='replace'), parser=parser)
+    for element in list(root.iter(*_DROP_TAGS)):
+        element.drop_tree()  # 保留 tail 文字，與 bs4 decompose 相同
+
+    main_content = root.find('.//article')
+    if main_content is None:
+        main_content = root.find('.//main')
+    if main_content is None:
+        main_content = _readability_candidate(root)
+    if main_content is None:
+        main_content = root.find('body')
+    if main_content is None:
+        return None
+    return _finalize(_text_of(main_content))
+
+
+def extract_main_text(data: bytes, charset: Optional[str] = None,
+                      backend: str = "auto") -> Optional[str]:
+    """擷取網頁主要文字 (可在子 process 執行)
+
+    Args:
+        data: 原始 HTML bytes (呼叫端應先截斷至 max_html_bytes())
+        charset: Content-Type header 的 charset (可為 None)
+        backend: "auto" (lxml，失敗退回 bs4) / "lxml" / "bs4"
+    """
+    html = _decode(data, charset)
+    if backend in ("auto", "lxml"):
+        try:
+            text = extract_with_lxml(html)
+            if backend == "lxml" or (text and len(text) >= MIN_FAST_TEXT_CHARS):
+                return text
+        except Exception as e:
+            if backend == "lxml":
+                raise
+            logger.debug(f"lxml 擷取失敗，改用 BeautifulSoup: {e}")
+    return extract_with_bs4(html)
+
+
+def pdf_support_available() -> bool:
+    """PyMuPDF 是否已安裝 (不在主 process 載入它)"""
+    return importlib.util.find_spec("fitz") is not None
+
+
+def extract_pdf_text(data: bytes, max_pages: int = MAX_PDF_PAGES,
+                     max_chars: int = MAX_PDF_CHARS) -> Tuple[Optional[str], int]:
+    """從記憶體中的 PDF 擷取文字 (可在子 process 執行)
+
+    Returns:
+        (文字或 None, 實際讀取的頁數)
+    """
+    import fitz  # PyMuPDF
+
+    text_parts = []
+    chars = 0
+    pages_read = 0
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            if pages_read >= max_pages or chars >= max_chars:
+                break
+            pages_read += 1
+            page_text = page.get_text("text").strip()
+            if page_text:
+                text_parts.append(page_text)
+                chars += len(page_text) + 2
+
+    full_text = "\n\n".join(text_parts)
+    if len(full_text) > max_chars:
+        full_text = full_text[:max_chars] + "...[PDF content truncated]"
+    return full_text or None, pages_read
+
+
+class ExtractionPool:
+    """固定大小的 process pool；HTML_EXTRACT_WORKERS=0 或無法建立時使用 thread
+
+    子 process 當掉 (BrokenProcessPool) 時重建 pool：連續損壞時以指數
+    backoff 延後重建，該次呼叫在新 pool 重試一次。不改用 thread 執行，
+    否則讓子 process 當掉的輸入會直接打進主 process。
+    """
+
+    RESTART_BASE_DELAY = 0.5
+    RESTART_MAX_DELAY = 30.0
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._use_threads = workers <= 0
+        self._failures = 0       # 連續損壞次數 (成功後歸零)
+        self._restart_at = 0.0   # 重建前的 backoff 截止時間 (monotonic)
+        self._restarts = 0
+        if not self._use_threads:
+            self._create()
+
+    def _create(self) -> None:
+        try:
+            # spawn：不 fork 帶著 event loop / 監控 thread 的父 process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        except (OSError, NotImplementedError, ValueError) as e:
+            logger.warning(f"⚠️ HTML 擷取 process pool 無法建立，改用 thread: {e}")
+            self._use_threads = True
+
+    @property
+    def mode(self) -> str:
+        return "thread" if self._use_threads else "process"
+
+    async def _process_executor(self) -> Optional[ProcessPoolExecutor]:
+        """目前的 process pool；損壞後等 backoff 結束再重建"""
+        if self._executor is None and not self._use_threads:
+            delay = self._restart_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._executor is None and not self._use_threads:  # 其他呼叫者可能已重建
+                self._restarts += 1
+                logger.info(f"🔄 重建 HTML 擷取 process pool (第 {self._restarts} 次)")
+                self._create()
+        return self._executor
+
+    def _mark_broken(self, executor: ProcessPoolExecutor, error: Exception) -> None:
+        if executor is not self._executor:
+            return  # 同一個 pool 的其他呼叫者已處理
+        self._failures += 1
+        delay = min(self.RESTART_MAX_DELAY, self.RESTART_BASE_DELAY * 2 ** (self._failures - 1))
+        self._restart_at = time.monotonic() + delay
+        logger.warning(f"⚠️ 擷取 process pool 已損壞，{delay:.1f}s 後重建: {error}")
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def _run(self, fn: Callable, *args):
+        for attempt in range(2):
+            executor = await self._process_executor()
+            if executor is None:
+                return await asyncio.to_thread(fn, *args)
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool as e:
+                self._mark_broken(executor, e)
+                if attempt:
+                    raise
+                continue
+            self._failures = 0
+            return result
+
+    async def extract(self, data: bytes, charset: Optional[str] = None) -> Optional[str]:
+        return await self._run(extract_main_text, data, charset)
+
+    async def extract_pdf(self, data: bytes) -> Tuple[Optional[str], int]:
+        return await self._run(extract_pdf_text, data)
+
+    def shutdown(self) -> None:
+        """關閉 pool；之後的呼叫改用 thread"""
+        self._use_threads = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    global _pool
+    if _pool is None:
+        default = min(4, os.cpu_count() or 1)
+        try:
+            workers = int(os.getenv("HTML_EXTRACT_WORKERS", default))
+        except ValueError:
+            workers = default
+        _pool = ExtractionPool(workers)
+    return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
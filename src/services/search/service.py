@@ -5,9 +5,9 @@ Web Search Service - 網路搜尋服務 (增強版)
 """
 
 import os
-import re
 import logging
 import asyncio
+import time
 import aiohttp
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict, field
@@ -15,6 +15,14 @@ from datetime import datetime
 from urllib.parse import quote_plus, urlparse
 from bs4 import BeautifulSoup
 
+from core.histogram import FETCH_DURATION, SEARCH_DURATION
+from core.tracing import current_span, span
+from .extraction import (
+    get_extraction_pool,
+    max_html_bytes,
+    pdf_support_available,
+    shutdown_extraction_pool,
+)
 from core.utils import load_env
 load_env()
 
@@ -93,6 +101,7 @@ class WebSearchService:
         """關閉 session"""
         if self._session and not self._session.closed:
             await self._session.close()
+        shutdown_extraction_pool()
     
     # ═══════════════════════════════════════════════════════════════
     # 搜尋方法
@@ -118,7 +127,15 @@ class WebSearchService:
         await self.initialize()
 
         effective = provider or self.provider
+        with SEARCH_DURATION.time(provider=effective), \
+                span("search", provider=effective, query=query) as search_span:
+            results = await self._search(query, max_results, search_type, effective)
+            search_span.set_attribute("results", len(results))
+            return results
 
+    async def _search(
+        self, query: str, max_results: int, search_type: str, effective: str
+    ) -> List[SearchResult]:
         try:
             if effective == "tavily":
                 results = await self._search_tavily(query, max_results, search_type)
@@ -169,6 +186,8 @@ class WebSearchService:
         merged = []
         
         for results in all_results:
+            if isinstance(results, asyncio.CancelledError):
+                raise results  # 請求已取消，不當作引擎失敗
             if isinstance(results, Exception):
                 logger.warning(f"⚠️ 引擎失敗: {results}")
                 continue
@@ -485,6 +504,14 @@ class WebSearchService:
 
     async def fetch_url(self, url: str, timeout: int = 15) -> Optional[str]:
         """抓取網頁內容並提取主要文字"""
+        start = time.perf_counter()
+        with span("fetch", url=url) as fetch_span:
+            text = await self._fetch_url(url, timeout)
+            fetch_span.set_attributes(chars=len(text or ""), ok=bool(text))
+        FETCH_DURATION.observe(time.perf_counter() - start, outcome="ok" if text else "failed")
+        return text
+
+    async def _fetch_url(self, url: str, timeout: int) -> Optional[str]:
         # Guard: skip URLs that exceed HTTP header limits
         if len(url.encode('utf-8')) > 4096:
             logger.warning(f"⏭️ URL too long ({len(url.encode('utf-8'))} bytes), skipping: {url[:80]}...")
@@ -517,29 +544,12 @@ class WebSearchService:
                     if not any(t in content_type for t in ('text/', 'application/json', 'application/xml', 'application/xhtml')):
                         logger.warning(f"⏭️ Non-text content ({content_type}), skipping: {url[:80]}...")
                         return None
-                    html = await resp.text(errors='replace')
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # 移除不需要的元素
-                    for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript', 'form']):
-                        tag.decompose()
-                    
-                    # 嘗試找主要內容區塊
-                    main_content = (
-                        soup.find('article') or 
-                        soup.find('main') or 
-                        soup.find(class_=re.compile(r'content|article|post|entry|text')) or
-                        soup.find('body')
-                    )
-                    
-                    if main_content:
-                        text = main_content.get_text(separator='\n', strip=True)
-                        # 清理多餘空行
-                        text = re.sub(r'\n{3,}', '\n\n', text)
-                        # 限制長度
-                        if len(text) > 5000:
-                            text = text[:5000] + "...[內容截斷]"
-                        
+                    data, truncated = await self._read_capped(resp, max_html_bytes())
+                    current_span().set_attributes(bytes=len(data), truncated=truncated)
+
+                    # 解析在 process pool 裡做，不佔用 event loop
+                    text = await get_extraction_pool().extract(data, resp.charset)
+                    if text:
                         logger.info(f"✅ 抓取成功: {urlparse(url).netloc} ({len(text)} 字)")
                         return text
                     
@@ -550,22 +560,32 @@ class WebSearchService:
         
         return None
     
+    @staticmethod
+    async def _read_capped(resp: aiohttp.ClientResponse, limit: int):
+        """讀取至多 limit bytes 的 body；回傳 (data, 是否截斷)"""
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+        truncated = size > limit or (size == limit and bool(await resp.content.read(1)))
+        return b"".join(chunks)[:limit], truncated
+
     async def _fetch_pdf_url(self, url: str, timeout: int = 30,
                              max_size_mb: int = 20) -> Optional[str]:
-        """Download PDF from URL and extract text with PyMuPDF.
+        """Download a PDF into memory and extract its text in the extraction pool.
 
+        The size cap is enforced while streaming, so bodies without a
+        Content-Length are aborted as soon as they exceed max_size_mb.
         Returns None gracefully if PyMuPDF is not installed or extraction fails.
         """
-        try:
-            import fitz  # PyMuPDF
-        except ImportError:
+        if not pdf_support_available():
             logger.debug("PyMuPDF not installed, skipping PDF: %s", url[:80])
             return None
 
-        import tempfile
-        import os as _os
-
-        tmp_path = None
+        max_bytes = max_size_mb * 1024 * 1024
         try:
             session = await self._get_session()
             async with session.get(
@@ -576,34 +596,22 @@ class WebSearchService:
                 if resp.status != 200:
                     return None
                 content_length = resp.headers.get('Content-Length')
-                if content_length and int(content_length) > max_size_mb * 1024 * 1024:
+                if content_length and int(content_length) > max_bytes:
                     logger.warning(f"⏭️ PDF too large ({content_length} bytes): {url[:80]}")
                     return None
-                pdf_bytes = await resp.read()
-
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-                tmp.write(pdf_bytes)
-                tmp_path = tmp.name
-
-            doc = fitz.open(tmp_path)
-            max_pages = min(len(doc), 30)
-            text_parts = []
-            for i in range(max_pages):
-                page_text = doc[i].get_text("text").strip()
-                if page_text:
-                    text_parts.append(page_text)
-            doc.close()
-
-            full_text = "\n\n".join(text_parts)
-            if len(full_text) > 15000:
-                full_text = full_text[:15000] + "...[PDF content truncated]"
+                pdf_bytes, too_large = await self._read_capped(resp, max_bytes)
+                if too_large:
+                    logger.warning(f"⏭️ PDF too large (> {max_size_mb} MB, aborted while streaming): {url[:80]}")
+                    return None
+                current_span().set_attributes(bytes=len(pdf_bytes), content_type="application/pdf")
 
+            full_text, pages_read = await get_extraction_pool().extract_pdf(pdf_bytes)
             if full_text:
                 logger.info(
                     f"📄 PDF extracted: {urlparse(url).netloc} "
-                    f"({len(full_text)} chars, {max_pages} pages)"
+                    f"({len(full_text)} chars, {pages_read} pages)"
                 )
-            return full_text or None
+            return full_text
 
         except asyncio.TimeoutError:
             logger.warning(f"⏭️ PDF download timeout: {url[:80]}")
@@ -611,12 +619,6 @@ class WebSearchService:
         except Exception as e:
             logger.warning(f"⏭️ PDF extraction failed ({e}): {url[:80]}")
             return None
-        finally:
-            if tmp_path:
-                try:
-                    _os.unlink(tmp_path)
-                except OSError:
-                    pass
 
     async def fetch_multiple(self, urls: List[str], max_concurrent: int = 3) -> Dict[str, str]:
         """並行抓取多個網頁"""
@@ -24,6 +24,8 @@ def setup_test_environment(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test-key-123")
     monkeypatch.setenv("ENVIRONMENT", "test")
     monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    # 測試中的 mock LLM 呼叫不寫入 data/cost 用量帳本
+    monkeypatch.setenv("USAGE_LEDGER_ENABLED", "false")
 
 
 @pytest.fixture
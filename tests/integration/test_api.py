@@ -75,6 +75,26 @@ class TestPublicEndpoints:
         assert r.status_code == 200
         assert r.json()["status"] == "healthy"
 
+    @pytest.mark.asyncio
+    async def test_health_reports_provider_breakers(self):
+        from services.llm.multi_provider import MultiProviderLLMClient
+
+        providers = []
+        for name in ("openai", "anthropic"):
+            p = AsyncMock()
+            p.provider_name = name
+            providers.append(p)
+        engine = RefactoredEngine(llm_client=MultiProviderLLMClient(providers))
+        engine.initialized = True
+        from api.routes import create_app
+        app = create_app(engine=engine)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            r = await c.get("/health")
+        breakers = r.json()["llm_providers"]
+        assert list(breakers) == ["openai", "anthropic"]
+        assert breakers["openai"]["state"] == "closed"
+
     @pytest.mark.asyncio
     async def test_api_status(self, app):
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
@@ -205,3 +225,51 @@ class TestErrorFormat:
         body = r.json()
         assert "error_code" in body
         assert "message" in body
+
+
+class TestAdmissionControl:
+    @pytest.mark.asyncio
+    async def test_overload_returns_429_with_retry_after(self, mock_llm, auth_header):
+        from core.admission import AdmissionController, LevelLimits
+        from api.routes import create_app
+
+        engine = RefactoredEngine(llm_client=mock_llm)
+        engine.initialized = True
+        # No slots and no queue for System 1: every chat request is rejected
+        engine._admission = AdmissionController({"system1": LevelLimits(0, 0, 0.01)})
+        app = create_app(engine=engine)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            r = await c.post(
+                "/api/v1/chat",
+                json={"query": "hello", "mode": "chat"},
+                headers=auth_header,
+            )
+        assert r.status_code == 429
+        assert int(r.headers["Retry-After"]) >= 1
+        assert r.json()["error_code"] == "OVERLOADED"
+
+
+# ── OpenMetrics ──
+
+class TestOpenMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_metrics_text_format(self, app, auth_header):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            await c.post("/api/v1/chat", json={"query": "hello", "mode": "chat"}, headers=auth_header)
+            r = await c.get("/metrics")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/openmetrics-text")
+        assert "# TYPE quitcode_request_duration_seconds histogram" in r.text
+        assert 'quitcode_request_duration_seconds_count{mode="chat",outcome="ok"}' in r.text
+        assert r.text.endswith("# EOF\n")
+
+    @pytest.mark.asyncio
+    async def test_metrics_token(self, app, monkeypatch):
+        monkeypatch.setenv("METRICS_TOKEN", "scrape-secret")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            denied = await c.get("/metrics")
+            wrong = await c.get("/metrics", headers={"Authorization": "Bearer scrape-secreT"})
+            allowed = await c.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert denied.status_code == wrong.status_code == 401
+        assert allowed.status_code == 200
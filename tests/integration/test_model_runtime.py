@@ -3,6 +3,7 @@ Integration tests for ModelRuntime.
 Ensures ModelRuntime produces identical results to direct ProcessorFactory calls.
 """
 
+import asyncio
 import pytest
 import sys
 from pathlib import Path
@@ -101,3 +102,130 @@ class TestModelRuntimeExecution:
             runtime_result = await runtime.execute(ctx_runtime)
 
         assert direct_result == runtime_result
+
+
+class GatedProcessor:
+    """Processor that blocks until released and counts invocations."""
+
+    def __init__(self, result="shared answer", error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def process(self, context):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def cache_enabled():
+    with patch("core.runtime.model_runtime.feature_flags.is_enabled",
+               side_effect=lambda path: path == "system1.enable_cache"), \
+         patch.object(structured_logger, 'info'):
+        yield
+
+
+class TestModelRuntimeSingleFlight:
+    """Concurrent cache misses for the same key share one processor call."""
+
+    async def _start(self, runtime, n, query="popular question"):
+        tasks = [
+            asyncio.create_task(runtime.execute(_make_context(Modes.CHAT, query)))
+            for _ in range(n)
+        ]
+        await asyncio.sleep(0.01)
+        return tasks
+
+    @pytest.mark.asyncio
+    async def test_followers_share_leader_result(self, model_runtime, cache_enabled):
+        proc = GatedProcessor()
+        model_runtime._factory.get_processor = lambda mode: proc
+        tasks = await self._start(model_runtime, 10)
+        proc.release.set()
+        results = await asyncio.gather(*tasks)
+        assert results == ["shared answer"] * 10
+        assert proc.calls == 1
+        assert model_runtime.cache_stats["coalesced"] == 9
+        assert model_runtime.cache_stats["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_normalized_query_coalesces(self, model_runtime, cache_enabled):
+        proc = GatedProcessor()
+        model_runtime._factory.get_processor = lambda mode: proc
+        tasks = [
+            asyncio.create_task(model_runtime.execute(_make_context(Modes.CHAT, q)))
+            for q in ("Hello", "  hello ", "HELLO")
+        ]
+        await asyncio.sleep(0.01)
+        proc.release.set()
+        await asyncio.gather(*tasks)
+        assert proc.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_leader_error_propagates(self, model_runtime, cache_enabled):
+        proc = GatedProcessor(error=ValueError("llm failed"))
+        model_runtime._factory.get_processor = lambda mode: proc
+        tasks = await self._start(model_runtime, 3)
+        proc.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert proc.calls == 1
+        assert model_runtime.cache_stats["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_leader_cancel_promotes_follower(self, model_runtime, cache_enabled):
+        proc = GatedProcessor()
+        model_runtime._factory.get_processor = lambda mode: proc
+        leader, *followers = await self._start(model_runtime, 3)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        proc.release.set()
+        results = await asyncio.gather(*followers)
+        assert results == ["shared answer"] * 2
+        assert leader.cancelled()
+        assert proc.calls == 2  # cancelled leader + new leader
+
+    @pytest.mark.asyncio
+    async def test_follower_cancel_does_not_affect_leader(self, model_runtime, cache_enabled):
+        proc = GatedProcessor()
+        model_runtime._factory.get_processor = lambda mode: proc
+        leader, follower = await self._start(model_runtime, 2)
+        follower.cancel()
+        await asyncio.sleep(0)
+        proc.release.set()
+        assert await leader == "shared answer"
+        assert follower.cancelled()
+
+
+class TestModelRuntimeSemanticCache:
+    """Exact misses fall through to the embedding-similarity tier."""
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_served_from_semantic_tier(self, model_runtime):
+        from core.semantic_cache import SemanticCache
+
+        vocab = ["what", "is", "rag", "weather"]
+
+        def embed(text):
+            words = text.lower().replace("what's", "what is").replace("?", "").split()
+            return [float(words.count(w)) for w in vocab]
+
+        model_runtime._semantic_cache = SemanticCache(embed_fn=embed, threshold=0.9)
+        proc = GatedProcessor(result="RAG answer")
+        proc.release.set()
+        model_runtime._factory.get_processor = lambda mode: proc
+
+        flags_on = {"system1.enable_cache", "system1.semantic_cache"}
+        with patch("core.runtime.model_runtime.feature_flags.is_enabled",
+                   side_effect=lambda path: path in flags_on), \
+             patch.object(structured_logger, 'info'):
+            first = await model_runtime.execute(_make_context(Modes.CHAT, "what is RAG"))
+            second = await model_runtime.execute(_make_context(Modes.CHAT, "What's RAG?"))
+
+        assert first == second == "RAG answer"
+        assert proc.calls == 1
+        assert model_runtime.cache_stats["semantic"]["hits"] == 1
@@ -0,0 +1,131 @@
+"""Profiling tests: X-Profile per-request reports and whole-process sampling (admin only)."""
+
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from httpx import AsyncClient, ASGITransport
+from core import profiling
+from core.engine import RefactoredEngine
+from core.logger import structured_logger
+from core.profiling import StackSampler
+from auth.jwt import encode_token, UserRole
+
+
+def _header(role):
+    token = encode_token(user_id=f"{role.value}-user", username=role.value, role=role)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    llm = AsyncMock()
+    llm.generate = AsyncMock(return_value="Test response from LLM")
+    engine = RefactoredEngine(llm_client=llm)
+    engine.initialized = True
+    from api.routes import create_app
+    return AsyncClient(transport=ASGITransport(app=create_app(engine=engine)), base_url="http://test")
+
+
+@pytest.fixture(autouse=True)
+def quiet_logger():
+    with patch.object(structured_logger, "info"), \
+         patch.object(structured_logger, "emit_sse"), \
+         patch.object(structured_logger, "log_llm_call"):
+        yield
+
+
+def _busy(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestStackSampler:
+    def test_samples_other_threads(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy, args=(stop,), name="busy-worker")
+        worker.start()
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        time.sleep(0.1)
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+        assert sampler.samples > 0
+        collapsed = sampler.collapsed()
+        assert any(line.startswith("busy-worker;") and "_busy (" in line
+                   for line in collapsed.splitlines())
+        assert "_busy (" in sampler.top_functions()
+
+
+class TestRequestProfile:
+    @pytest.mark.asyncio
+    async def test_admin_profiles_request(self, client, tmp_path):
+        admin = _header(UserRole.ADMIN)
+        async with client as c:
+            r = await c.post("/api/v1/chat", json={"query": "hello", "mode": "chat"},
+                             headers={**admin, "X-Profile": "1"})
+            assert r.status_code == 200
+            trace_id = r.json()["trace_id"]
+            assert r.headers["X-Profile-Report"] == f"/api/v1/admin/profiles/{trace_id}"
+
+            report = (await c.get(f"/api/v1/admin/profiles/{trace_id}", headers=admin)).json()
+            collapsed = await c.get(f"/api/v1/admin/profiles/{trace_id}?format=collapsed",
+                                    headers=admin)
+
+        assert report["trace_id"] == trace_id
+        assert report["profiler"] in ("sampling", "pyinstrument")
+        assert (tmp_path / f"{trace_id}.json").exists()
+        if report["profiler"] == "sampling":  # pyinstrument reports have no collapsed stacks
+            assert collapsed.status_code == 200
+            assert collapsed.text == report["collapsed"]
+
+    @pytest.mark.asyncio
+    async def test_header_ignored_for_non_admin(self, client, tmp_path):
+        async with client as c:
+            r = await c.post("/api/v1/chat", json={"query": "hello", "mode": "chat"},
+                             headers={**_header(UserRole.USER), "X-Profile": "1"})
+            denied = await c.get(f"/api/v1/admin/profiles/{r.json()['trace_id']}",
+                                 headers=_header(UserRole.USER))
+        assert r.status_code == 200
+        assert "X-Profile-Report" not in r.headers
+        assert list(tmp_path.iterdir()) == []
+        assert denied.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_unknown_profile(self, client):
+        async with client as c:
+            r = await c.get("/api/v1/admin/profiles/nope", headers=_header(UserRole.ADMIN))
+        assert r.status_code == 404
+
+
+class TestProcessProfile:
+    @pytest.mark.asyncio
+    async def test_returns_collapsed_stacks(self, client):
+        async with client as c:
+            r = await c.post("/api/v1/admin/profile?seconds=0.2&interval_ms=2",
+                             headers=_header(UserRole.ADMIN))
+        assert r.status_code == 200
+        assert "attachment" in r.headers["content-disposition"]
+        lines = r.text.strip().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+    @pytest.mark.asyncio
+    async def test_busy_and_admin_only(self, client):
+        async with client as c:
+            forbidden = await c.post("/api/v1/admin/profile?seconds=0.1",
+                                     headers=_header(UserRole.USER))
+            with profiling._session_lock:
+                busy = await c.post("/api/v1/admin/profile?seconds=0.1",
+                                    headers=_header(UserRole.ADMIN))
+        assert forbidden.status_code == 403
+        assert busy.status_code == 409
@@ -0,0 +1,169 @@
+"""
+SSE cancellation tests: when a /api/v1/chat/stream client disconnects, the
+engine work behind it is cancelled and awaited (no orphaned tasks) and the
+cancellation shows up in metrics.
+"""
+
+import asyncio
+import json
+import os
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.engine import RefactoredEngine
+from auth.jwt import encode_token, UserRole
+from services.sandbox.service import SandboxService, _PersistentSandbox
+
+
+class HangingLLM:
+    """Mock LLM that never answers and records whether it was cancelled."""
+
+    model_name = "hang"
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    async def generate(self, prompt, **kwargs):
+        self.started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "too late"
+
+
+async def _disconnecting_stream(application, llm, token):
+    """Drive the ASGI app directly; the client disconnects once the LLM call starts."""
+    body = json.dumps({"query": "hello", "mode": "chat"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/v1/chat/stream",
+        "raw_path": b"/api/v1/chat/stream", "query_string": b"", "root_path": "",
+        "headers": [
+            (b"host", b"test"),
+            (b"content-type", b"application/json"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    body_sent = False
+    sent = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await llm.started.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(application(scope, receive, send), timeout=5)
+    return sent
+
+
+class TestClientDisconnect:
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_engine_work(self):
+        llm = HangingLLM()
+        engine = RefactoredEngine(llm_client=llm)
+        engine.initialized = True
+        from api.routes import create_app
+        application = create_app(engine=engine)
+        token = encode_token(user_id="test-user", username="tester", role=UserRole.USER)
+
+        before = asyncio.all_tasks()
+        sent = await _disconnecting_stream(application, llm, token)
+        await asyncio.sleep(0)
+
+        assert sent[0]["status"] == 200
+        assert llm.cancelled
+        # Everything the request started has finished (sse_starlette keeps one
+        # process-wide shutdown watcher task)
+        leftover = [t for t in asyncio.all_tasks() - before if "_shutdown_watcher" not in repr(t)]
+        assert leftover == []
+
+        streaming = engine._metrics.get_streaming_metrics()
+        assert streaming["streams"] == 1
+        assert streaming["disconnects"] == 1
+        assert streaming["cancel_timeouts"] == 0
+        assert engine._metrics.get_cancellation_metrics()["system1"]["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_process_stream_consumer_closing_cancels_work(self):
+        llm = HangingLLM()
+        engine = RefactoredEngine(llm_client=llm)
+        engine.initialized = True
+
+        from core.models_v2 import Request, Modes
+        stream = engine.process_stream(Request(query="hello", mode=Modes.from_name("chat")))
+
+        async def consume():
+            async for _ in stream:
+                pass
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.wait_for(llm.started.wait(), timeout=2)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+        assert llm.cancelled
+        assert engine._metrics.get_streaming_metrics()["disconnects"] == 1
+
+
+class TestSandboxCancellation:
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name != "posix", reason="uses a POSIX shell")
+    async def test_cancelled_bash_kills_subprocess(self, tmp_path):
+        sandbox = SandboxService({"docker_enabled": False, "working_dir": str(tmp_path)})
+        procs = []
+        original = asyncio.create_subprocess_shell
+
+        async def spawn(*args, **kwargs):
+            proc = await original(*args, **kwargs)
+            procs.append(proc)
+            return proc
+
+        asyncio.create_subprocess_shell = spawn
+        try:
+            task = asyncio.create_task(sandbox._execute_bash("sleep 30", timeout=60))
+            while not procs:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            asyncio.create_subprocess_shell = original
+
+        assert procs[0].returncode is not None
+
+    def test_interrupt_wakes_persistent_execute(self):
+        sandbox = _PersistentSandbox(docker_client=None, image="unused")
+        sandbox._alive = True
+        sandbox._container = object()
+        sandbox._socket = type("S", (), {"_sock": type("R", (), {"sendall": lambda self, b: None})()})()
+        restarts = []
+        sandbox._restart = lambda: restarts.append(True)
+
+        cancelled = threading.Event()
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.update(sandbox.execute("while True: pass", 30, cancelled))
+        )
+        worker.start()
+        while sandbox._current is not cancelled:
+            pass
+        sandbox.interrupt(cancelled)
+        worker.join(timeout=2)
+
+        assert result["error_type"] == "CancelledError"
+        assert restarts == [True]
@@ -0,0 +1,119 @@
+"""
+SSE isolation tests: concurrent /api/v1/chat/stream clients against one
+engine must each receive only their own events.
+
+emit_sse is deliberately NOT patched here so events go through the real
+logger -> request scope -> EventChannel path.
+"""
+
+import asyncio
+import json
+import random
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from httpx import AsyncClient, ASGITransport
+from core.engine import RefactoredEngine
+from auth.jwt import encode_token, UserRole
+
+
+class EchoLLM:
+    """Mock LLM that echoes the user query after yielding to the loop."""
+
+    model_name = "echo"
+
+    async def generate(self, prompt, **kwargs):
+        await asyncio.sleep(random.uniform(0.01, 0.05))
+        marker = next(w for w in prompt.split() if w.startswith("client-"))
+        return f"echo {marker}"
+
+
+@pytest.fixture
+def app():
+    engine = RefactoredEngine(llm_client=EchoLLM())
+    engine.initialized = True
+    from api.routes import create_app
+    return create_app(engine=engine), engine
+
+
+@pytest.fixture
+def auth_header():
+    token = encode_token(user_id="test-user", username="tester", role=UserRole.USER)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _parse_sse(body: str):
+    events = []
+    current = {}
+    for line in body.splitlines():
+        if line.startswith("event:"):
+            current["event"] = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            current["data"] = json.loads(line[len("data:"):].strip())
+        elif not line.strip() and current:
+            events.append(current)
+            current = {}
+    if current:
+        events.append(current)
+    return events
+
+
+class TestSSEIsolation:
+    @pytest.mark.asyncio
+    async def test_concurrent_streams_see_only_own_events(self, app, auth_header):
+        application, _ = app
+
+        async def stream(name):
+            async with AsyncClient(
+                transport=ASGITransport(app=application), base_url="http://test"
+            ) as c:
+                r = await c.post(
+                    "/api/v1/chat/stream",
+                    json={"query": f"hello {name}", "mode": "chat"},
+                    headers=auth_header,
+                )
+            assert r.status_code == 200
+            return _parse_sse(r.text)
+
+        names = [f"client-{i}" for i in range(4)]
+        results = await asyncio.gather(*(stream(n) for n in names))
+
+        for name, events in zip(names, results):
+            kinds = [e["event"] for e in events]
+            assert kinds[0] == "start"
+            assert kinds[-1] == "end"
+            assert "result" in kinds
+
+            trace_ids = {
+                e["data"].get("trace_id") for e in events
+                if isinstance(e.get("data"), dict) and e["data"].get("trace_id")
+            }
+            assert len(trace_ids) == 1
+
+            texts = [
+                e["data"]["data"]["text"] for e in events
+                if e["event"] == "message"
+            ]
+            assert texts
+            for text in texts:
+                assert name in text
+                assert not any(other in text for other in names if other != name)
+
+    @pytest.mark.asyncio
+    async def test_stream_latency_reported(self, app, auth_header):
+        application, engine = app
+        async with AsyncClient(
+            transport=ASGITransport(app=application), base_url="http://test"
+        ) as c:
+            await c.post(
+                "/api/v1/chat/stream",
+                json={"query": "hello client-0", "mode": "chat"},
+                headers=auth_header,
+            )
+        streaming = engine._metrics.get_streaming_metrics()
+        assert streaming["streams"] == 1
+        assert streaming["events"] > 0
+        assert streaming["avg_emit_to_write_ms"] < 100
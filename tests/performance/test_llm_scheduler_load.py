@@ -0,0 +1,101 @@
+"""
+Chat p95 under mixed load: FIFO provider slots vs the priority LLM scheduler.
+
+A mock provider with 4 connection slots and 20 ms per call serves two deep
+research runs (15 concurrent LLM calls each, in 3 waves) while chat turns
+arrive every 10 ms. With FIFO slots every chat call waits behind the queued
+research calls; with the scheduler it only waits for the next free slot.
+
+Run with `-s` to see the latencies.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from core.llm_scheduler import LLMScheduler
+from core.request_scope import request_scope
+
+SLOTS = 4
+CALL_S = 0.02
+RESEARCH_RUNS = 2
+RESEARCH_WAVES = 3
+CALLS_PER_WAVE = 15
+CHAT_TURNS = 20
+CHAT_INTERVAL_S = 0.01
+
+
+class MockProvider:
+    provider_name = "mock"
+    model_name = "mock-model"
+    is_available = True
+
+    async def generate(self, prompt, **kwargs):
+        await asyncio.sleep(CALL_S)
+        return "ok"
+
+
+class FifoClient:
+    """Baseline: provider connection slots granted in arrival order."""
+
+    def __init__(self, client, slots):
+        self._client = client
+        self._sem = asyncio.Semaphore(slots)
+
+    async def generate(self, prompt, **kwargs):
+        async with self._sem:
+            return await self._client.generate(prompt, **kwargs)
+
+
+def _p95(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+async def _mixed_load(client):
+    chat_ms = []
+
+    async def research(run):
+        with request_scope(trace_id=f"research-{run}") as scope:
+            scope.cognitive_level = "agent"
+            for wave in range(RESEARCH_WAVES):
+                await asyncio.gather(*(
+                    client.generate(f"research {run}/{wave}/{i}") for i in range(CALLS_PER_WAVE)
+                ))
+
+    async def chat(turn):
+        await asyncio.sleep(turn * CHAT_INTERVAL_S)
+        with request_scope(trace_id=f"chat-{turn}") as scope:
+            scope.cognitive_level = "system1"
+            start = time.perf_counter()
+            await client.generate(f"chat {turn}")
+            chat_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(research(r) for r in range(RESEARCH_RUNS)),
+        *(chat(t) for t in range(CHAT_TURNS)),
+    )
+    return chat_ms, (time.perf_counter() - start) * 1000
+
+
+class TestLLMSchedulerLoad:
+    @pytest.mark.asyncio
+    async def test_chat_p95_improves_under_mixed_load(self):
+        fifo_chat, fifo_total = await _mixed_load(FifoClient(MockProvider(), SLOTS))
+
+        scheduler = LLMScheduler(max_concurrency={"mock": SLOTS}, aging_s=5.0)
+        sched_chat, sched_total = await _mixed_load(scheduler.wrap(MockProvider()))
+
+        fifo_p95, sched_p95 = _p95(fifo_chat), _p95(sched_chat)
+        print(
+            f"\nchat p95  fifo: {fifo_p95:7.1f} ms   scheduler: {sched_p95:7.1f} ms"
+            f"\nmakespan  fifo: {fifo_total:7.1f} ms   scheduler: {sched_total:7.1f} ms"
+        )
+
+        assert len(sched_chat) == CHAT_TURNS
+        # Chat waits for at most one call duration instead of the research backlog
+        assert sched_p95 < fifo_p95 / 2
+        # Research still completes in about the same time (work-conserving)
+        assert sched_total < fifo_total * 1.5
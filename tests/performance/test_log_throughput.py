@@ -0,0 +1,58 @@
+"""
+Log throughput benchmark: per-line open/append/close vs. batched LogSink.
+
+Run with `-s` to see lines/sec. Caller-side throughput is what the event
+loop pays per log call; end-to-end includes waiting for the writer to flush.
+"""
+
+import time
+from datetime import datetime
+
+from core.log_sink import LogSink
+
+N_LINES = 5000
+LINE = (
+    "2026-01-01 12:00:00.000 [INFO    ] [llm       ] [abcd1234] llm.response "
+    "| LLM Response: lorem ipsum dolor sit amet... [model=gpt-4o-mini, tokens=512]"
+)
+
+
+def _legacy_write(log_dir, line: str) -> None:
+    """The pre-sink StructuredLogger._log file path, verbatim."""
+    log_file = log_dir / f"quitcode_{datetime.now().strftime('%Y%m%d')}.log"
+    with open(log_file, 'a', encoding='utf-8', errors='replace') as f:
+        f.write(line + '\n')
+
+
+class TestLogThroughput:
+    def test_sink_beats_per_line_open_close(self, tmp_path):
+        legacy_dir = tmp_path / "legacy"
+        legacy_dir.mkdir()
+        start = time.perf_counter()
+        for _ in range(N_LINES):
+            _legacy_write(legacy_dir, LINE)
+        legacy_s = time.perf_counter() - start
+
+        sink = LogSink(tmp_path / "sink")
+        start = time.perf_counter()
+        for _ in range(N_LINES):
+            sink.write(LINE)
+        caller_s = time.perf_counter() - start
+        sink.flush(timeout=30)
+        total_s = time.perf_counter() - start
+        sink.close()
+
+        legacy_rate = N_LINES / legacy_s
+        caller_rate = N_LINES / caller_s
+        total_rate = N_LINES / total_s
+        print(
+            f"\nlegacy open/append/close: {legacy_rate:,.0f} lines/s"
+            f"\nsink (caller side):       {caller_rate:,.0f} lines/s"
+            f"\nsink (end to end):        {total_rate:,.0f} lines/s"
+            f"\nsink stats: {sink.stats}"
+        )
+
+        assert sink.stats["written"] + sink.stats["dropped"] == N_LINES
+        assert caller_rate > legacy_rate, (
+            f"sink caller side {caller_rate:,.0f}/s slower than legacy {legacy_rate:,.0f}/s"
+        )
@@ -0,0 +1,100 @@
+"""Unit tests for per-cognitive-level admission control."""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.admission import AdmissionController, AdmissionRejected, LevelLimits
+from core.metrics import CognitiveMetrics
+
+
+def _controller(max_concurrent=1, max_queue=1, queue_timeout=1.0, metrics=None):
+    limits = {"agent": LevelLimits(max_concurrent, max_queue, queue_timeout)}
+    return AdmissionController(limits, metrics=metrics)
+
+
+class TestAdmission:
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit_then_queues(self):
+        ctrl = _controller(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        order = []
+
+        async def run(name):
+            async with ctrl.admit("agent"):
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.create_task(run("first"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(run("second"))
+        await asyncio.sleep(0.01)
+        assert order == ["first"]
+        assert ctrl.stats["agent"]["waiting"] == 1
+        release.set()
+        await asyncio.gather(first, second)
+        assert order == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        ctrl = _controller(max_concurrent=1, max_queue=0)
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctrl.admit("agent"):
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            async with ctrl.admit("agent"):
+                pass
+        assert exc.value.retry_after >= 1
+        assert exc.value.cognitive_level == "agent"
+        release.set()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_queue_timeout(self):
+        ctrl = _controller(max_concurrent=1, max_queue=5, queue_timeout=0.02)
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctrl.admit("agent"):
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="queue timeout"):
+            async with ctrl.admit("agent"):
+                pass
+        assert ctrl.stats["agent"]["waiting"] == 0
+        release.set()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_levels_are_independent(self):
+        ctrl = AdmissionController({
+            "agent": LevelLimits(1, 0, 1.0),
+            "system1": LevelLimits(1, 0, 1.0),
+        })
+        async with ctrl.admit("agent"):
+            async with ctrl.admit("system1"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_recorded(self):
+        metrics = CognitiveMetrics()
+        ctrl = _controller(max_concurrent=1, max_queue=1, metrics=metrics)
+
+        async def hold(seconds):
+            async with ctrl.admit("agent"):
+                await asyncio.sleep(seconds)
+
+        await asyncio.gather(hold(0.03), hold(0))
+        m = metrics.get_admission_metrics()["agent"]
+        assert m["admitted"] == 2
+        assert m["max_queue_wait_ms"] >= 20
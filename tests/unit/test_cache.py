@@ -1,9 +1,11 @@
 """Unit tests for ResponseCache."""
 
+import threading
 import time
 import pytest
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
@@ -45,6 +47,15 @@ class TestCacheTTL:
         time.sleep(0.01)
         assert c.get("hello", "chat") is None
 
+    def test_expired_entries_reclaimed_without_lookup(self):
+        c = ResponseCache(ttl=0)
+        for i in range(10):
+            c.put(f"q{i}", "chat", "value")
+        time.sleep(0.01)
+        c.put("fresh", "chat", "value")
+        assert c.stats["size"] == 1
+        assert c.stats["expirations"] == 10
+
     def test_non_expired_entry_returns_value(self):
         c = ResponseCache(ttl=60)
         c.put("hello", "chat", "world")
@@ -61,6 +72,39 @@ class TestCacheEviction:
         assert c.get("q2", "chat") == "r2"
         assert c.get("q3", "chat") == "r3"
 
+    def test_evicts_least_recently_used(self):
+        c = ResponseCache(max_size=2)
+        c.put("q1", "chat", "r1")
+        c.put("q2", "chat", "r2")
+        c.get("q1", "chat")          # q1 becomes most recent
+        c.put("q3", "chat", "r3")    # should evict q2
+        assert c.get("q1", "chat") == "r1"
+        assert c.get("q2", "chat") is None
+        assert c.stats["evictions"] == 1
+
+    def test_evicts_by_bytes(self):
+        overhead = ResponseCache.KEY_OVERHEAD
+        c = ResponseCache(max_size=100, max_bytes=2 * (100 + overhead))
+        c.put("q1", "chat", "a" * 100)
+        c.put("q2", "chat", "b" * 100)
+        c.put("q3", "chat", "c" * 100)  # over the byte budget: evict q1
+        assert c.get("q1", "chat") is None
+        assert c.stats["bytes"] == 2 * (100 + overhead)
+        assert c.stats["size"] == 2
+
+    def test_oversized_value_not_cached(self):
+        c = ResponseCache(max_bytes=100)
+        c.put("q1", "chat", "x" * 1000)
+        assert c.get("q1", "chat") is None
+        assert c.stats["bytes"] == 0
+
+    def test_overwrite_replaces_bytes(self):
+        c = ResponseCache()
+        c.put("q1", "chat", "short")
+        c.put("q1", "chat", "a much longer value")
+        assert c.stats["size"] == 1
+        assert c.stats["bytes"] == len("a much longer value") + ResponseCache.KEY_OVERHEAD
+
 
 class TestCacheInvalidate:
     def test_invalidate_existing(self):
@@ -92,6 +136,9 @@ class TestCacheStats:
         assert s["hits"] == 0
         assert s["misses"] == 0
         assert s["hit_rate"] == 0.0
+        assert s["bytes"] == 0
+        assert s["evictions"] == 0
+        assert s["expirations"] == 0
 
     def test_stats_after_operations(self):
         c = ResponseCache()
@@ -104,3 +151,127 @@ class TestCacheStats:
         assert s["hits"] == 2
         assert s["misses"] == 1
         assert s["hit_rate"] == pytest.approx(2 / 3, abs=0.01)
+
+
+class TestSQLiteBackend:
+    """Shared on-disk backend: separate instances stand in for separate workers."""
+
+    def _cache(self, path, **kwargs):
+        from core.cache_backends import SQLiteCacheBackend
+        return ResponseCache(backend=SQLiteCacheBackend(path, **kwargs))
+
+    def test_shared_between_instances(self, tmp_path):
+        db = tmp_path / "cache.db"
+        worker_a, worker_b = self._cache(db), self._cache(db)
+        worker_a.put("hello", "chat", "world")
+        assert worker_b.get("Hello ", "chat") == "world"
+        worker_a.close()
+        worker_b.close()
+
+    def test_survives_restart(self, tmp_path):
+        db = tmp_path / "cache.db"
+        c = self._cache(db)
+        c.put("hello", "chat", "world")
+        c.close()
+        assert self._cache(db).get("hello", "chat") == "world"
+
+    def test_ttl_expiry(self, tmp_path):
+        c = self._cache(tmp_path / "cache.db", ttl=0)
+        c.put("hello", "chat", "world")
+        time.sleep(0.01)
+        assert c.get("hello", "chat") is None
+        assert c.stats["expirations"] == 1
+
+    def test_compaction_enforces_caps_lru(self, tmp_path):
+        c = self._cache(tmp_path / "cache.db", max_size=3, compact_every=1000)
+        for i in range(5):
+            c.put(f"q{i}", "chat", f"r{i}")
+            time.sleep(0.002)
+        c.get("q0", "chat")  # q0 becomes most recent
+        result = c.backend.compact()
+        assert result["evicted"] == 2
+        assert c.get("q0", "chat") == "r0"
+        assert c.get("q1", "chat") is None
+        assert c.stats["size"] == 3
+
+    def test_compaction_enforces_byte_cap(self, tmp_path):
+        entry = 100 + ResponseCache.KEY_OVERHEAD
+        c = self._cache(tmp_path / "cache.db", max_bytes=2 * entry, compact_every=1000)
+        for i in range(4):
+            c.put(f"q{i}", "chat", "x" * 100)
+            time.sleep(0.002)
+        c.backend.compact()
+        assert c.stats["size"] == 2
+        assert c.stats["bytes"] == 2 * entry
+
+    @pytest.mark.asyncio
+    async def test_async_access_runs_off_loop(self, tmp_path):
+        c = self._cache(tmp_path / "cache.db", compact_every=1)
+        backend = c.backend
+        threads = []
+        compact = backend.compact
+
+        def record_compact(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return compact(*args, **kwargs)
+
+        with patch.object(backend, "compact", side_effect=record_compact):
+            await c.aput("hello", "chat", "world")
+        assert await c.aget("Hello", "chat") == "world"
+        assert await c.aget("other", "chat") is None
+        assert threads and threading.get_ident() not in threads
+        assert c.stats["hits"] == 1 and c.stats["misses"] == 1
+        c.close()
+
+    @pytest.mark.asyncio
+    async def test_async_stats_runs_off_loop(self, tmp_path):
+        c = self._cache(tmp_path / "cache.db")
+        c.put("hello", "chat", "world")
+        threads = []
+        connection = c.backend._connection
+
+        def record_connection():
+            threads.append(threading.get_ident())
+            return connection()
+
+        with patch.object(c.backend, "_connection", side_effect=record_connection):
+            stats = await c.astats()
+        assert stats["size"] == 1 and stats["backend"] == "sqlite"
+        assert threads and threading.get_ident() not in threads
+        c.close()
+
+    def test_invalidate_and_clear(self, tmp_path):
+        c = self._cache(tmp_path / "cache.db")
+        c.put("q1", "chat", "r1")
+        c.put("q2", "chat", "r2")
+        assert c.invalidate("q1", "chat") is True
+        assert c.invalidate("q1", "chat") is False
+        c.clear()
+        assert c.get("q2", "chat") is None
+
+
+class TestCacheBackendSelection:
+    def test_default_is_memory(self):
+        from core.cache_backends import create_cache_backend
+        assert create_cache_backend("memory").stats["backend"] == "memory"
+
+    def test_sqlite_selected(self, tmp_path):
+        from core.cache_backends import create_cache_backend
+        backend = create_cache_backend("sqlite", path=str(tmp_path / "c.db"))
+        assert backend.stats["backend"] == "sqlite"
+        backend.close()
+
+    def test_unknown_backend_falls_back_to_memory(self):
+        from core.cache_backends import create_cache_backend
+        assert create_cache_backend("lmdb").stats["backend"] == "memory"
+
+    def test_backend_errors_count_as_miss(self):
+        from core.cache import MemoryCacheBackend
+
+        class Broken(MemoryCacheBackend):
+            def get(self, key):
+                raise ConnectionError("backend down")
+
+        c = ResponseCache(backend=Broken())
+        assert c.get("hello", "chat") is None
+        assert c.stats["errors"] == 1
@@ -0,0 +1,84 @@
+"""Unit tests for per-provider circuit breakers and health scores."""
+
+import time
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.llm.circuit_breaker import BreakerState, ProviderHealth
+
+
+class TestBreakerStates:
+    def test_opens_at_failure_threshold(self):
+        h = ProviderHealth("p", min_calls=4, failure_threshold=0.5)
+        for ok in (True, True, False):
+            h.record_success(0.1) if ok else h.record_failure(0.1)
+        assert h.state == BreakerState.CLOSED  # below min_calls
+        h.record_failure(0.1)
+        assert h.state == BreakerState.OPEN
+        assert not h.allow_request()
+
+    def test_slow_calls_count_as_failures(self):
+        h = ProviderHealth("p", min_calls=2, slow_call_s=1.0)
+        h.record_success(5.0)
+        h.record_success(5.0)
+        assert h.state == BreakerState.OPEN
+
+    def test_half_open_allows_limited_probes(self):
+        h = ProviderHealth("p", min_calls=1, cooldown_s=0.0, half_open_probes=1)
+        h.record_failure(0.1)
+        assert h.allow_request()  # cooldown elapsed -> half-open probe
+        assert h.state == BreakerState.HALF_OPEN
+        assert not h.allow_request()
+
+    def test_half_open_failure_reopens(self):
+        h = ProviderHealth("p", min_calls=1, cooldown_s=0.0)
+        h.record_failure(0.1)
+        h.allow_request()
+        h.record_failure(0.1)
+        assert h.state == BreakerState.OPEN
+        assert h.stats["times_opened"] == 2
+
+    def test_ignored_call_returns_probe(self):
+        h = ProviderHealth("p", min_calls=1, cooldown_s=0.0)
+        h.record_failure(0.1)
+        h.allow_request()
+        h.record_ignored()
+        assert h.allow_request()
+
+    def test_stuck_probe_reclaimed_after_timeout(self):
+        h = ProviderHealth("p", min_calls=1, cooldown_s=0.0, probe_timeout_s=0.05)
+        h.record_failure(0.1)
+        assert h.allow_request()  # probe never reports back
+        assert not h.allow_request()
+        time.sleep(0.06)
+        assert h.allow_request()
+        assert not h.allow_request()
+
+
+class TestHealthScore:
+    def test_prior_for_unmeasured(self):
+        assert ProviderHealth("p").score == ProviderHealth.PRIOR_SCORE
+
+    def test_latency_and_errors_lower_score(self):
+        fast, slow, flaky = ProviderHealth("a"), ProviderHealth("b"), ProviderHealth("c")
+        fast.record_success(0.5)
+        slow.record_success(20.0)
+        flaky.record_success(0.5)
+        flaky.record_failure(0.5)
+        assert fast.score > flaky.score
+        assert fast.score > slow.score
+        assert slow.score == pytest.approx(0.5)
+
+    def test_small_differences_keep_configured_order(self):
+        a, b = ProviderHealth("a"), ProviderHealth("b")
+        a.record_success(1.5)
+        b.record_success(0.5)
+        assert a.sort_key(0) < b.sort_key(1)
+
+    def test_open_breaker_sorts_last(self):
+        a, b = ProviderHealth("a", min_calls=1), ProviderHealth("b")
+        a.record_failure(0.1)
+        assert b.sort_key(1) < a.sort_key(0)
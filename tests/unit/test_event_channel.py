@@ -0,0 +1,97 @@
+"""Unit tests for the per-request SSE EventChannel."""
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.event_channel import EventChannel
+from core.logger import structured_logger
+from core.models_v2 import Event, EventType
+from core.request_scope import request_scope
+
+
+async def _collect(channel):
+    return [(e.event, e.data) for e in [evt async for evt in channel]]
+
+
+class TestEventChannel:
+    @pytest.mark.asyncio
+    async def test_yields_in_order_and_ends_on_close(self):
+        channel = EventChannel()
+        channel.publish("progress", {"n": 1})
+        channel.publish("message", {"n": 2})
+        channel.close()
+        assert await _collect(channel) == [("progress", {"n": 1}), ("message", {"n": 2})]
+
+    @pytest.mark.asyncio
+    async def test_publish_after_close_ignored(self):
+        channel = EventChannel()
+        channel.close()
+        channel.publish("message", {})
+        assert await _collect(channel) == []
+
+    @pytest.mark.asyncio
+    async def test_consumer_wakes_immediately(self):
+        channel = EventChannel()
+        received = []
+
+        async def consume():
+            async for evt in channel:
+                received.append(time.perf_counter())
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        sent = time.perf_counter()
+        channel.publish("message", {})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        channel.close()
+        await task
+        assert received and received[0] - sent < 0.05
+
+    @pytest.mark.asyncio
+    async def test_publish_from_worker_thread(self):
+        channel = EventChannel()
+
+        def worker():
+            channel.publish("message", {"from": "thread"})
+            channel.close()
+
+        threading.Thread(target=worker).start()
+        assert await asyncio.wait_for(_collect(channel), 2) == [("message", {"from": "thread"})]
+
+    @pytest.mark.asyncio
+    async def test_stats_count_delivered_events(self):
+        channel = EventChannel()
+        for i in range(3):
+            channel.publish("message", {"n": i})
+        channel.close()
+        await _collect(channel)
+        stats = channel.stats
+        assert stats["delivered"] == 3
+        assert stats["max_emit_to_write_ms"] >= stats["avg_emit_to_write_ms"] >= 0
+
+
+class TestLoggerPublishesToScopeChannel:
+    @pytest.mark.asyncio
+    async def test_emit_sse_routes_to_current_scope_only(self):
+        a, b = EventChannel(), EventChannel()
+        with request_scope(trace_id="a", event_channel=a):
+            structured_logger.emit_sse(Event(type=EventType.MESSAGE, data={"text": "for a"}))
+        with request_scope(trace_id="b", event_channel=b):
+            structured_logger.emit_sse(Event(type=EventType.MESSAGE, data={"text": "for b"}))
+        a.close()
+        b.close()
+        assert [d["data"]["text"] for _, d in await _collect(a)] == ["for a"]
+        assert [d["data"]["text"] for _, d in await _collect(b)] == ["for b"]
+
+    def test_nested_scope_inherits_channel(self):
+        channel = EventChannel()
+        with request_scope(event_channel=channel):
+            with request_scope(trace_id="inner") as inner:
+                assert inner.event_channel is channel
@@ -82,6 +82,7 @@ class TestExtensionMetrics:
 def mock_engine():
     engine = MagicMock()
     engine.initialized = True
+    engine._model_runtime.acache_stats = AsyncMock(return_value={"backend": "memory", "hits": 0})
     engine._mcp_client = MagicMock()
     engine._mcp_client.connected_servers = ["weather", "translator"]
     engine._mcp_client.total_tools = 5
@@ -249,3 +250,4 @@ class TestMetricsEndpoint:
             data = resp.json()
             assert "extensions" in data
             assert data["extensions"]["mcp"]["tool_calls"] == 1
+            assert data["response_cache"]["backend"] == "memory"
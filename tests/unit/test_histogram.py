@@ -0,0 +1,127 @@
+"""Unit tests for the fixed-memory latency histograms and OpenMetrics export."""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.histogram import (
+    HistogramRegistry,
+    LatencyHistogram,
+    LLM_CALL_DURATION,
+    QUEUE_WAIT,
+    REQUEST_DURATION,
+    SUB_BUCKETS,
+    histograms,
+)
+from core.admission import AdmissionController, LevelLimits
+from core.engine import RefactoredEngine
+from core.logger import structured_logger
+from core.models_v2 import Request, Modes
+from services.llm.usage_ledger import record_usage
+
+
+@pytest.fixture(autouse=True)
+def fresh_histograms():
+    histograms.reset()
+    yield
+    histograms.reset()
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize("value", [0.0003, 0.012, 0.25, 1.0, 7.5, 180.0])
+    def test_relative_error_bounded(self, value):
+        h = LatencyHistogram()
+        h.observe(value)
+        assert h.quantile(0.5) == pytest.approx(value, rel=1 / SUB_BUCKETS)
+
+    def test_quantiles(self):
+        h = LatencyHistogram()
+        for i in range(1, 1001):
+            h.observe(i / 1000)
+        assert h.count == 1000
+        assert h.sum == pytest.approx(500.5)
+        assert h.quantile(0.50) == pytest.approx(0.50, rel=0.05)
+        assert h.quantile(0.95) == pytest.approx(0.95, rel=0.05)
+        assert h.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+
+    def test_out_of_range_values(self):
+        h = LatencyHistogram()
+        h.observe(-1.0)
+        h.observe(0.0)
+        h.observe(10_000.0)
+        assert h.count == 3
+        assert h.cumulative()[0][1] == 2
+        assert h.cumulative()[-1] == (float("inf"), 3)
+
+    def test_memory_is_fixed(self):
+        h = LatencyHistogram()
+        size = len(h._counts)
+        for i in range(10_000):
+            h.observe(i * 0.37)
+        assert len(h._counts) == size
+
+
+class TestOpenMetrics:
+    def test_render(self):
+        registry = HistogramRegistry()
+        family = registry.histogram("demo_seconds", "Demo latency.", ("provider",))
+        family.observe(0.1, provider='we"ird')
+        family.observe(3.0, provider='we"ird')
+        text = registry.render_openmetrics()
+
+        assert text.startswith("# TYPE demo_seconds histogram\n# UNIT demo_seconds seconds\n")
+        assert text.endswith("# EOF\n")
+        assert 'demo_seconds_bucket{provider="we\\"ird",le="0.125"} 1' in text
+        assert 'demo_seconds_bucket{provider="we\\"ird",le="+Inf"} 2' in text
+        assert 'demo_seconds_count{provider="we\\"ird"} 2' in text
+        assert 'demo_seconds_sum{provider="we\\"ird"} 3.1' in text
+
+    def test_buckets_are_cumulative(self):
+        h = LatencyHistogram()
+        for value in (0.001, 0.01, 0.1, 1.0, 10.0):
+            h.observe(value)
+        counts = [count for _, count in h.cumulative()]
+        assert counts == sorted(counts)
+        assert counts[-1] == 5
+
+
+class TestRecording:
+    @pytest.mark.asyncio
+    async def test_engine_records_request_latency(self):
+        class LLM:
+            model_name = "mock"
+
+            async def generate(self, prompt, **kwargs):
+                return "hi"
+
+        engine = RefactoredEngine(llm_client=LLM())
+        engine.initialized = True
+        with patch.object(structured_logger, "info"), patch.object(structured_logger, "emit_sse"):
+            await engine.process(Request(query="hello", mode=Modes.CHAT))
+
+        (entry,) = histograms.summary()[REQUEST_DURATION.name]
+        assert entry["mode"] == "chat"
+        assert entry["outcome"] == "ok"
+        assert entry["count"] == 1
+
+    def test_llm_calls_recorded_by_provider_and_model(self):
+        record_usage("openai", "gpt-4o", {"prompt_tokens": 1}, latency_s=1.2)
+        record_usage("openai", "gpt-4o", None, latency_s=4.0, estimated=True, call="stream")
+        record_usage("openai", "gpt-4o", {"prompt_tokens": 1}, latency_s=3.0, call="stream")
+        entries = {e["call"]: e for e in histograms.summary()[LLM_CALL_DURATION.name]}
+        assert entries["generate"]["p50"] == pytest.approx(1.2, rel=1 / SUB_BUCKETS)
+        assert entries["generate"]["count"] == 1
+        assert entries["stream"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_admission_wait_recorded(self):
+        controller = AdmissionController(
+            {"system1": LevelLimits(max_concurrent=1, max_queue=1, queue_timeout=1.0)}
+        )
+        async with controller.admit("system1"):
+            pass
+        (entry,) = histograms.summary()[QUEUE_WAIT.name]
+        assert (entry["queue"], entry["pool"], entry["count"]) == ("admission", "system1", 1)
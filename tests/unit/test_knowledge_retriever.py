@@ -0,0 +1,166 @@
+"""Unit tests for the async knowledge retrieval path (HybridRetriever.asearch)."""
+
+import asyncio
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.engine import RefactoredEngine
+from core.logger import structured_logger
+from core.models_v2 import Request, Modes
+from services.knowledge.retriever import HybridRetriever
+from services.knowledge.service import KnowledgeBaseService
+
+DOCS = [
+    {"text": "Transformer attention layers weigh every token", "file_name": "a.pdf", "page_label": "1"},
+    {"text": "BM25 ranks documents by keyword frequency", "file_name": "b.pdf", "page_label": "2"},
+    {"text": "Qdrant stores dense vectors for attention search", "file_name": "c.pdf", "page_label": "3"},
+]
+POINTS = [SimpleNamespace(id=i, payload=doc, score=1.0 - i / 10) for i, doc in enumerate(DOCS)]
+
+
+def _rerank(documents, top_n, **kwargs):
+    order = sorted(range(len(documents)), key=lambda i: len(documents[i]))[:top_n]
+    return SimpleNamespace(results=[
+        SimpleNamespace(index=i, relevance_score=1.0 / (rank + 1)) for rank, i in enumerate(order)
+    ])
+
+
+class SyncBackends:
+    """Sync cohere + Qdrant clients; `gate` holds the embedding call open."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.cohere = Mock()
+        self.cohere.embed.side_effect = self._embed
+        self.cohere.rerank.side_effect = _rerank
+        self.qdrant = Mock()
+        self.qdrant.query_points.return_value = SimpleNamespace(points=POINTS)
+        self.qdrant.scroll.return_value = (POINTS, None)
+
+    def _embed(self, **kwargs):
+        self.gate.wait(timeout=2)
+        return SimpleNamespace(embeddings=[[0.1, 0.2]])
+
+
+class AsyncBackends:
+    """cohere.AsyncClient + AsyncQdrantClient stand-ins."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.cohere = Mock()
+        self.cohere.embed = AsyncMock(side_effect=self._embed)
+        self.cohere.rerank = AsyncMock(side_effect=_rerank)
+        self.qdrant = Mock()
+        self.qdrant.query_points = AsyncMock(return_value=SimpleNamespace(points=POINTS))
+        self.qdrant.scroll = AsyncMock(return_value=(POINTS, None))
+
+    async def _embed(self, **kwargs):
+        await self.gate.wait()
+        return SimpleNamespace(embeddings=[[0.1, 0.2]])
+
+
+def _retriever(sync, async_=None):
+    with patch.object(HybridRetriever, "_initialize"):
+        retriever = HybridRetriever(use_rerank=True)
+    retriever.embed_provider, retriever.embed_model = "cohere", "embed-multilingual-v3.0"
+    retriever.cohere_client, retriever.qdrant_client = sync.cohere, sync.qdrant
+    if async_ is not None:
+        retriever.async_cohere_client, retriever.async_qdrant_client = async_.cohere, async_.qdrant
+    return retriever
+
+
+def _backends(kind):
+    sync = SyncBackends()
+    return sync, (AsyncBackends() if kind == "async" else None)
+
+
+@pytest.mark.parametrize("kind", ["async", "thread"])
+class TestAsyncSearch:
+    @pytest.mark.asyncio
+    async def test_matches_sync_search(self, kind):
+        sync, async_ = _backends(kind)
+        expected = _retriever(SyncBackends()).search("attention", top_k=2)
+        results = await _retriever(sync, async_).asearch("attention", top_k=2)
+
+        assert results == expected
+        assert [r["file_name"] for r in results] == ["b.pdf", "a.pdf"]
+        if async_ is not None:
+            sync.cohere.embed.assert_not_called()
+            sync.qdrant.query_points.assert_not_called()
+            sync.qdrant.scroll.assert_not_called()
+            sync.cohere.rerank.assert_not_called()
+            async_.qdrant.scroll.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_chat_requests_progress_while_retrieval_in_flight(self, kind):
+        sync, async_ = _backends(kind)
+        (async_ or sync).gate.clear()
+        service = KnowledgeBaseService()
+        service._initialized = True
+        service.retriever = _retriever(sync, async_)
+
+        llm = AsyncMock()
+        llm.generate = AsyncMock(return_value="chat answer")
+        engine = RefactoredEngine(llm_client=llm)
+        engine.initialized = True
+
+        with patch.object(structured_logger, "info"), patch.object(structured_logger, "emit_sse"):
+            retrieval = asyncio.create_task(service.retrieve("attention", top_k=2))
+            await asyncio.sleep(0.01)
+            responses = await asyncio.gather(*[
+                engine.process(Request(query=f"hello {i}", mode=Modes.CHAT)) for i in range(5)
+            ])
+            assert not retrieval.done()
+            (async_ or sync).gate.set()
+            docs = await retrieval
+
+        assert [r.result for r in responses] == ["chat answer"] * 5
+        assert [d["metadata"]["file_name"] for d in docs] == ["b.pdf", "a.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_search_multiple_dedups_across_queries(self, kind):
+        sync, async_ = _backends(kind)
+        result = await _retriever(sync, async_).asearch_multiple(["attention", "bm25"], top_k=2)
+        texts = [r["text"] for r in result["results"]]
+        assert len(texts) == len(set(texts)) == 2
+        assert result["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cold_cache_builds_bm25_index_once(self, kind):
+        sync, async_ = _backends(kind)
+
+        async def slow_scroll(**kwargs):
+            await asyncio.sleep(0.02)
+            return POINTS, None
+
+        if async_ is not None:
+            async_.qdrant.scroll.side_effect = slow_scroll
+        else:
+            sync.qdrant.scroll.side_effect = lambda **kwargs: (time.sleep(0.02), (POINTS, None))[1]
+        await _retriever(sync, async_).asearch_multiple(["attention", "bm25", "qdrant", "vectors"], top_k=2)
+        scroll = async_.qdrant.scroll if async_ is not None else sync.qdrant.scroll
+        assert scroll.call_count == 1
+
+
+class TestAclose:
+    @pytest.mark.asyncio
+    async def test_closes_every_async_client(self):
+        cohere = pytest.importorskip("cohere")
+        sync, async_ = _backends("async")
+        retriever = _retriever(sync, async_)
+        retriever.async_cohere_client = cohere.AsyncClient(api_key="test-key")
+        retriever.async_qdrant_client = Mock(close=AsyncMock())
+
+        await retriever.aclose()
+
+        assert retriever.async_cohere_client._client_wrapper.httpx_client.httpx_client.is_closed
+        retriever.async_qdrant_client.close.assert_awaited_once()
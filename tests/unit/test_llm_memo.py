@@ -0,0 +1,109 @@
+"""Unit tests for prompt-level LLM memoization."""
+
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.cache_backends import SQLiteCacheBackend
+from core.llm_memo import LLMMemo
+from core.logger import structured_logger
+from core.models_v2 import ProcessingContext, Request, Response, Modes
+from core.processors.chat import ChatProcessor
+
+TOKENS = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+
+def _memo(tmp_path, scope="trace"):
+    return LLMMemo(SQLiteCacheBackend(tmp_path / "memo.db", ttl=60), scope=scope)
+
+
+def _context(query="hello"):
+    req = Request(query=query, mode=Modes.CHAT)
+    return ProcessingContext(request=req, response=Response(result="", mode=Modes.CHAT, trace_id=req.trace_id))
+
+
+class TestLLMMemoKeys:
+    def test_key_depends_on_sampling_params(self, tmp_path):
+        memo = _memo(tmp_path, scope="global")
+        base = memo.key("gpt", "prompt", 0.7, 1000)
+        assert base == memo.key("gpt", "prompt", 0.7, 1000)
+        assert base != memo.key("gpt", "prompt", 0.2, 1000)
+        assert base != memo.key("gpt", "prompt", 0.7, 500)
+        assert base != memo.key("claude", "prompt", 0.7, 1000)
+
+    def test_trace_scope_isolates_traces(self, tmp_path):
+        memo = _memo(tmp_path)
+        memo.put(memo.key("gpt", "p", trace_id="t1"), "answer", TOKENS)
+        assert memo.get(memo.key("gpt", "p", trace_id="t1")) == ("answer", TOKENS)
+        assert memo.get(memo.key("gpt", "p", trace_id="t2")) is None
+
+    def test_trace_scope_without_trace_disabled(self, tmp_path):
+        memo = _memo(tmp_path)
+        assert memo.key("gpt", "p", trace_id=None) is None
+
+    def test_empty_response_not_stored(self, tmp_path):
+        memo = _memo(tmp_path, scope="global")
+        key = memo.key("gpt", "p")
+        memo.put(key, "   ", TOKENS)
+        assert memo.get(key) is None
+
+    def test_persists_across_instances(self, tmp_path):
+        key = _memo(tmp_path, scope="global").key("gpt", "p")
+        _memo(tmp_path, scope="global").put(key, "answer", TOKENS)
+        memo = _memo(tmp_path, scope="global")
+        assert memo.get(key) == ("answer", TOKENS)
+        assert memo.stats["tokens_saved"] == 15
+
+
+class TestCallLLMMemoization:
+    @pytest.mark.asyncio
+    async def test_retry_within_trace_reuses_completion(self, tmp_path):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(return_value=("first answer", TOKENS))
+        memo = _memo(tmp_path)
+        processor = ChatProcessor(llm)
+        context = _context()
+
+        with patch("core.processors.base.get_llm_memo", return_value=memo), \
+             patch.object(structured_logger, 'info'), \
+             patch.object(structured_logger, 'log_llm_call'):
+            first = await processor._call_llm("plan the report", context)
+            llm.generate.return_value = ("second answer", TOKENS)
+            replay = await processor._call_llm("plan the report", context)
+            other_trace = await processor._call_llm("plan the report", _context())
+
+        assert first == replay == "first answer"
+        assert other_trace == "second answer"
+        assert llm.generate.call_count == 2
+        assert memo.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sqlite_access_off_event_loop(self, tmp_path):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(return_value=("answer", TOKENS))
+        memo = _memo(tmp_path)
+        backend = memo._backend
+        threads = []
+
+        def record(fn):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return fn(*args, **kwargs)
+            return wrapper
+
+        processor = ChatProcessor(llm)
+        context = _context()
+        with patch("core.processors.base.get_llm_memo", return_value=memo), \
+             patch.object(backend, "get", side_effect=record(backend.get)), \
+             patch.object(backend, "set", side_effect=record(backend.set)), \
+             patch.object(structured_logger, 'info'), \
+             patch.object(structured_logger, 'log_llm_call'):
+            await processor._call_llm("plan the report", context)
+            assert await processor._call_llm("plan the report", context) == "answer"
+
+        assert len(threads) == 3 and threading.get_ident() not in threads
+        assert llm.generate.call_count == 1
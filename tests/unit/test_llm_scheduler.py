@@ -0,0 +1,169 @@
+"""Unit tests for the priority-aware LLM call scheduler."""
+
+import asyncio
+import inspect
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.llm_scheduler import LLMScheduler, ScheduledLLMClient
+from core.request_scope import request_scope
+from services.llm.multi_provider import MultiProviderLLMClient
+
+
+class GatedProvider:
+    """Provider whose calls block until `release` is set; records call order."""
+
+    def __init__(self, name="mock"):
+        self.provider_name = name
+        self.model_name = f"{name}-model"
+        self.is_available = True
+        self.release = asyncio.Event()
+        self.order = []
+
+    async def generate(self, prompt, **kwargs):
+        self.order.append(prompt)
+        await self.release.wait()
+        return f"answer to {prompt}"
+
+    async def stream(self, prompt, **kwargs):
+        self.order.append(prompt)
+        await self.release.wait()
+        for chunk in ("a", "b"):
+            yield chunk
+
+
+async def _call(client, prompt, level):
+    with request_scope(trace_id=prompt) as scope:
+        scope.cognitive_level = level
+        return await client.generate(prompt)
+
+
+class TestLLMScheduler:
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_provider(self):
+        scheduler = LLMScheduler(max_concurrency={"mock": 2})
+        provider = GatedProvider()
+        client = scheduler.wrap(provider)
+
+        tasks = [asyncio.create_task(_call(client, f"q{i}", "system2")) for i in range(5)]
+        await asyncio.sleep(0.01)
+        assert len(provider.order) == 2
+        assert scheduler.stats["providers"]["mock"]["waiting"] == 3
+
+        provider.release.set()
+        results = await asyncio.gather(*tasks)
+        assert results == [f"answer to q{i}" for i in range(5)]
+        assert scheduler.stats["providers"]["mock"]["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_class_served_first(self):
+        scheduler = LLMScheduler(max_concurrency={"mock": 1}, aging_s=60)
+        provider = GatedProvider()
+        client = scheduler.wrap(provider)
+
+        blocker = asyncio.create_task(_call(client, "running", "agent"))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(_call(client, "agent", "agent")),
+            asyncio.create_task(_call(client, "research", "system2")),
+            asyncio.create_task(_call(client, "chat", "system1")),
+        ]
+        await asyncio.sleep(0.01)
+        provider.release.set()
+        await asyncio.gather(blocker, *waiters)
+        assert provider.order == ["running", "chat", "research", "agent"]
+
+    @pytest.mark.asyncio
+    async def test_aging_lets_old_agent_call_overtake_new_chat(self):
+        scheduler = LLMScheduler(max_concurrency={"mock": 1}, aging_s=0.02)
+        provider = GatedProvider()
+        client = scheduler.wrap(provider)
+
+        blocker = asyncio.create_task(_call(client, "running", "system1"))
+        await asyncio.sleep(0)
+        old_agent = asyncio.create_task(_call(client, "agent", "agent"))
+        await asyncio.sleep(0.06)  # waited longer than 2 aging steps
+        new_chat = asyncio.create_task(_call(client, "chat", "system1"))
+        await asyncio.sleep(0.01)
+        provider.release.set()
+        await asyncio.gather(blocker, old_agent, new_chat)
+        assert provider.order == ["running", "agent", "chat"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        scheduler = LLMScheduler(max_concurrency={"mock": 1})
+        provider = GatedProvider()
+        client = scheduler.wrap(provider)
+
+        blocker = asyncio.create_task(_call(client, "running", "system1"))
+        await asyncio.sleep(0)
+        doomed = asyncio.create_task(_call(client, "doomed", "system1"))
+        await asyncio.sleep(0.01)
+        doomed.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await doomed
+
+        provider.release.set()
+        await blocker
+        assert await _call(client, "after", "system1") == "answer to after"
+        assert "doomed" not in provider.order
+        assert scheduler.stats["providers"]["mock"]["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_calls_outside_request_default_to_system2(self):
+        scheduler = LLMScheduler()
+        client = scheduler.wrap(GatedProvider())
+        client.wrapped.release.set()
+        await client.generate("no scope")
+        assert scheduler.stats["classes"]["system2"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_slot_until_exhausted(self):
+        scheduler = LLMScheduler(max_concurrency={"mock": 1})
+        provider = GatedProvider()
+        client = scheduler.wrap(provider)
+        assert inspect.isasyncgenfunction(client.stream)
+
+        provider.release.set()
+        chunks = []
+        async for chunk in client.stream("s"):
+            chunks.append(chunk)
+            assert scheduler.stats["providers"]["mock"]["active"] == 1
+        assert chunks == ["a", "b"]
+        assert scheduler.stats["providers"]["mock"]["active"] == 0
+
+
+class TestWrap:
+    def test_delegates_attributes(self):
+        client = LLMScheduler().wrap(GatedProvider("openai"))
+        assert isinstance(client, ScheduledLLMClient)
+        assert client.model_name == "openai-model"
+        assert client.provider_name == "openai"
+
+    def test_multi_provider_wraps_each_provider(self):
+        multi = MultiProviderLLMClient([GatedProvider("openai"), GatedProvider("gemini")])
+        wrapped = LLMScheduler().wrap(multi)
+        assert isinstance(wrapped, MultiProviderLLMClient)
+        assert all(isinstance(p, ScheduledLLMClient) for p in wrapped.providers)
+        assert wrapped.provider_name == "multi(openai,gemini)"
+
+    def test_non_streaming_client_stays_non_streaming(self):
+        client = LLMScheduler().wrap(AsyncMock())
+        assert not inspect.isasyncgenfunction(getattr(client, "stream", None))
+
+    def test_from_flags(self):
+        class Flags:
+            def get_value(self, path, default=None):
+                return {
+                    "llm_scheduler.max_concurrency": {"default": 3, "openai": 5},
+                    "llm_scheduler.aging_seconds": 2,
+                }.get(path, default)
+
+        scheduler = LLMScheduler.from_flags(Flags())
+        assert scheduler.aging_s == 2.0
+        assert scheduler._slots("openai").max_concurrency == 5
+        assert scheduler._slots("gemini").max_concurrency == 3
@@ -0,0 +1,93 @@
+"""Unit tests for the batched background LogSink."""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.log_sink import LogSink
+
+
+@pytest.fixture
+def sink(tmp_path):
+    s = LogSink(tmp_path, prefix="test")
+    yield s
+    s.close()
+
+
+class TestLogSinkWrite:
+    def test_lines_written_in_order(self, sink, tmp_path):
+        for i in range(100):
+            sink.write(f"line {i}")
+        assert sink.flush()
+        files = list(tmp_path.glob("test_*.log"))
+        assert len(files) == 1
+        assert files[0].read_text(encoding="utf-8").splitlines() == [
+            f"line {i}" for i in range(100)
+        ]
+        assert sink.stats["written"] == 100
+        assert sink.stats["dropped"] == 0
+
+    def test_console_lines_go_to_stdout(self, sink, capsys):
+        sink.write("file only")
+        sink.write("file and console", console_line="console text")
+        sink.flush()
+        out = capsys.readouterr().out
+        assert "console text" in out
+        assert "file only" not in out
+
+    def test_surrogates_replaced(self, sink, tmp_path):
+        sink.write("bad \udcff char")
+        sink.flush()
+        text = next(tmp_path.glob("test_*.log")).read_text(encoding="utf-8")
+        assert "bad ? char" in text
+
+    def test_close_drains_queue(self, tmp_path):
+        s = LogSink(tmp_path, prefix="test")
+        for i in range(50):
+            s.write(f"line {i}")
+        s.close()
+        text = next(tmp_path.glob("test_*.log")).read_text(encoding="utf-8")
+        assert len(text.splitlines()) == 50
+
+
+class TestLogSinkRotation:
+    def test_rotates_by_size(self, tmp_path):
+        s = LogSink(tmp_path, prefix="test", max_bytes=100)
+        for i in range(10):
+            s.write("x" * 40)
+            s.flush()
+        s.close()
+        assert s.stats["rotations"] > 0
+        rotated = list(tmp_path.glob("test_*.*.log"))
+        assert rotated
+        for f in tmp_path.glob("test_*.log"):
+            assert f.stat().st_size <= 100
+
+    def test_rotates_by_day(self, tmp_path, monkeypatch):
+        s = LogSink(tmp_path, prefix="test")
+        monkeypatch.setattr(s, "_today", lambda: "20260101")
+        s.write("day one")
+        s.flush()
+        monkeypatch.setattr(s, "_today", lambda: "20260102")
+        s.write("day two")
+        s.close()
+        assert (tmp_path / "test_20260101.log").read_text().strip() == "day one"
+        assert (tmp_path / "test_20260102.log").read_text().strip() == "day two"
+
+
+class TestLogSinkBackpressure:
+    def test_drops_and_counts_when_full(self, tmp_path, monkeypatch):
+        s = LogSink(tmp_path, prefix="test", max_queue=5)
+        # Hold the writer back so the queue fills up
+        monkeypatch.setattr(s, "_ensure_started", lambda: None)
+        results = [s.write(f"line {i}") for i in range(8)]
+        assert results.count(True) == 5
+        assert s.stats["dropped"] == 3
+
+        monkeypatch.undo()
+        s._ensure_started()
+        s.close()
+        text = next(tmp_path.glob("test_*.log")).read_text(encoding="utf-8")
+        assert "Dropped 3 log lines" in text
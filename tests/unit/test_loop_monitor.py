@@ -0,0 +1,138 @@
+"""Unit tests for the event loop lag monitor."""
+
+import asyncio
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from httpx import AsyncClient, ASGITransport
+from auth.jwt import encode_token, UserRole
+from core.engine import RefactoredEngine
+from core.histogram import histograms
+from core.logger import structured_logger
+from core.loop_monitor import LOOP_LAG, LoopLagMonitor, start_loop_monitor, stop_loop_monitor
+from core.request_scope import request_scope
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)  # stands in for a sync client / parser on the loop
+
+
+@pytest.fixture
+def stall_warning():
+    with patch.object(structured_logger, "warning") as warning:
+        yield warning
+
+
+@pytest.fixture
+async def monitor(stall_warning):
+    histograms.reset()
+    monitor = LoopLagMonitor(asyncio.get_running_loop(), interval=0.01, threshold=0.05)
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+async def _settle(monitor, stalls=1):
+    for _ in range(100):
+        if monitor.stats()["stalls"] >= stalls:
+            return
+        await asyncio.sleep(0.01)
+
+
+class TestLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_stall_captures_site_and_trace(self, monitor, stall_warning):
+        await asyncio.sleep(0.05)
+        with request_scope(trace_id="trace-block"):
+            _blocking_call(0.2)
+        await _settle(monitor)
+
+        stats = monitor.stats()
+        assert stats["stalls"] == 1
+        assert stats["max_lag_ms"] >= 100
+        (site,) = stats["top_sites"]
+        assert site["site"].startswith("_blocking_call (")
+        assert site["last_trace_id"] == "trace-block"
+        assert any("test_stall_captures_site_and_trace" in frame for frame in site["stack"])
+        assert stats["recent"][0]["trace_id"] == "trace-block"
+        assert LOOP_LAG.labels().count >= stats["beats"] > 0
+        stall_warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_child_task_attributed_to_creator_request(self, monitor):
+
+        async def child():
+            _blocking_call(0.15)
+
+        with request_scope(trace_id="trace-parent"):
+            task = asyncio.create_task(child())
+        await task
+        await _settle(monitor)
+
+        assert monitor.stats()["recent"][0]["trace_id"] == "trace-parent"
+
+    @pytest.mark.asyncio
+    async def test_no_stall_when_loop_is_free(self, monitor):
+        await asyncio.sleep(0.1)
+        stats = monitor.stats()
+        assert stats["beats"] > 0
+        assert stats["stalls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_restores_task_factory(self, monitor):
+        loop = asyncio.get_running_loop()
+        assert loop.get_task_factory() is not None
+        monitor.stop()
+        assert loop.get_task_factory() is None
+
+    def test_stats_consistent_while_watchdog_records(self, stall_warning):
+        loop = asyncio.new_event_loop()
+        monitor = LoopLagMonitor(loop)
+        done = threading.Event()
+
+        def watchdog():
+            for i in range(3000):
+                stall = {"trace_id": f"t{i}", "mode": None, "task": None,
+                         "site": f"site_{i % 150}", "stack": []}
+                monitor._after_beat(0.2, stall)
+            done.set()
+
+        writer = threading.Thread(target=watchdog)
+        writer.start()
+        try:
+            while not done.is_set():
+                stats = monitor.stats(top=200)
+                assert stats["stalls"] == sum(site["stalls"] for site in stats["top_sites"])
+        finally:
+            writer.join()
+            loop.close()
+        assert monitor.stats()["stalls"] == 3000
+
+
+class TestLoopStallsEndpoint:
+    @pytest.mark.asyncio
+    async def test_admin_endpoint(self):
+        engine = RefactoredEngine(llm_client=None)
+        engine.initialized = True
+        from api.routes import create_app
+        app = create_app(engine=engine)
+        admin = encode_token(user_id="a", username="admin", role=UserRole.ADMIN)
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+                missing = await c.get("/api/v1/admin/loop-stalls",
+                                      headers={"Authorization": f"Bearer {admin}"})
+                start_loop_monitor()
+                r = await c.get("/api/v1/admin/loop-stalls",
+                                headers={"Authorization": f"Bearer {admin}"})
+        finally:
+            stop_loop_monitor()
+        assert missing.status_code == 404
+        assert r.status_code == 200
+        assert r.json()["running"] is True
+        assert "top_sites" in r.json()
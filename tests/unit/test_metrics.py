@@ -70,3 +70,14 @@ class TestCognitiveMetrics:
         m.record_request("system1", latency_ms=20, tokens=300)
         s = m.get_summary()
         assert s["system1"]["total_tokens"] == 800
+
+    def test_cancellations_and_disconnects(self):
+        m = CognitiveMetrics()
+        m.record_cancellation("system2", elapsed_ms=300)
+        m.record_cancellation("system2", elapsed_ms=100)
+        m.record_stream(3, 1.0, 2.0, disconnected=True)
+        assert m.get_cancellation_metrics() == {"system2": {"cancelled": 2, "avg_elapsed_ms": 200}}
+        assert m.get_streaming_metrics()["disconnects"] == 1
+        m.reset()
+        assert m.get_cancellation_metrics() == {}
+        assert m.get_streaming_metrics()["disconnects"] == 0
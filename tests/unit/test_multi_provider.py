@@ -2,6 +2,7 @@
 
 import asyncio
 import os
+from contextlib import contextmanager
 import pytest
 import sys
 from pathlib import Path
@@ -213,6 +214,239 @@ class TestMultiProviderStream:
         with pytest.raises(ConnectionError):
             _ = [c async for c in client.stream("test")]
 
+    @pytest.mark.asyncio
+    async def test_stream_no_fallback_after_first_chunk(self):
+        class MidStreamFailure(FakeProvider):
+            async def stream(self, prompt, **kwargs):
+                yield "partial"
+                raise ConnectionError("Connection reset")
+
+        client = MultiProviderLLMClient([
+            MidStreamFailure("primary"),
+            FakeProvider("fallback", response="other answer"),
+        ])
+        chunks = []
+        with pytest.raises(ConnectionError):
+            async for c in client.stream("test"):
+                chunks.append(c)
+        assert chunks == ["partial"]
+
+
+class CountingProvider(FakeProvider):
+    """FakeProvider that counts calls and can be switched between up/down."""
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, **kwargs)
+        self.calls = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return await super().generate(prompt, **kwargs)
+
+
+class TestCircuitBreakerChain:
+    @pytest.mark.asyncio
+    async def test_failing_primary_demoted_behind_healthy_fallback(self):
+        primary = CountingProvider("primary", fail=True, error_msg="Connection timeout")
+        fallback = CountingProvider("fallback", response="ok")
+        client = MultiProviderLLMClient([primary, fallback], breaker_config={"cooldown_s": 60})
+        for _ in range(5):
+            assert await client.generate("test") == "ok"
+        assert primary.calls == 1  # later calls don't pay the primary's timeout
+        assert fallback.calls == 5
+        assert list(client.health_stats) == ["fallback", "primary"]
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_provider(self):
+        primary = CountingProvider("primary", fail=True)
+        client = MultiProviderLLMClient(
+            [primary, FakeProvider("fallback", fail=True)],
+            breaker_config={"min_calls": 2, "cooldown_s": 60},
+        )
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await client.generate("test")
+        assert client.health["primary"].state == "open"
+        assert client.health_stats["primary"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_primary_probed_and_restored_after_cooldown(self):
+        primary = CountingProvider("primary", fail=True)
+        client = MultiProviderLLMClient(
+            [primary, FakeProvider("fallback", response="fb")],
+            breaker_config={"min_calls": 1, "cooldown_s": 0.01},
+        )
+        assert await client.generate("test") == "fb"
+        assert client.health["primary"].state == "open"
+
+        await asyncio.sleep(0.02)
+        primary._fail = False
+        assert await client.generate("test") == "ok"
+        assert client.health["primary"].state == "closed"
+        assert list(client.health_stats)[0] == "primary"
+
+    @pytest.mark.asyncio
+    async def test_all_open_still_tries_healthiest(self):
+        client = MultiProviderLLMClient(
+            [FakeProvider("a", fail=True), FakeProvider("b", fail=True)],
+            breaker_config={"min_calls": 1, "cooldown_s": 60},
+        )
+        with pytest.raises(ConnectionError):
+            await client.generate("test")
+        assert {h.state for h in client.health.values()} == {"open"}
+        with pytest.raises(ConnectionError):
+            await client.generate("test")
+
+    @pytest.mark.asyncio
+    async def test_business_errors_do_not_trip_breaker(self):
+        client = MultiProviderLLMClient(
+            [BusinessErrorProvider("a"), FakeProvider("b")], breaker_config={"min_calls": 1},
+        )
+        with pytest.raises(ValueError):
+            await client.generate("test")
+        assert client.health["a"].state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_stream_failures_count_toward_breaker(self):
+        client = MultiProviderLLMClient(
+            [FakeProvider("a", fail=True), FakeProvider("b", response="x y")],
+            breaker_config={"min_calls": 1},
+        )
+        chunks = [c async for c in client.stream("test")]
+        assert chunks == ["x", "y"]
+        assert client.health["a"].state == "open"
+        assert client.health["b"].stats["successes"] == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("streaming", [False, True])
+    async def test_cancelled_probe_releases_half_open_slot(self, streaming):
+        class HangingProvider(CountingProvider):
+            async def generate(self, prompt, **kwargs):
+                self.calls += 1
+                await asyncio.sleep(10)
+
+            async def stream(self, prompt, **kwargs):
+                self.calls += 1
+                await asyncio.sleep(10)
+                yield "never"
+
+        primary = HangingProvider("primary")
+        client = MultiProviderLLMClient(
+            [primary, FakeProvider("fallback")],
+            breaker_config={"min_calls": 1, "cooldown_s": 0.01, "probe_timeout_s": 60},
+        )
+        client.health["primary"].record_failure(0.1)
+        await asyncio.sleep(0.02)
+
+        async def call():
+            if streaming:
+                return [c async for c in client.stream("test")]
+            return await client.generate("test")
+
+        probe = asyncio.create_task(call())
+        await asyncio.sleep(0.01)
+        assert primary.calls == 1 and client.health["primary"].state == "half_open"
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # The slot is free again: the next call probes the primary instead of skipping it
+        assert client.health["primary"].allow_request()
+
+
+class SlowProvider(FakeProvider):
+    """FakeProvider with a fixed latency; records cancellations."""
+
+    def __init__(self, name, delay, **kwargs):
+        super().__init__(name, response=f"from {name}", **kwargs)
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return await super().generate(prompt, **kwargs)
+
+
+@contextmanager
+def _in_mode(mode):
+    """Run as a request routed to `mode` (what hedging keys on)."""
+    from core.request_scope import request_scope
+
+    with request_scope(trace_id="t") as scope:
+        scope.mode = mode
+        yield
+
+
+class TestHedging:
+    def _client(self, primary_delay, hedge_delay, budget=1.0):
+        primary = SlowProvider("primary", primary_delay)
+        backup = SlowProvider("backup", hedge_delay)
+        client = MultiProviderLLMClient([primary, backup])
+        client.enable_hedging(["chat"], budget=budget, default_delay_s=0.02, min_delay_s=0.01)
+        return client, primary, backup
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_and_loser_cancelled(self):
+        client, primary, backup = self._client(primary_delay=1.0, hedge_delay=0.01)
+        with _in_mode("chat"):
+            start = asyncio.get_running_loop().time()
+            assert await client.generate("q") == "from backup"
+            assert asyncio.get_running_loop().time() - start < 0.5
+        assert primary.cancelled == 1
+        assert client.hedge_stats["hedges"] == 1
+        assert client.hedge_stats["win_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        client, primary, backup = self._client(primary_delay=0.0, hedge_delay=0.0)
+        with _in_mode("chat"):
+            assert await client.generate("q") == "from primary"
+        assert backup.calls == 0
+        assert client.hedge_stats["eligible_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_still_wins_race(self):
+        client, primary, backup = self._client(primary_delay=0.05, hedge_delay=1.0)
+        with _in_mode("chat"):
+            assert await client.generate("q") == "from primary"
+        assert backup.cancelled == 1
+        assert client.hedge_stats["hedge_wins"] == 0
+
+    @pytest.mark.asyncio
+    async def test_other_modes_not_hedged(self):
+        client, primary, backup = self._client(primary_delay=0.05, hedge_delay=0.0)
+        with _in_mode("deep_research"):
+            assert await client.generate("q") == "from primary"
+        assert backup.calls == 0
+        assert client.hedge_stats["eligible_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        client, primary, backup = self._client(primary_delay=0.04, hedge_delay=1.0, budget=0.05)
+        with _in_mode("chat"):
+            for _ in range(20):
+                await client.generate("q")
+        # 5% of 20 calls: one hedge, every other slow call goes unhedged
+        assert client.hedge_stats["hedges"] == 1
+        assert client.hedge_stats["budget_skips"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_failed_race_falls_back_to_rest_of_chain(self):
+        primary = SlowProvider("primary", 0.05, fail=True)
+        backup = SlowProvider("backup", 0.05, fail=True)
+        third = SlowProvider("third", 0.0)
+        client = MultiProviderLLMClient([primary, backup, third])
+        client.enable_hedging(["chat"], budget=1.0, default_delay_s=0.01, min_delay_s=0.01)
+        with _in_mode("chat"):
+            assert await client.generate("q") == "from third"
+        assert (primary.calls, backup.calls, third.calls) == (1, 1, 1)
+
 
 # ── Factory function tests ───────────────────────────────────────
 
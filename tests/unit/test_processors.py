@@ -113,6 +113,70 @@ class TestChatProcessor:
         # 驗證步驟被正確標記（mark_step_complete resets current_step to ""）
         assert "chat" in processing_context.steps_completed
 
+    @pytest.mark.asyncio
+    async def test_chat_streams_token_deltas(self, processing_context, mock_logger):
+        """測試串流請求逐段發送 delta，最後發送完整訊息"""
+        class StreamingLLM:
+            model_name = "stream-mock"
+            generate = AsyncMock()
+
+            async def stream(self, prompt, **kwargs):
+                for delta in ["Hel", "lo ", "world"]:
+                    yield delta
+
+        llm = StreamingLLM()
+        processing_context.request.stream = True
+        processor = ChatProcessor(llm)
+
+        result = await processor.process(processing_context)
+
+        assert result == "Hello world"
+        llm.generate.assert_not_called()
+        calls = [c.args + tuple(c.kwargs.values()) for c in mock_logger['message'].call_args_list]
+        assert calls == [
+            ("Hel", True), ("lo ", True), ("world", True),
+            ("Hello world",),
+        ]
+        assert processing_context.total_tokens > 0
+
+    @pytest.mark.asyncio
+    async def test_chat_stream_uses_reported_usage(self, processing_context, mock_logger):
+        """測試串流結束時 client 回報的 usage 取代粗略估算"""
+        usage = {"prompt_tokens": 120, "completion_tokens": 3, "total_tokens": 123, "cached_tokens": 100}
+
+        class StreamingLLM:
+            model_name = "stream-mock"
+            generate = AsyncMock()
+
+            async def stream(self, prompt, token_info=None, **kwargs):
+                yield "Hello world"
+                token_info.update(usage)
+
+        processing_context.request.stream = True
+        processor = ChatProcessor(StreamingLLM())
+
+        with patch.object(processor.logger, "log_llm_call") as log_llm_call:
+            await processor.process(processing_context)
+
+        assert processing_context.total_tokens == 123
+        assert log_llm_call.call_args.kwargs["cached_tokens"] == 100
+
+    @pytest.mark.asyncio
+    async def test_chat_non_stream_request_uses_generate(self, processing_context, mock_logger):
+        """測試非串流請求即使 client 支援 stream() 仍使用 generate()"""
+        class StreamingLLM:
+            model_name = "stream-mock"
+            generate = AsyncMock(return_value="full answer")
+
+            async def stream(self, prompt, **kwargs):
+                yield "should not be used"
+
+        processor = ChatProcessor(StreamingLLM())
+        result = await processor.process(processing_context)
+
+        assert result == "full answer"
+        mock_logger['message'].assert_called_once_with("full answer")
+
 
 # ========== ThinkingProcessor Tests ==========
 class TestThinkingProcessor:
@@ -175,9 +239,11 @@ class TestKnowledgeProcessor:
         # 驗證知識服務被呼叫
         mock_kb.retrieve.assert_called_once_with("What is machine learning?", top_k=5)
 
-        # 驗證 LLM 調用包含引用規則
-        llm_call = mock_llm_client.generate.call_args[0][0]
-        assert "Citation" in llm_call or "引用" in llm_call
+        # 驗證引用規則在穩定的 system 前綴，檢索內容在 user prompt
+        call = mock_llm_client.generate.call_args
+        assert "Citation" in call.kwargs["system"]
+        assert "Machine learning is a subset of AI" in call.args[0]
+        assert "Citation" not in call.args[0]
 
 
 # ========== SearchProcessor Tests ==========
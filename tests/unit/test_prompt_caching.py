@@ -0,0 +1,135 @@
+"""Unit tests for prompt-cache-friendly prompt assembly (stable system prefix)."""
+
+import re
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.logger import structured_logger
+from core.models_v2 import ProcessingContext, Request, Response, Modes
+from core.processors.chat import ChatProcessor
+from core.prompts import PromptTemplates
+from services.llm.anthropic_client import AnthropicLLMClient, _token_info
+from services.llm.openai_client import OpenAILLMClient
+
+
+class RecordingLLM:
+    """LLM client that records prompt and kwargs of each call."""
+
+    model_name = "recording"
+
+    def __init__(self, supports_system_prompt):
+        self.supports_system_prompt = supports_system_prompt
+        self.calls = []
+
+    async def generate(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs))
+        return "ok", {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12,
+                      "cached_tokens": 8}
+
+
+def _context(query):
+    request = Request(query=query, mode=Modes.CHAT)
+    return ProcessingContext(
+        request=request, response=Response(result="", mode=Modes.CHAT, trace_id=request.trace_id)
+    )
+
+
+@pytest.fixture(autouse=True)
+def quiet_logger():
+    with patch.object(structured_logger, "info"), \
+         patch.object(structured_logger, "debug"), \
+         patch.object(structured_logger, "progress"), \
+         patch.object(structured_logger, "message"), \
+         patch.object(structured_logger, "log_llm_call") as log_llm_call:
+        yield log_llm_call
+
+
+class TestStableSystemPrompt:
+    def test_byte_identical_across_calls(self):
+        first = PromptTemplates.get_stable_system_prompt("search", citation_rules=True)
+        second = PromptTemplates.get_stable_system_prompt("search", citation_rules=True)
+        assert first == second
+
+    def test_date_granularity(self):
+        prompt = PromptTemplates.get_system_instruction("chat")
+        assert re.search(r"Today is \d{4}-\d{2}-\d{2}\.", prompt)
+        assert not re.search(r"\d{2}:\d{2}:\d{2}", prompt)
+
+    def test_order_instruction_guidelines_citations(self):
+        prompt = PromptTemplates.get_stable_system_prompt("knowledge", citation_rules=True)
+        assert (
+            prompt.index("You are an expert")
+            < prompt.index("<OutputGuidelines>")
+            < prompt.index("Citation Rules")
+        )
+
+
+class TestProcessorPromptAssembly:
+    @pytest.mark.asyncio
+    async def test_stable_prefix_sent_as_system(self, quiet_logger):
+        llm = RecordingLLM(supports_system_prompt=True)
+        processor = ChatProcessor(llm)
+        await processor.process(_context("first question"))
+        await processor.process(_context("second question"))
+
+        (p1, kw1), (p2, kw2) = llm.calls
+        assert kw1["system"] == kw2["system"]
+        assert "first question" in p1 and "first question" not in kw1["system"]
+        assert quiet_logger.call_args.kwargs["cached_tokens"] == 8
+
+    @pytest.mark.asyncio
+    async def test_prefix_folded_into_prompt_without_system_support(self):
+        llm = RecordingLLM(supports_system_prompt=False)
+        await ChatProcessor(llm).process(_context("a question"))
+
+        prompt, kwargs = llm.calls[0]
+        assert "system" not in kwargs
+        assert prompt.startswith("You are an expert")
+        assert prompt.endswith("User: a question")
+
+
+class TestProviderCacheUsage:
+    @pytest.mark.asyncio
+    async def test_openai_system_message_and_cached_tokens(self):
+        client = OpenAILLMClient(api_key="sk-test-fake-key")
+        completion = MagicMock()
+        completion.usage = SimpleNamespace(
+            prompt_tokens=1200, completion_tokens=5, total_tokens=1205,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+        )
+        completion.choices = [SimpleNamespace(message=SimpleNamespace(content="hello"))]
+        raw = MagicMock()
+        raw.headers = {}
+        raw.parse.return_value = completion
+        client.client = MagicMock()
+        create = AsyncMock(return_value=raw)
+        client.client.chat.completions.with_raw_response.create = create
+
+        _, token_info = await client.generate("hi", system="stable", return_token_info=True)
+        messages = create.call_args.kwargs["messages"]
+        assert messages[0] == {"role": "system", "content": "stable"}
+        assert messages[1] == {"role": "user", "content": "hi"}
+        assert token_info["cached_tokens"] == 1024
+
+    def test_anthropic_cache_breakpoint_on_system(self):
+        client = AnthropicLLMClient(api_key="sk-ant-test")
+        params = client._params("hi", {"system": "stable"})
+        assert params["system"] == [
+            {"type": "text", "text": "stable", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert "system" not in client._params("hi", {})
+
+    def test_anthropic_usage_counts_cache_reads(self):
+        usage = SimpleNamespace(
+            input_tokens=50, output_tokens=20,
+            cache_read_input_tokens=1500, cache_creation_input_tokens=0,
+        )
+        info = _token_info(usage)
+        assert info["cached_tokens"] == 1500
+        assert info["prompt_tokens"] == 1550
+        assert info["total_tokens"] == 1570
@@ -0,0 +1,223 @@
+"""Unit tests for the per-provider RPM/TPM rate limiter."""
+
+import asyncio
+import time
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.llm.rate_limiter import (
+    RateLimiter, TokenBucket, _parse_reset, estimate_tokens, rate_limit_stats,
+)
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers, status_code=429)
+
+
+class TestEstimate:
+    def test_ascii_about_four_chars_per_token(self):
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_cjk_counts_one_token_per_char(self):
+        assert estimate_tokens("深度研究") == 4
+
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+
+class TestTokenBucket:
+    def test_unlimited_never_waits(self):
+        bucket = TokenBucket()
+        assert bucket.wait_time(10**9, time.monotonic()) == 0.0
+
+    def test_wait_time_matches_refill_rate(self):
+        bucket = TokenBucket(per_minute=600)  # 10 units/s
+        now = time.monotonic()
+        bucket.take(600, now)
+        assert bucket.wait_time(5, now) == pytest.approx(0.5)
+
+    def test_refund_capped_at_capacity(self):
+        bucket = TokenBucket(per_minute=100)
+        now = time.monotonic()
+        bucket.take(-50, now)
+        assert bucket.level == 100
+
+
+class TestParseReset:
+    @pytest.mark.parametrize("value,expected", [
+        ("1s", 1.0), ("6m0s", 360.0), ("120ms", 0.12), ("2.5", 2.5), ("1m30.5s", 90.5),
+    ])
+    def test_durations(self, value, expected):
+        assert _parse_reset(value) == pytest.approx(expected)
+
+    def test_rfc3339(self):
+        assert _parse_reset("2000-01-01T00:00:00Z") == 0.0
+
+    def test_garbage(self):
+        assert _parse_reset("soon") is None
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_waits_for_request_bucket_instead_of_failing(self):
+        limiter = RateLimiter("mock", rpm=600)  # 10 requests/s
+        limiter.requests.take(600, time.monotonic())
+
+        start = time.perf_counter()
+        await limiter.acquire(1)
+        waited = time.perf_counter() - start
+        assert 0.05 <= waited < 0.5
+        assert limiter.stats["waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_gates_large_prompts(self):
+        limiter = RateLimiter("mock", tpm=6000)  # 100 tokens/s
+        async with limiter.reserve("x" * 24000) as reservation:  # ~6000 tokens
+            assert reservation.estimate == 6000
+        start = time.perf_counter()
+        await limiter.acquire(10)
+        assert time.perf_counter() - start >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_settle_corrects_estimate(self):
+        limiter = RateLimiter("mock", tpm=10_000)
+        async with limiter.reserve("x" * 400, max_tokens=1000) as reservation:
+            assert reservation.estimate == 1100
+            reservation.settle({"total_tokens": 300})
+        assert limiter.tokens.level == pytest.approx(10_000 - 300, abs=5)
+        assert limiter.stats["estimate_correction_tokens"] == -800
+
+    @pytest.mark.asyncio
+    async def test_headers_teach_limits_and_remaining(self):
+        limiter = RateLimiter("openai")
+        limiter.observe_headers({
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-limit-tokens": "30000",
+            "x-ratelimit-remaining-tokens": "29000",
+        })
+        assert limiter.stats["rpm"] == 500
+        assert limiter.stats["tpm"] == 30000
+        assert limiter.requests.level == pytest.approx(10, abs=1)
+
+    def test_anthropic_headers(self):
+        limiter = RateLimiter("anthropic")
+        limiter.observe_headers({
+            "anthropic-ratelimit-requests-limit": "50",
+            "anthropic-ratelimit-requests-remaining": "0",
+        })
+        assert limiter.requests.wait_time(1, time.monotonic()) > 1.0
+
+    @pytest.mark.asyncio
+    async def test_429_blocks_callers_until_retry_after(self):
+        limiter = RateLimiter("mock")
+        with pytest.raises(RateLimitError):
+            async with limiter.reserve("hi"):
+                raise RateLimitError({"retry-after": "0.1"})
+        assert limiter.stats["rate_limited"] == 1
+
+        start = time.perf_counter()
+        await limiter.acquire(1)
+        assert time.perf_counter() - start >= 0.08
+
+    @pytest.mark.asyncio
+    async def test_other_errors_do_not_block(self):
+        limiter = RateLimiter("mock")
+        with pytest.raises(ValueError):
+            async with limiter.reserve("hi"):
+                raise ValueError("bad prompt")
+        assert limiter.stats["rate_limited"] == 0
+        assert limiter._blocked_until == 0.0
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_arrival_order(self):
+        limiter = RateLimiter("mock", rpm=1200)  # 20 requests/s
+        limiter.requests.take(1200, time.monotonic())
+        order = []
+
+        async def call(i):
+            await limiter.acquire(1)
+            order.append(i)
+
+        await asyncio.gather(*(call(i) for i in range(3)))
+        assert order == [0, 1, 2]
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_RPM", "3500")
+        monkeypatch.setenv("OPENAI_TPM", "not-a-number")
+        limiter = RateLimiter.from_env("openai")
+        assert limiter.stats["rpm"] == 3500
+        assert limiter.stats["tpm"] is None
+
+
+class TestOpenAIIntegration:
+    @pytest.mark.asyncio
+    async def test_generate_reads_headers_and_settles(self):
+        from services.llm.openai_client import OpenAILLMClient
+
+        client = OpenAILLMClient(api_key="sk-test-fake-key")
+        completion = MagicMock()
+        completion.usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        completion.choices = [SimpleNamespace(message=SimpleNamespace(content="hello"))]
+        raw = MagicMock()
+        raw.headers = {"x-ratelimit-limit-tokens": "1000", "x-ratelimit-remaining-tokens": "900"}
+        raw.parse.return_value = completion
+        client.client = MagicMock()
+        client.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw)
+
+        text, token_info = await client.generate("hi", return_token_info=True)
+        assert text == "hello"
+        assert token_info["total_tokens"] == 15
+        assert client.rate_limiter.stats["tpm"] == 1000
+        assert client.rate_limiter.stats["calls"] == 1
+        assert rate_limit_stats(client) == {"openai": client.rate_limiter.stats}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("model, max_tokens, reserved", [
+        ("gpt-4o-mini", None, 4096),   # client default when no cap is sent
+        ("gpt-4o-mini", 300, 300),
+        ("gpt-5-mini", 300, 300),      # sent as max_completion_tokens
+    ])
+    async def test_reserves_output_cap(self, model, max_tokens, reserved):
+        from services.llm.openai_client import OpenAILLMClient
+
+        client = OpenAILLMClient(api_key="sk-test-fake-key", model=model)
+        completion = MagicMock()
+        completion.usage = None
+        completion.choices = [SimpleNamespace(message=SimpleNamespace(content="hello"))]
+        raw = MagicMock()
+        raw.headers = {}
+        raw.parse.return_value = completion
+        client.client = MagicMock()
+        client.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw)
+
+        await client.generate("x" * 400, max_tokens=max_tokens)
+        assert client.rate_limiter.stats["estimated_tokens"] == 100 + reserved
+
+
+class TestAnthropicIntegration:
+    @pytest.mark.asyncio
+    async def test_reserves_output_cap(self):
+        from services.llm.anthropic_client import AnthropicLLMClient
+
+        client = AnthropicLLMClient(api_key="sk-ant-test-fake-key")
+        message = MagicMock()
+        message.content = [SimpleNamespace(text="hello")]
+        message.usage = SimpleNamespace(input_tokens=100, output_tokens=5)
+        raw = MagicMock()
+        raw.headers = {}
+        raw.parse.return_value = message
+        client.client = MagicMock()
+        client.client.messages.with_raw_response.create = AsyncMock(return_value=raw)
+
+        await client.generate("x" * 400)
+        await client.generate("x" * 400, max_tokens=200)
+        assert client.rate_limiter.stats["estimated_tokens"] == (100 + 4096) + (100 + 200)
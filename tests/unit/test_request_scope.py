@@ -0,0 +1,70 @@
+"""Unit tests for request-scoped execution state."""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.request_scope import current_scope, request_scope
+from core.logger import structured_logger
+
+
+class TestRequestScope:
+    def test_no_scope_outside_request(self):
+        assert current_scope() is None
+
+    def test_scope_active_inside_block(self):
+        with request_scope(trace_id="t1") as scope:
+            assert current_scope() is scope
+            assert scope.trace_id == "t1"
+        assert current_scope() is None
+
+    def test_nested_scope_inherits_sse_callback(self):
+        cb = lambda signal, data: None
+        with request_scope(trace_id="outer", sse_callback=cb):
+            with request_scope(trace_id="inner") as inner:
+                assert inner.sse_callback is cb
+                assert inner.trace_id == "inner"
+
+    def test_nested_scope_restores_parent(self):
+        with request_scope(trace_id="outer") as outer:
+            with request_scope(trace_id="inner"):
+                pass
+            assert current_scope() is outer
+
+    @pytest.mark.asyncio
+    async def test_child_tasks_share_scope(self):
+        with request_scope(trace_id="parent") as scope:
+            async def child():
+                return current_scope()
+            results = await asyncio.gather(child(), child())
+        assert all(r is scope for r in results)
+
+
+class TestLoggerScope:
+    def test_logger_reads_trace_from_scope(self):
+        with request_scope(trace_id="abc"):
+            assert structured_logger.trace_id == "abc"
+            structured_logger.set_context(mode="chat")
+            assert structured_logger.context == {"mode": "chat"}
+        assert structured_logger.trace_id is None
+
+    def test_set_trace_does_not_leak_between_scopes(self):
+        with request_scope() as a:
+            structured_logger.set_trace("trace-a")
+        with request_scope() as b:
+            assert structured_logger.trace_id is None
+        assert a.trace_id == "trace-a"
+        assert b.trace_id is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scopes_isolated(self):
+        async def run(trace_id):
+            with request_scope(trace_id=trace_id):
+                await asyncio.sleep(0.01)
+                return structured_logger.trace_id
+
+        results = await asyncio.gather(*(run(f"t{i}") for i in range(20)))
+        assert results == [f"t{i}" for i in range(20)]
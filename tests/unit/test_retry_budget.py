@@ -0,0 +1,127 @@
+"""Unit tests for the request-level retry budget shared by nested retry layers."""
+
+import time
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.error_handler import enhanced_error_handler
+from core.errors import retry_with_backoff
+from core.processors.research import DeepResearchProcessor
+from core.request_scope import request_scope
+from core.retry_budget import RetryBudget, allow_retry
+from services.llm.multi_provider import MultiProviderLLMClient
+
+
+class FailingProvider:
+    """Provider that always fails with a retryable error and counts calls."""
+
+    def __init__(self, name, counter):
+        self.provider_name = name
+        self.is_available = True
+        self._counter = counter
+
+    async def generate(self, prompt, **kwargs):
+        self._counter["attempts"] += 1
+        raise ConnectionError(f"{self.provider_name} connection timeout")
+
+
+def _nested_call(counter):
+    """AgentRuntime-style retry -> decorator retry -> provider fallback chain."""
+    chain = MultiProviderLLMClient(
+        [FailingProvider(name, counter) for name in ("openai", "anthropic", "gemini")],
+        breaker_config={"min_calls": 100},  # keep breakers closed: count raw attempts
+    )
+
+    @enhanced_error_handler(max_retries=2, base_delay=0.001)
+    async def processor_step():
+        return await chain.generate("prompt")
+
+    return retry_with_backoff(processor_step, max_retries=2, base_delay=0.001)
+
+
+class TestRetryBudget:
+    def test_consumes_until_exhausted(self):
+        budget = RetryBudget(max_retries=2)
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.stats["used"] == 2
+        assert budget.stats["denied"] == 1
+
+    def test_no_retry_whose_backoff_ends_past_deadline(self):
+        budget = RetryBudget(max_retries=10, deadline_s=1.0)
+        assert budget.try_acquire(delay=0.5)
+        assert not budget.try_acquire(delay=5.0)
+
+    def test_set_deadline_is_relative_to_start(self):
+        budget = RetryBudget(max_retries=10)
+        assert budget.remaining_time() is None
+        budget.set_deadline(0.0)
+        assert not budget.try_acquire()
+
+    def test_outside_request_always_allows(self):
+        assert allow_retry(delay=100.0)
+
+
+class TestNestedRetryLayers:
+    @pytest.mark.asyncio
+    async def test_attempts_multiply_without_budget(self):
+        counter = {"attempts": 0}
+        with pytest.raises(ConnectionError):
+            await _nested_call(counter)
+        # 3 runtime attempts x 3 decorator attempts x 3 providers
+        assert counter["attempts"] == 27
+
+    @pytest.mark.asyncio
+    async def test_shared_budget_bounds_total_attempts(self):
+        counter = {"attempts": 0}
+        budget = RetryBudget(max_retries=4)
+        with request_scope(trace_id="t", retry_budget=budget):
+            with pytest.raises(ConnectionError):
+                await _nested_call(counter)
+        # First attempt + at most max_retries retries, whichever layer takes them
+        assert counter["attempts"] <= 1 + budget.max_retries
+        assert budget.used == budget.max_retries
+
+    @pytest.mark.asyncio
+    async def test_deadline_stops_backoff_sleeps(self):
+        counter = {"attempts": 0}
+
+        async def flaky():
+            counter["attempts"] += 1
+            raise ConnectionError("connection reset")
+
+        budget = RetryBudget(max_retries=100, deadline_s=0.3)
+        start = time.monotonic()
+        with request_scope(trace_id="t", retry_budget=budget):
+            with pytest.raises(ConnectionError):
+                await retry_with_backoff(flaky, max_retries=10, base_delay=0.05)
+        # Backoff 0.05, 0.1, then 0.2 would end past the deadline
+        assert time.monotonic() - start < 0.3
+        assert counter["attempts"] == 3
+
+
+class TestDeepResearchWorkflowRetry:
+    async def _run(self, budget=None):
+        processor = DeepResearchProcessor(MagicMock())
+        workflow = AsyncMock(side_effect=ConnectionError("connection reset"))
+        state = {"current_step": "search", "errors": []}
+        with patch.object(processor, "_execute_research_workflow", workflow), \
+             patch("core.processors.research.processor.asyncio.sleep", AsyncMock()):
+            with request_scope(trace_id="t", retry_budget=budget):
+                with pytest.raises(ConnectionError):
+                    await processor._execute_with_retry(MagicMock(), state)
+        return workflow.await_count
+
+    @pytest.mark.asyncio
+    async def test_no_workflow_retry_without_budget(self):
+        assert await self._run() == 1
+
+    @pytest.mark.asyncio
+    async def test_workflow_retries_drawn_from_budget(self):
+        assert await self._run(RetryBudget(max_retries=1)) == 2
+        assert await self._run(RetryBudget(max_retries=5)) == 3  # processor's own cap
@@ -0,0 +1,85 @@
+"""Unit tests for the embedding-similarity SemanticCache."""
+
+import re
+import time
+import numpy as np
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.semantic_cache import SemanticCache
+
+VOCAB = ["what", "is", "rag", "retrieval", "weather", "today", "python", "who", "are", "you"]
+
+
+def bag_of_words(text: str):
+    """Deterministic toy embedding: word counts over a tiny vocabulary."""
+    words = re.findall(r"[a-z]+", text.lower().replace("what's", "what is"))
+    return [float(words.count(w)) for w in VOCAB]
+
+
+def _cache(**kwargs):
+    return SemanticCache(embed_fn=bag_of_words, **kwargs)
+
+
+class TestSemanticLookup:
+    @pytest.mark.asyncio
+    async def test_paraphrase_hits(self):
+        c = _cache(threshold=0.9)
+        c.put(await c.embed("what is RAG"), "chat", "RAG answer")
+        assert c.get(await c.embed("What's RAG?"), "chat") == "RAG answer"
+        assert c.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unrelated_query_misses(self):
+        c = _cache(threshold=0.9)
+        c.put(await c.embed("what is RAG"), "chat", "RAG answer")
+        assert c.get(await c.embed("weather today"), "chat") is None
+        assert c.stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_modes_isolated(self):
+        c = _cache()
+        c.put(await c.embed("what is RAG"), "chat", "chat answer")
+        assert c.get(await c.embed("what is RAG"), "knowledge") is None
+
+    @pytest.mark.asyncio
+    async def test_near_miss_counted(self):
+        c = _cache(threshold=0.9)
+        c.put(await c.embed("what is rag retrieval"), "chat", "answer")
+        # cosine = 3 / sqrt(4 * 3) ~= 0.866: a miss, but within the margin
+        assert c.get(await c.embed("what is rag"), "chat") is None
+        assert c.stats["near_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_embed_failure_returns_none(self):
+        def broken(text):
+            raise ConnectionError("embedding provider down")
+        c = SemanticCache(embed_fn=broken)
+        assert await c.embed("hello") is None
+        assert c.stats["embed_errors"] == 1
+
+
+class TestSemanticEviction:
+    def test_lru_eviction(self):
+        c = _cache(max_size=2, threshold=0.99)
+        vecs = {name: np.eye(len(VOCAB), dtype=np.float32)[i] for i, name in enumerate("abc")}
+        c.put(vecs["a"], "chat", "A")
+        c.put(vecs["b"], "chat", "B")
+        assert c.get(vecs["a"], "chat") == "A"   # a most recent
+        c.put(vecs["c"], "chat", "C")            # evicts b
+        assert c.get(vecs["b"], "chat") is None
+        assert c.get(vecs["c"], "chat") == "C"
+        assert c.stats["evictions"] == 1
+        assert c.stats["size"] == 2
+
+    def test_ttl_expiry(self):
+        c = _cache(ttl=0)
+        vec = np.eye(len(VOCAB), dtype=np.float32)[0]
+        c.put(vec, "chat", "A")
+        time.sleep(0.01)
+        assert c.get(vec, "chat") is None
+        assert c.stats["expirations"] == 1
+        assert c.stats["size"] == 0
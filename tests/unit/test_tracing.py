@@ -0,0 +1,187 @@
+"""Unit tests for tracing spans, the OTLP-JSON exporter and the trace report CLI."""
+
+import asyncio
+import importlib.util
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core import tracing
+from core.engine import RefactoredEngine
+from core.feature_flags import feature_flags
+from core.logger import structured_logger
+from core.models_v2 import Request, Modes
+from core.tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    InMemorySpanExporter,
+    JsonFileSpanExporter,
+    current_span,
+    otel_trace_id,
+    span,
+    start_trace,
+)
+
+SCRIPTS = Path(__file__).parent.parent.parent / "scripts"
+
+
+def _load_script(name):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def tracing_on():
+    exporter = InMemorySpanExporter()
+    previous = tracing.set_exporter(exporter)
+    original = feature_flags.is_enabled
+    with patch.object(feature_flags, "is_enabled",
+                      side_effect=lambda path: path == "tracing.enabled" or original(path)):
+        yield exporter
+    tracing.set_exporter(previous)
+
+
+def _by_name(spans):
+    return {s.name: s for s in spans}
+
+
+class TestExporterConfig:
+    @pytest.mark.parametrize("configured, expected", [
+        ("data/traces", Path(__file__).parent.parent.parent / "data" / "traces"),
+        ("/var/spans", Path("/var/spans")),
+    ])
+    def test_trace_dir_independent_of_cwd(self, tmp_path, monkeypatch, configured, expected):
+        monkeypatch.chdir(tmp_path)
+        previous = tracing.set_exporter(None)
+        try:
+            with patch.object(feature_flags, "get_value", return_value=configured), \
+                 patch.object(tracing, "JsonFileSpanExporter") as exporter_cls:
+                tracing.get_exporter()
+        finally:
+            tracing.set_exporter(previous)
+        assert exporter_cls.call_args.args[0].resolve() == expected.resolve()
+
+
+class TestSpans:
+    def test_noop_outside_trace(self):
+        with span("orphan") as s:
+            assert s is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+
+    def test_disabled_trace_records_nothing(self):
+        exporter = InMemorySpanExporter()
+        previous = tracing.set_exporter(exporter)
+        try:
+            with start_trace("request", "t-1") as root, span("child") as child:
+                assert root is NOOP_SPAN and child is NOOP_SPAN
+        finally:
+            tracing.set_exporter(previous)
+        assert exporter.spans == []
+
+    @pytest.mark.asyncio
+    async def test_parent_child_across_gather(self, tracing_on):
+        async def task(i):
+            with span("search_task", index=i):
+                await asyncio.sleep(0)
+                with span("fetch", url=f"https://example.com/{i}"):
+                    pass
+
+        trace_id = "123e4567-e89b-12d3-a456-426614174000"
+        with start_trace("request", trace_id):
+            with span("deep_research.search_tasks") as batch:
+                await asyncio.gather(task(1), task(2))
+
+        spans = tracing_on.spans
+        assert {s.trace_id for s in spans} == {"123e4567e89b12d3a456426614174000"}
+        root = _by_name(spans)["request"]
+        assert root.parent_span_id is None
+        assert batch.parent_span_id == root.span_id
+        tasks = [s for s in spans if s.name == "search_task"]
+        assert {t.parent_span_id for t in tasks} == {batch.span_id}
+        fetches = [s for s in spans if s.name == "fetch"]
+        assert {f.parent_span_id for f in fetches} == {t.span_id for t in tasks}
+
+    def test_error_status(self, tracing_on):
+        with pytest.raises(ValueError):
+            with start_trace("request", "t-err"), span("boom"):
+                raise ValueError("bad")
+        spans = _by_name(tracing_on.spans)
+        assert spans["boom"].status == STATUS_ERROR
+        assert spans["request"].status_message == "ValueError: bad"
+
+    def test_otel_trace_id(self):
+        assert otel_trace_id("123E4567-E89B-12D3-A456-426614174000") == "123e4567e89b12d3a456426614174000"
+        assert len(otel_trace_id("not-a-uuid")) == 32
+
+
+class TestEngineTrace:
+    @pytest.mark.asyncio
+    async def test_request_route_process_llm_spans(self, tracing_on):
+        class LLM:
+            model_name = "mock"
+
+            async def generate(self, prompt, **kwargs):
+                return "hi", {"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}
+
+        engine = RefactoredEngine(llm_client=LLM())
+        engine.initialized = True
+        with patch.object(structured_logger, "info"), patch.object(structured_logger, "emit_sse"):
+            request = Request(query="hello", mode=Modes.CHAT)
+            await engine.process(request)
+
+        spans = _by_name(tracing_on.spans)
+        assert spans["request"].attributes["quitcode.trace_id"] == request.trace_id
+        assert spans["request"].attributes["mode"] == "chat"
+        assert spans["route"].parent_span_id == spans["request"].span_id
+        assert spans["llm_call"].attributes["prompt_tokens"] == 7
+        assert spans["llm_call"].trace_id == spans["request"].trace_id
+
+
+class TestTraceReport:
+    def test_critical_path_and_waterfall(self, tmp_path):
+        exporter = JsonFileSpanExporter(tmp_path)
+        trace_id = "abcdefab-0000-0000-0000-000000000001"
+        root = tracing.Span(otel_trace_id(trace_id), "request",
+                            attributes={"quitcode.trace_id": trace_id})
+        root.start_ns, root.end_ns = 0, 100_000_000
+
+        def child(name, start_ms, end_ms, parent=root, **attrs):
+            s = tracing.Span(root.trace_id, name, parent.span_id, attrs)
+            s.start_ns, s.end_ns = start_ms * 1_000_000, end_ms * 1_000_000
+            return s
+
+        plan = child("deep_research.plan", 0, 10)
+        search = child("deep_research.search_tasks", 10, 70)
+        fast = child("search_task", 10, 30, search, query="fast")
+        slow = child("search_task", 10, 65, search, query="slow")
+        report = child("deep_research.final_report", 70, 100)
+        for s in (plan, fast, slow, search, report, root):
+            exporter.export(s)
+        assert exporter.flush()
+
+        cli = _load_script("trace_report")
+        spans = cli.load_trace(str(tmp_path), trace_id[:8])
+        assert len(spans) == 6
+
+        summary = cli.summarize(spans)
+        assert summary["wall_ms"] == 100.0
+        path = [(step["name"], step["owned_ms"]) for step in summary["critical_path"]]
+        assert path == [
+            ("request", 0.0),
+            ("deep_research.final_report", 30.0),
+            ("deep_research.search_tasks", 5.0),
+            ("search_task", 55.0),
+            ("deep_research.plan", 10.0),
+        ]
+        assert summary["by_name"]["search_task"]["count"] == 2
+        assert summary["by_name"]["search_task"]["critical_ms"] == 55.0
+
+        lines = cli.waterfall(spans, width=20)
+        assert len(lines) == 6
+        assert lines[0].rstrip().endswith("request")
+        assert any("query=slow" in line for line in lines)
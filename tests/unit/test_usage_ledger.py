@@ -0,0 +1,238 @@
+"""Unit tests for the per-call LLM usage ledger."""
+
+import asyncio
+import importlib.util
+import json
+import pytest
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.logger import structured_logger
+from core.request_scope import request_scope, current_stage
+from services.llm.usage_ledger import UsageLedger, estimate_cost, get_usage_ledger
+
+SCRIPTS = Path(__file__).parent.parent.parent / "scripts"
+
+
+def _load_script(name):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _read(ledger):
+    assert ledger.flush()
+    path = ledger.log_dir / f"usage_{datetime.now():%Y-%m-%d}.jsonl"
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestEstimateCost:
+    def test_longest_prefix_wins(self):
+        info = {"prompt_tokens": 1_000_000, "completion_tokens": 0}
+        assert estimate_cost("gpt-4o-mini-2024-07-18", info) == pytest.approx(0.15)
+        assert estimate_cost("gpt-4o", info) == pytest.approx(2.50)
+
+    def test_cached_tokens_billed_at_cached_rate(self):
+        info = {"prompt_tokens": 1_000_000, "cached_tokens": 1_000_000, "completion_tokens": 1_000_000}
+        assert estimate_cost("claude-sonnet-4-5-20250929", info) == pytest.approx(0.30 + 15.00)
+
+    def test_unknown_model(self):
+        assert estimate_cost("my-local-llama", {"prompt_tokens": 10}) is None
+
+
+class TestUsageLedger:
+    def test_writes_jsonl_with_request_labels(self, tmp_path):
+        ledger = UsageLedger(tmp_path)
+        with request_scope(trace_id="trace-1") as scope:
+            scope.mode = "deep_research"
+            structured_logger.progress("report-plan", "start")
+            assert current_stage() == "report-plan"
+            ledger.record("openai", "gpt-4o", {
+                "prompt_tokens": 1000, "completion_tokens": 200,
+                "total_tokens": 1200, "cached_tokens": 800,
+            }, latency_s=1.25)
+        assert current_stage() is None
+
+        (entry,) = _read(ledger)
+        assert entry["trace_id"] == "trace-1"
+        assert entry["mode"] == "deep_research"
+        assert entry["stage"] == "report-plan"
+        assert entry["cached_tokens"] == 800
+        assert entry["latency_ms"] == 1250.0
+        assert entry["cost_usd"] == pytest.approx((200 * 2.5 + 800 * 1.25 + 200 * 10) / 1e6)
+        assert entry["priced"] is True
+
+    @pytest.mark.asyncio
+    async def test_parallel_tasks_keep_their_own_stage(self, tmp_path):
+        ledger = UsageLedger(tmp_path)
+
+        async def stage_call(stage):
+            structured_logger.progress(stage, "start")
+            await asyncio.sleep(0.01)
+            ledger.record("openai", "gpt-4o", {"prompt_tokens": 1}, latency_s=0.0)
+
+        with request_scope(trace_id="t"):
+            await asyncio.gather(stage_call("search-task"), stage_call("review"))
+        assert sorted(e["stage"] for e in _read(ledger)) == ["review", "search-task"]
+
+    def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv("USAGE_LEDGER_ENABLED", "false")
+        assert get_usage_ledger() is None
+
+
+class TestProviderRecording:
+    @pytest.mark.asyncio
+    async def test_openai_generate_records_call(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("USAGE_LEDGER_ENABLED", "true")
+        monkeypatch.setenv("USAGE_LEDGER_DIR", str(tmp_path))
+        from services.llm.openai_client import OpenAILLMClient
+
+        client = OpenAILLMClient(api_key="sk-test-fake-key", model="gpt-4o-mini")
+        completion = MagicMock()
+        completion.usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        completion.choices = [SimpleNamespace(message=SimpleNamespace(content="hello"))]
+        raw = MagicMock()
+        raw.headers = {}
+        raw.parse.return_value = completion
+        client.client = MagicMock()
+        client.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw)
+
+        await client.generate("hi")
+        (entry,) = _read(get_usage_ledger())
+        assert entry["provider"] == "openai"
+        assert entry["model"] == "gpt-4o-mini"
+        assert entry["total_tokens"] == 15
+        assert entry["estimated"] is False
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("send_usage", [True, False])
+    async def test_openai_stream_records_reported_usage(self, tmp_path, monkeypatch, send_usage):
+        monkeypatch.setenv("USAGE_LEDGER_ENABLED", "true")
+        monkeypatch.setenv("USAGE_LEDGER_DIR", str(tmp_path))
+        from services.llm.openai_client import OpenAILLMClient
+
+        def delta(text):
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+        async def chunks():
+            yield delta("hel")
+            yield delta("lo")
+            if send_usage:
+                usage = SimpleNamespace(prompt_tokens=40, completion_tokens=2, total_tokens=42)
+                yield SimpleNamespace(choices=[], usage=usage)
+
+        client = OpenAILLMClient(api_key="sk-test-fake-key", model="gpt-4o-mini")
+        raw = MagicMock()
+        raw.headers = {}
+        raw.parse.return_value = chunks()
+        client.client = MagicMock()
+        client.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw)
+
+        token_info = {}
+        assert [c async for c in client.stream("hi", token_info=token_info)] == ["hel", "lo"]
+        params = client.client.chat.completions.with_raw_response.create.call_args.kwargs
+        assert params["stream_options"] == {"include_usage": True}
+        (entry,) = _read(get_usage_ledger())
+        assert entry["estimated"] is not send_usage
+        assert (entry["total_tokens"] == 42) is send_usage
+        assert token_info["total_tokens"] == entry["total_tokens"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("env_off", [False, True])
+    async def test_openai_stream_without_stream_options(self, tmp_path, monkeypatch, env_off):
+        import httpx
+        from openai import BadRequestError
+
+        monkeypatch.setenv("USAGE_LEDGER_ENABLED", "true")
+        monkeypatch.setenv("USAGE_LEDGER_DIR", str(tmp_path))
+        if env_off:
+            monkeypatch.setenv("OPENAI_STREAM_USAGE", "false")
+        from services.llm.openai_client import OpenAILLMClient
+
+        async def chunks():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="hello"))], usage=None)
+
+        def create(**params):
+            if "stream_options" in params:  # OpenAI-compatible server rejecting the field
+                response = httpx.Response(400, request=httpx.Request("POST", "http://llm.local"))
+                raise BadRequestError("Unrecognized request argument: stream_options",
+                                      response=response, body=None)
+            raw = MagicMock()
+            raw.headers = {}
+            raw.parse.return_value = chunks()
+            return raw
+
+        client = OpenAILLMClient(api_key="sk-test-fake-key", model="gpt-4o-mini")
+        client.client = MagicMock()
+        client.client.chat.completions.with_raw_response.create = AsyncMock(side_effect=create)
+
+        for _ in range(2):
+            assert [c async for c in client.stream("hi")] == ["hello"]
+        # At most one rejected request, then the option is no longer sent
+        assert client.client.chat.completions.with_raw_response.create.await_count == (2 if env_off else 3)
+        assert client.stream_usage is False
+        assert [e["estimated"] for e in _read(get_usage_ledger())] == [True, True]
+
+    @pytest.mark.asyncio
+    async def test_anthropic_stream_records_final_message_usage(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("USAGE_LEDGER_ENABLED", "true")
+        monkeypatch.setenv("USAGE_LEDGER_DIR", str(tmp_path))
+        from services.llm.anthropic_client import AnthropicLLMClient
+
+        class FakeStream:
+            headers = {}
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            @property
+            async def text_stream(self):
+                for text in ("hel", "lo"):
+                    yield text
+
+            async def get_final_message(self):
+                usage = SimpleNamespace(input_tokens=30, output_tokens=2, cache_read_input_tokens=10)
+                return SimpleNamespace(usage=usage)
+
+        client = AnthropicLLMClient(api_key="sk-ant-test-fake-key")
+        client.client = MagicMock()
+        client.client.messages.stream = MagicMock(return_value=FakeStream())
+
+        token_info = {}
+        assert [c async for c in client.stream("hi", token_info=token_info)] == ["hel", "lo"]
+        (entry,) = _read(get_usage_ledger())
+        assert entry["estimated"] is False
+        assert (entry["prompt_tokens"], entry["cached_tokens"], entry["total_tokens"]) == (40, 10, 42)
+        assert token_info["total_tokens"] == 42
+
+
+class TestReports:
+    def test_scripts_read_ledger(self, tmp_path):
+        ledger = UsageLedger(tmp_path)
+        with request_scope(trace_id="r1") as scope:
+            scope.mode = "deep_research"
+            for stage, prompt, cached in (("serp-query", 1000, 0), ("final-report", 9000, 6000)):
+                structured_logger.progress(stage, "start")
+                ledger.record("anthropic", "claude-sonnet-4-5", {
+                    "prompt_tokens": prompt, "completion_tokens": 100,
+                    "total_tokens": prompt + 100, "cached_tokens": cached,
+                }, latency_s=0.5)
+        ledger.flush()
+
+        stages = _load_script("stage_cost_report").analyze_stage_costs(str(tmp_path))
+        assert stages["requests"] == 1
+        assert list(stages["stages"]) == ["final-report", "serp-query"]
+        assert stages["stages"]["final-report"]["cached_tokens"] == 6000
+
+        kv = _load_script("measure_kv_cache").analyze_api_logs(str(tmp_path))
+        assert kv["request_count"] == 2
+        assert kv["kv_cache_hit_rate"] == pytest.approx(0.6)